@@ -0,0 +1,213 @@
+"""Microbenchmarks of per-request CPU hot spots with regression gates.
+
+Covers token encoding / decoding, bcrypt password checks at several costs,
+``UserCreate`` validation and e-mail rendering. Every benchmark is repeated a few
+times and the best time per call is taken, which is the most stable figure
+between runs.
+
+Baselines are specific to the host, record one on the machine (or CI runner) that
+will run the checks:
+
+    python -m app.benchmarks.hot_paths --save-baseline
+    python -m app.benchmarks.hot_paths --check [--max-regression 20]
+
+``--check`` exits with status 1 if any benchmark got slower than the baseline by
+more than ``--max-regression`` percent.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import bcrypt
+
+from app.benchmarks.jwt_algorithms import ensure_jwt_keys
+from app.core.utils.email import get_email_contents
+from app.core.utils.security import (
+    check_password,
+    decode_token,
+    generate_jwt_access_token,
+    generate_jwt_refresh_token,
+)
+from app.models.user import User
+from app.schemas.user_schema import UserCreate
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "baselines" / "hot_paths.json"
+DEFAULT_BCRYPT_COSTS = (4, 10, 12)
+PASSWORD = "Hot-Path-Pa55!"
+
+
+@dataclass
+class Benchmark:
+    """Single benchmarked call, ``func`` is a coroutine function without arguments."""
+
+    name: str
+    func: Callable[[], Awaitable]
+
+
+def build_benchmarks(bcrypt_costs: tuple[int, ...]) -> list[Benchmark]:
+    ensure_jwt_keys()
+    user = User(uuid=uuid.uuid4(), username="hotpath", is_active=True)
+    access_token = asyncio.run(generate_jwt_access_token(user))
+
+    async def validate_user_create():
+        UserCreate(
+            username="hot.path_user", email="hot.path@example.com", password=PASSWORD
+        )
+
+    benchmarks = [
+        Benchmark("generate_jwt_access_token", lambda: generate_jwt_access_token(user)),
+        Benchmark(
+            "generate_jwt_refresh_token", lambda: generate_jwt_refresh_token(user=user)
+        ),
+        Benchmark("decode_token", lambda: decode_token(access_token)),
+        Benchmark("UserCreate", validate_user_create),
+        Benchmark(
+            "get_email_contents",
+            lambda: get_email_contents(
+                email_type="confirm_email", context={"code": "123456", "user": user}
+            ),
+        ),
+    ]
+    for cost in bcrypt_costs:
+        hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=cost))
+        benchmarks.append(
+            Benchmark(
+                f"check_password[cost={cost}]",
+                lambda hashed=hashed: check_password(PASSWORD, hashed),
+            )
+        )
+    return benchmarks
+
+
+async def measure(benchmark: Benchmark, min_time: float, repeat: int) -> float:
+    """Best seconds per call out of ``repeat`` rounds of at least ``min_time`` each."""
+    number = 1
+    while (elapsed := await _time_calls(benchmark, number)) < min_time:
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        best = min(best, await _time_calls(benchmark, number) / number)
+    return best
+
+
+async def _time_calls(benchmark: Benchmark, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        await benchmark.func()
+    return time.perf_counter() - started
+
+
+def run_benchmarks(
+    benchmarks: list[Benchmark], min_time: float = 0.2, repeat: int = 5
+) -> dict[str, float]:
+    async def run_all() -> dict[str, float]:
+        return {
+            benchmark.name: await measure(benchmark, min_time, repeat)
+            for benchmark in benchmarks
+        }
+
+    return asyncio.run(run_all())
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], max_regression: float
+) -> list[str]:
+    """Descriptions of benchmarks slower than baseline by more than the threshold."""
+    regressions = []
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        change = (seconds / baseline[name] - 1) * 100
+        if change > max_regression:
+            regressions.append(
+                f"{name}: {_format_time(baseline[name])} -> {_format_time(seconds)} "
+                f"(+{change:.1f}%)"
+            )
+    return regressions
+
+
+def format_table(results: dict[str, float], baseline: dict[str, float]) -> str:
+    rows = [f"{'benchmark':<30}{'per call':>14}{'baseline':>14}{'change':>10}"]
+    for name, seconds in results.items():
+        if name in baseline:
+            reference = _format_time(baseline[name])
+            change = f"{(seconds / baseline[name] - 1) * 100:+.1f}%"
+        else:
+            reference = change = "-"
+        rows.append(f"{name:<30}{_format_time(seconds):>14}{reference:>14}{change:>10}")
+    return "\n".join(rows) + "\n"
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def load_baseline(path: Path) -> dict[str, float]:
+    try:
+        return json.loads(path.read_text())["results"]
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: Path, results: dict[str, float]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions.")
+    parser.add_argument(
+        "--max-regression", type=float, default=20.0, help="Allowed slowdown, percent."
+    )
+    parser.add_argument(
+        "--bcrypt-cost", type=int, action="append", help="Can be repeated."
+    )
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Output JSON report.")
+    args = parser.parse_args(argv)
+
+    benchmarks = build_benchmarks(tuple(args.bcrypt_cost or DEFAULT_BCRYPT_COSTS))
+    results = run_benchmarks(benchmarks, min_time=args.min_time, repeat=args.repeat)
+    baseline = load_baseline(args.baseline)
+
+    if args.json:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+    else:
+        sys.stdout.write(format_table(results, baseline))
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+    if args.check:
+        if not baseline:
+            sys.stderr.write(f"No baseline in {args.baseline}\n")
+            sys.exit(2)
+        if regressions := compare(results, baseline, args.max_regression):
+            sys.stderr.write("Regressions:\n" + "\n".join(regressions) + "\n")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
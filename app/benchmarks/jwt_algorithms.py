@@ -0,0 +1,142 @@
+"""Measure JWT sign / verify throughput of every supported algorithm on this host.
+
+Keys are generated on the fly, the payload mirrors a real access token. Run with
+
+    python -m app.benchmarks.jwt_algorithms [--iterations 2000] [--json]
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+import uuid
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.core.settings import settings
+from app.schemas.response_schema import AccessToken
+
+SUPPORTED_ALGORITHMS = ("RS256", "RS512", "ES256", "EdDSA", "HS256")
+
+
+def generate_key_pair(algorithm: str) -> tuple[str, str]:
+    """Return PEM encoded private and public keys usable with ``algorithm``."""
+    if algorithm == "HS256":
+        secret = uuid.uuid4().hex * 2
+        return secret, secret
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unsupported algorithm {algorithm}")
+
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def ensure_jwt_keys():
+    """Use ephemeral keys when none are configured, tokens never leave the process."""
+    if not settings.jwt_rsa_private_key:
+        private_key, public_key = generate_key_pair(settings.jwt_algorithm)
+        settings.jwt_rsa_private_key, settings.jwt_rsa_public_key = (
+            private_key,
+            public_key,
+        )
+
+
+def benchmark_algorithm(algorithm: str, iterations: int) -> dict:
+    private_pem, public_pem = generate_key_pair(algorithm)
+    signer = jwt.PyJWS().get_algorithm_by_name(algorithm)
+    private_key = signer.prepare_key(private_pem)
+    public_key = signer.prepare_key(public_pem)
+    payload = AccessToken(
+        exp=datetime.datetime.now() + datetime.timedelta(minutes=5),
+        iss=settings.jwt_issuer,
+        aud=settings.jwt_audience,
+        jti=str(uuid.uuid4()),
+        user_id=str(uuid.uuid4()),
+    ).model_dump()
+
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        token = jwt.encode(payload, private_key, algorithm=algorithm)
+    sign_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        jwt.decode(
+            token,
+            public_key,
+            algorithms=[algorithm],
+            audience=settings.jwt_audience,
+            issuer=settings.jwt_issuer,
+        )
+    verify_seconds = time.perf_counter() - started_at
+
+    # Same as above, but parsing PEM on every call like passing raw settings would.
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        jwt.encode(payload, private_pem, algorithm=algorithm)
+    sign_pem_seconds = time.perf_counter() - started_at
+
+    return {
+        "algorithm": algorithm,
+        "iterations": iterations,
+        "token_size": len(token),
+        "sign_ops_per_second": round(iterations / sign_seconds, 1),
+        "verify_ops_per_second": round(iterations / verify_seconds, 1),
+        "sign_from_pem_ops_per_second": round(iterations / sign_pem_seconds, 1),
+    }
+
+
+def format_table(results: list[dict]) -> str:
+    header = (
+        f"{'algorithm':<10}{'sign/s':>12}{'verify/s':>12}"
+        f"{'sign PEM/s':>14}{'token bytes':>14}"
+    )
+    rows = [
+        f"{r['algorithm']:<10}{r['sign_ops_per_second']:>12}"
+        f"{r['verify_ops_per_second']:>12}{r['sign_from_pem_ops_per_second']:>14}"
+        f"{r['token_size']:>14}"
+        for r in results
+    ]
+    return "\n".join([header, *rows]) + "\n"
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument(
+        "--algorithm",
+        action="append",
+        choices=SUPPORTED_ALGORITHMS,
+        help="Algorithm to benchmark, can be repeated. All by default.",
+    )
+    parser.add_argument("--json", action="store_true", help="Output JSON report.")
+    args = parser.parse_args(argv)
+
+    results = [
+        benchmark_algorithm(algorithm, args.iterations)
+        for algorithm in args.algorithm or SUPPORTED_ALGORITHMS
+    ]
+    if args.json:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+    else:
+        sys.stdout.write(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Drive a concurrent request mix through the real application and report latencies.
+
+Requests go straight to the ASGI ``app`` without a network hop, against the
+Postgres configured in settings. Redis is either an in-memory stand-in or the
+configured Redis (``--real-redis``), the monolith is always a local stub. Background
+workers of the lifespan are not started and rate limits are off unless
+``--rate-limits`` is given. Run with
+
+    python -m app.benchmarks.load [--duration 10] [--concurrency 50]
+        [--mix login=4,refresh=4,register=1,sessions=4] [--output report.json]
+
+Users created for the run are deleted afterwards.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from unittest import mock
+
+import httpx
+from sqlalchemy import delete, select
+
+from app.benchmarks.jwt_algorithms import ensure_jwt_keys
+from app.core.settings import settings
+from app.core.utils.security import generate_hashed_password
+from app.db.redis import close_redis_client, create_redis_client
+from app.db.session import SessionLocal, engine
+from app.external import monolith
+from app.main import app
+from app.models.user import User, UserSession, UserSyncOutbox
+
+OPERATIONS = ("login", "refresh", "register", "sessions")
+DEFAULT_MIX = "login=4,refresh=4,register=1,sessions=4"
+USERNAME_PREFIX = "loadtest"
+PASSWORD = "Load-Test-Pa55!"
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    """Parse ``login=4,refresh=1`` into operation weights."""
+    weights = {}
+    for item in filter(None, mix.split(",")):
+        operation, _, weight = item.partition("=")
+        if operation not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {operation!r}")
+        try:
+            weights[operation] = int(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Wrong weight of {operation!r}")
+    if not any(weights.values()):
+        raise argparse.ArgumentTypeError("At least one operation should have weight")
+    return weights
+
+
+def summarize(latencies: list[float], errors: int, duration: float) -> dict:
+    """Throughput and latency percentiles in milliseconds."""
+    count = len(latencies)
+    summary = {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / duration, 1) if duration else 0.0,
+    }
+    if not latencies:
+        return summary
+    milliseconds = sorted(latency * 1000 for latency in latencies)
+    if count > 1:
+        cut_points = statistics.quantiles(milliseconds, n=100, method="inclusive")
+        p50, p95, p99 = cut_points[49], cut_points[94], cut_points[98]
+    else:
+        p50 = p95 = p99 = milliseconds[0]
+    return {
+        **summary,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "max_ms": round(milliseconds[-1], 2),
+    }
+
+
+def memory_redis() -> mock.AsyncMock:
+    """Stand-in for Redis: every read misses, every write succeeds."""
+    redis = mock.AsyncMock()
+    redis.get.return_value = None
+    redis.zscore.return_value = None
+    redis.evalsha.return_value = [1, 0]
+    pipeline = mock.MagicMock()
+    pipeline.execute = mock.AsyncMock(return_value=[])
+    redis.pipeline = mock.MagicMock()
+    redis.pipeline.return_value.__aenter__.return_value = pipeline
+    return redis
+
+
+def stub_monolith(latency: float) -> httpx.AsyncClient:
+    async def create_user(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(HTTPStatus.CREATED)
+
+    return httpx.AsyncClient(
+        base_url="http://monolith.stub", transport=httpx.MockTransport(create_user)
+    )
+
+
+@dataclass
+class Account:
+    """User taking part in the load test with its current tokens."""
+
+    username: str
+    access_token: str = ""
+    refresh_token: str = ""
+
+
+@dataclass
+class LoadTest:
+    """Concurrent request mix against the in-process application."""
+
+    client: httpx.AsyncClient
+    weights: dict[str, int]
+    accounts: list[Account] = field(default_factory=list)
+    created_usernames: list[str] = field(default_factory=list)
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    async def prepare(self, users: int):
+        hashed_password = await generate_hashed_password(PASSWORD)
+        async with SessionLocal() as db:
+            for _ in range(users):
+                username = self._new_username()
+                db.add(
+                    User(
+                        username=username,
+                        email=f"{username}@example.com",
+                        password=hashed_password,
+                        is_active=True,
+                    )
+                )
+                # One row per flush, batched UUID inserts trip SQLAlchemy with asyncpg.
+                await db.flush()
+                self.accounts.append(Account(username=username))
+            await db.commit()
+        for account in self.accounts:
+            await self.login(account)
+
+    async def run(self, duration: float, concurrency: int) -> float:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(self._worker(deadline) for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    async def login(self, account: Account) -> httpx.Response:
+        response = await self.client.post(
+            "/v1/user/login", json={"username": account.username, "password": PASSWORD}
+        )
+        if response.status_code == HTTPStatus.OK:
+            tokens = response.json()
+            account.access_token = tokens["access_token"]
+            account.refresh_token = tokens["refresh_token"]
+        return response
+
+    async def refresh(self, account: Account) -> httpx.Response:
+        response = await self.client.post(
+            "/v1/token/refresh", json={"refresh_token": account.refresh_token}
+        )
+        if response.status_code == HTTPStatus.CREATED:
+            account.access_token = response.json()["access_token"]
+        return response
+
+    async def register(self, _: Account) -> httpx.Response:
+        username = self._new_username()
+        return await self.client.post(
+            "/v1/user/register",
+            json={
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": PASSWORD,
+            },
+        )
+
+    async def sessions(self, account: Account) -> httpx.Response:
+        return await self.client.get(
+            "/v1/session/", headers={"Authorization": f"Bearer {account.access_token}"}
+        )
+
+    def report(self, duration: float) -> dict:
+        operations = {
+            operation: summarize(
+                self.latencies[operation], self.errors[operation], duration
+            )
+            for operation in self.weights
+        }
+        all_latencies = [
+            latency for latencies in self.latencies.values() for latency in latencies
+        ]
+        return {
+            "duration_s": round(duration, 3),
+            "operations": operations,
+            "total": summarize(all_latencies, sum(self.errors.values()), duration),
+        }
+
+    async def _worker(self, deadline: float):
+        operations, weights = zip(*self.weights.items())
+        while time.perf_counter() < deadline:
+            operation = random.choices(operations, weights)[0]
+            account = random.choice(self.accounts)
+            started = time.perf_counter()
+            try:
+                response = await getattr(self, operation)(account)
+                failed = response.status_code >= HTTPStatus.BAD_REQUEST
+            except Exception:
+                failed = True
+            self.latencies[operation].append(time.perf_counter() - started)
+            self.errors[operation] += failed
+
+    def _new_username(self) -> str:
+        username = f"{USERNAME_PREFIX}{uuid.uuid4().hex[:7]}"
+        self.created_usernames.append(username)
+        return username
+
+
+async def cleanup(usernames: list[str]):
+    async with SessionLocal() as db:
+        user_uuids = select(User.uuid).where(User.username.in_(usernames))
+        for model in (UserSession, UserSyncOutbox):
+            await db.execute(delete(model).where(model.user_uuid.in_(user_uuids)))
+        await db.execute(delete(User).where(User.username.in_(usernames)))
+        await db.commit()
+
+
+async def run_load_test(args: argparse.Namespace) -> dict:
+    ensure_jwt_keys()
+    redis = create_redis_client() if args.real_redis else memory_redis()
+    app.state.redis = redis
+    monolith._client = stub_monolith(args.monolith_latency / 1000)
+    # Few accounts log in over and over, the limits would reject most of the mix.
+    with mock.patch.object(settings, "rate_limit_enabled", args.rate_limits):
+        async with httpx.AsyncClient(app=app, base_url="http://loadtest") as client:
+            load_test = LoadTest(client=client, weights=args.mix)
+            try:
+                await load_test.prepare(args.users)
+                duration = await load_test.run(args.duration, args.concurrency)
+            finally:
+                await cleanup(load_test.created_usernames)
+                await monolith.close_monolith_client()
+                if args.real_redis:
+                    await close_redis_client(redis)
+                await engine.dispose()
+
+    report = load_test.report(duration)
+    report["config"] = {
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "mix": args.mix,
+        "real_redis": args.real_redis,
+        "monolith_latency_ms": args.monolith_latency,
+        "rate_limits": args.rate_limits,
+    }
+    return report
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20, help="Pre-created users.")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument(
+        "--monolith-latency", type=float, default=20.0, help="Stub latency in ms."
+    )
+    parser.add_argument(
+        "--real-redis", action="store_true", help="Use Redis from settings."
+    )
+    parser.add_argument(
+        "--rate-limits", action="store_true", help="Keep rate limits enabled."
+    )
+    parser.add_argument("--output", help="Write JSON report to the file.")
+    args = parser.parse_args(argv)
+
+    report = json.dumps(asyncio.run(run_load_test(args)), indent=2) + "\n"
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report)
+    else:
+        sys.stdout.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,15 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from unittest import mock
 
 import pytest
-from fastapi.testclient import TestClient
 from pydantic import PostgresDsn
 from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy_utils import create_database, database_exists
 
 from app.core.settings import settings
+from app.core.utils.rate_limit import rate_limiter
 from app.core.utils.security import (
     generate_hashed_password,
     generate_jwt_access_token,
@@ -30,51 +31,71 @@ def anyio_backend():
     return "asyncio"
 
 
-@pytest.fixture(scope="session")
-def db_engine() -> Generator:
-    test_db_url = str(
+def _get_test_db_url(scheme: str) -> str:
+    return str(
         PostgresDsn.build(
-            scheme="postgresql",
+            scheme=scheme,
             username=settings.postgres_user,
             password=settings.postgres_password,
             host=settings.postgres_server,
             path="test",
         )
     )
+
+
+@pytest.fixture(scope="session")
+def db_engine() -> Generator:
+    test_db_url = _get_test_db_url("postgresql")
     if not database_exists(test_db_url):
         create_database(test_db_url)
-    test_engine = create_engine(test_db_url, pool_pre_ping=True)
-    BaseTable.metadata.create_all(bind=test_engine)
+    sync_engine = create_engine(test_db_url, pool_pre_ping=True)
+    BaseTable.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    # asyncpg connections are bound to the event loop they were created in, and every
+    # test runs in its own loop, so don't keep connections around between tests.
+    test_engine = create_async_engine(
+        _get_test_db_url("postgresql+asyncpg"), poolclass=NullPool
+    )
 
     yield test_engine
 
 
 @pytest.fixture(scope="function")
-def db(db_engine):
-    connection = db_engine.connect()
-    transaction = connection.begin()
-    db = Session(bind=connection)
+async def db(db_engine) -> AsyncGenerator:
+    connection = await db_engine.connect()
+    transaction = await connection.begin()
+    db = AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
     app.dependency_overrides[get_db] = lambda: db
 
     yield db
 
-    db.close()
-    transaction.rollback()
-    connection.close()
+    await db.close()
+    await transaction.rollback()
+    await connection.close()
 
 
 async def redis_mock():
-    return mock.AsyncMock()
+    redis = mock.AsyncMock()
+    redis.get.return_value = None
+    redis.evalsha.return_value = [1, 0]
+    pipeline = mock.MagicMock()
+    pipeline.execute = mock.AsyncMock(return_value=[])
+    redis.pipeline = mock.MagicMock()
+    redis.pipeline.return_value.__aenter__.return_value = pipeline
+    return redis
 
 
-@pytest.fixture(scope="function")
-def client(db) -> Generator:
-    app.dependency_overrides[get_db] = lambda: db
-    with TestClient(app) as c:
-        yield c
+app.dependency_overrides[get_redis] = redis_mock
 
 
-app.dependency_overrides[get_redis] = redis_mock
+@pytest.fixture
+async def redis():
+    return await redis_mock()
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -86,15 +107,21 @@ def settings_fixture(request):
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_local_rate_limits():
+    """All test requests come from the same IP, start every test with full buckets."""
+    rate_limiter.local_buckets.clear()
+
+
 @pytest.fixture
 async def user(db):
     db_user = User(
         username=TestUser.username,
         email=TestUser.email,
-        password=generate_hashed_password(TestUser.password),
+        password=await generate_hashed_password(TestUser.password),
     )
     db.add(db_user)
-    db.commit()
+    await db.commit()
     return db_user
 
 
@@ -102,7 +129,7 @@ async def user(db):
 async def refresh_token(db, user: User) -> str:
     user_session = UserSession(user=user, ip="127.0.0.1", useragent="pytest")
     db.add(user_session)
-    db.commit()
+    await db.commit()
     return await generate_jwt_refresh_token(user=user, jti=user_session.uuid)
 
 
@@ -110,5 +137,5 @@ async def refresh_token(db, user: User) -> str:
 async def access_token_and_user(db, user: User) -> tuple[str, User]:
     user_session = UserSession(user=user, ip="127.0.0.1", useragent="pytest")
     db.add(user_session)
-    db.commit()
+    await db.commit()
     return await generate_jwt_access_token(user=user, jti=user_session.uuid), user
@@ -1,12 +1,14 @@
 import smtplib
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import boto3
 from pydantic import EmailStr
+from redis.asyncio import Redis
 
 from app.core.settings import settings
-from app.schemas.email_schema import EmailAddress
+from app.schemas.email_schema import EmailAddress, OutboxEmail
 
 
 async def send_email_via_ses(
@@ -49,7 +51,8 @@ async def send_email_via_ses(
     ses.send_email(**email_params)
 
 
-async def send_email(
+async def enqueue_email(
+    redis: Redis,
     sender: EmailStr,
     to: EmailAddress,
     subject: str,
@@ -58,29 +61,98 @@ async def send_email(
     cc: EmailAddress | None = None,
     bcc: EmailAddress | None = None,
 ):
-    """Send email using smtp."""
+    """Put email into the outbox, it will be delivered by the email worker."""
+    email = _make_outbox_email(sender, to, subject, message, html_message, cc, bcc)
+    await redis.xadd(settings.email_outbox_stream, {"payload": email.model_dump_json()})
+
+
+def build_mime_message(email: OutboxEmail) -> MIMEMultipart:
+    mime_message = MIMEMultipart("alternative")
+
+    mime_message["Subject"] = email.subject
+    mime_message["From"] = email.sender
+    mime_message["To"] = ",".join(email.to)
+
+    if email.cc:
+        mime_message["Cc"] = ",".join(email.cc)
+    if email.bcc:
+        mime_message["Bcc"] = ",".join(email.bcc)
+
+    mime_message.attach(MIMEText(email.message, "plain"))
+    if email.html_message:
+        mime_message.attach(MIMEText(email.html_message, "html"))
+    return mime_message
+
+
+class SMTPSession:
+    """SMTP connection kept open between emails and reopened when dropped by server.
+
+    All methods are blocking, so they are expected to be called from a thread.
+    """
+
+    def __init__(self):
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used_at = 0.0
+
+    def send(self, email: OutboxEmail):
+        mime_message = build_mime_message(email).as_string()
+        try:
+            self._connection().sendmail(email.sender, email.to, mime_message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connection().sendmail(email.sender, email.to, mime_message)
+        self._last_used_at = time.monotonic()
+
+    def close_if_idle(self):
+        if (
+            self._smtp
+            and time.monotonic() - self._last_used_at > settings.smtp_idle_timeout
+        ):
+            self.close()
+
+    def close(self):
+        if not self._smtp:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def _connection(self) -> smtplib.SMTP:
+        if not self._smtp:
+            smtp = smtplib.SMTP(settings.smtp_host, settings.smtp_port)
+            try:
+                smtp.starttls()
+                smtp.login(settings.smtp_username, settings.smtp_password)
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+                raise
+            self._smtp = smtp
+        return self._smtp
+
+
+def _make_outbox_email(
+    sender: EmailStr,
+    to: EmailAddress,
+    subject: str,
+    message: str,
+    html_message: str | None = None,
+    cc: EmailAddress | None = None,
+    bcc: EmailAddress | None = None,
+) -> OutboxEmail:
     if isinstance(to, str):
         to = [to]
     if cc and isinstance(cc, str):
         cc = [cc]
     if bcc and isinstance(bcc, str):
         bcc = [bcc]
-    email = MIMEMultipart("alternative")
-
-    email["Subject"] = subject
-    email["From"] = sender
-    email["To"] = ",".join(to)
-
-    if cc:
-        email["Cc"] = ",".join(cc)
-    if bcc:
-        email["Bcc"] = ",".join(bcc)
-
-    email.attach(MIMEText(message, "plain"))
-    if html_message:
-        email.attach(MIMEText(html_message, "html"))
-
-    with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as smtp:
-        smtp.starttls()
-        smtp.login(settings.smtp_username, settings.smtp_password)
-        smtp.sendmail(sender, to, email.as_string())
+    return OutboxEmail(
+        sender=sender,
+        to=to,
+        subject=subject,
+        message=message,
+        html_message=html_message,
+        cc=cc,
+        bcc=bcc,
+    )
@@ -8,6 +8,13 @@ class ConfirmationCodeType(str, Enum):
     telegram = "telegram"
 
 
+class MonolithSyncMode(str, Enum):
+    """Enum for the ways new users are synced to the monolith."""
+
+    inline = "inline"
+    deferred = "deferred"
+
+
 class TokenType(str, Enum):
     """Enum for token types."""
 
@@ -1,3 +1,4 @@
+import math
 from http import HTTPStatus
 
 
@@ -7,6 +8,7 @@ class KapibaraException(Exception):
     status_code: int
     error_type: str
     message: str
+    headers: dict[str, str] | None = None
 
     def __init__(
         self, message: str = None, error_type: str = None, status_code: int = None
@@ -95,6 +97,13 @@ class TokenNotFound(TokenException):
     message = "Пользовательская сессия не найдена."
 
 
+class TokenRevoked(TokenException):
+    """Exception to raise when session of the access token was deleted."""
+
+    error_type = "token_revoked"
+    message = "Сессия завершена, необходима повторная авторизация."
+
+
 class TokenExpired(TokenException):
     """Exception to raise when token is expired."""
 
@@ -124,9 +133,45 @@ class PasswordResetUserNotFound(PasswordResetException):
     message = "Произошла ошибка. Такого юзера нет в системе!"
 
 
+class ServiceOverloaded(KapibaraException):
+    """Exception to raise when there is no capacity left to process the request."""
+
+    status_code = HTTPStatus.SERVICE_UNAVAILABLE
+    error_type = "service_overloaded"
+    message = "Сервис перегружен, попробуйте позже."
+
+
+class SessionRevocationFailed(KapibaraException):
+    """Exception to raise when revoked sessions cannot be stored."""
+
+    status_code = HTTPStatus.SERVICE_UNAVAILABLE
+    error_type = "session_revocation_failed"
+    message = "Не удалось отозвать сессии, попробуйте позже."
+
+
 class NotFound(KapibaraException):
     """Exception to raise when entity not found."""
 
     status_code = HTTPStatus.NOT_FOUND
     error_type = "not_found"
     message = "Объект не найдет."
+
+
+class InvalidCursor(KapibaraException):
+    """Exception to raise when pagination cursor cannot be decoded."""
+
+    status_code = HTTPStatus.BAD_REQUEST
+    error_type = "invalid_cursor"
+    message = "Неверный курсор для постраничного вывода."
+
+
+class TooManyRequests(KapibaraException):
+    """Exception to raise when a client exceeded a rate limit or is locked out."""
+
+    status_code = HTTPStatus.TOO_MANY_REQUESTS
+    error_type = "too_many_requests"
+    message = "Слишком много запросов, повторите попытку позже."
+
+    def __init__(self, retry_after: float):
+        super().__init__()
+        self.headers = {"Retry-After": str(max(math.ceil(retry_after), 1))}
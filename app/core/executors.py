@@ -0,0 +1,98 @@
+import asyncio
+import contextlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+from app.core import metrics
+from app.core.exceptions import ServiceOverloaded
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class ExecutorStats:
+    """Counters describing how busy a ``BoundedExecutor`` is."""
+
+    completed: int = 0
+    rejected: int = 0
+    pending: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    run_seconds_total: float = 0.0
+    run_seconds_max: float = 0.0
+
+
+class BoundedExecutor:
+    """Thread pool for CPU-bound work with a cap on the number of queued jobs.
+
+    When ``max_workers + max_queue_size`` jobs are already in flight, new ones are
+    rejected with ``ServiceOverloaded`` instead of waiting, so that a burst of
+    expensive calls can't delay everything else served by the worker.
+    """
+
+    def __init__(self, *, name: str, max_workers: int, max_queue_size: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.stats = ExecutorStats()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self.stats.pending >= self.max_workers + self.max_queue_size:
+            self.stats.rejected += 1
+            metrics.executor_rejected.labels(self.name).inc()
+            logger.warning(
+                "Executor %s is saturated, %s jobs pending", self.name, self.stats.pending
+            )
+            raise ServiceOverloaded()
+
+        submitted_at = time.perf_counter()
+        timings = {}
+
+        def timed_call():
+            started_at = time.perf_counter()
+            timings["wait"] = started_at - submitted_at
+            try:
+                return func(*args)
+            finally:
+                timings["run"] = time.perf_counter() - started_at
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(timed_call)
+        self.stats.pending += 1
+        metrics.executor_pending.labels(self.name).inc()
+        # A job keeps its thread after the caller is cancelled, so it stays pending
+        # until it is really done rather than until the caller stops waiting.
+        future.add_done_callback(lambda _: self._call_in_loop(loop, timings))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _call_in_loop(self, loop: asyncio.AbstractEventLoop, timings: dict):
+        # Event loop may be closed already, then nobody reads the counters anymore.
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(self._finish, timings)
+
+    def _finish(self, timings: dict):
+        self.stats.pending -= 1
+        metrics.executor_pending.labels(self.name).dec()
+        self._record(timings)
+
+    def _record(self, timings: dict):
+        if "run" not in timings:
+            return
+        self.stats.completed += 1
+        self.stats.wait_seconds_total += timings["wait"]
+        self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, timings["wait"])
+        self.stats.run_seconds_total += timings["run"]
+        self.stats.run_seconds_max = max(self.stats.run_seconds_max, timings["run"])
+        metrics.executor_wait_duration.labels(self.name).observe(timings["wait"])
+        metrics.executor_run_duration.labels(self.name).observe(timings["run"])
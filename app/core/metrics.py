@@ -0,0 +1,180 @@
+"""Prometheus metrics.
+
+With several worker processes set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory shared by the workers before the application starts. Every process then
+writes its samples there and ``/metrics`` served by any worker aggregates all of
+them. The directory must be wiped between deployments.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from sqlalchemy import QueuePool, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Fast operations: JWT, Redis, executor queue.
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+http_request_duration = Histogram(
+    "kapibara_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+errors = Counter(
+    "kapibara_errors_total",
+    "API errors by KapibaraException error type.",
+    ["error_type", "status"],
+)
+executor_wait_duration = Histogram(
+    "kapibara_executor_wait_seconds",
+    "Time jobs spend queued before a BoundedExecutor thread picks them up.",
+    ["executor"],
+    buckets=FAST_BUCKETS,
+)
+executor_run_duration = Histogram(
+    "kapibara_executor_run_seconds",
+    "Time BoundedExecutor jobs run, bcrypt for password hashing.",
+    ["executor"],
+)
+executor_rejected = Counter(
+    "kapibara_executor_rejected_total",
+    "Jobs rejected because the BoundedExecutor queue was full.",
+    ["executor"],
+)
+executor_pending = Gauge(
+    "kapibara_executor_pending",
+    "Jobs queued or running in a BoundedExecutor.",
+    ["executor"],
+    multiprocess_mode="livesum",
+)
+jwt_duration = Histogram(
+    "kapibara_jwt_seconds",
+    "JWT signing and verification time.",
+    ["operation", "algorithm"],
+    buckets=FAST_BUCKETS,
+)
+db_pool_checked_out = Gauge(
+    "kapibara_db_pool_checked_out",
+    "Database connections checked out of the SQLAlchemy pool.",
+    multiprocess_mode="livesum",
+)
+db_pool_overflow = Gauge(
+    "kapibara_db_pool_overflow",
+    "Database connections opened over the SQLAlchemy pool size.",
+    multiprocess_mode="livesum",
+)
+redis_command_duration = Histogram(
+    "kapibara_redis_command_seconds",
+    "Redis command latency, pipelines are reported as PIPELINE.",
+    ["command"],
+    buckets=FAST_BUCKETS,
+)
+monolith_request_duration = Histogram(
+    "kapibara_monolith_request_seconds",
+    "Latency of a single request to the monolith.",
+    ["outcome"],
+)
+monolith_retries = Counter(
+    "kapibara_monolith_retries_total",
+    "Retried requests to the monolith.",
+)
+emails = Counter(
+    "kapibara_emails_total",
+    "Outbox emails by outcome: sent, retried or dead_letter.",
+    ["outcome"],
+)
+
+
+class MetricsMiddleware:
+    """Observe latency of every HTTP request, labelled with the route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            http_request_duration.labels(
+                scope["method"], route.path if route else "unmatched", status
+            ).observe(time.perf_counter() - started)
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline reporting its round trip to ``redis_command_duration``."""
+
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            redis_command_duration.labels("PIPELINE").observe(
+                time.perf_counter() - started
+            )
+
+
+class InstrumentedRedis(Redis):
+    """Redis client reporting latency of every command."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            redis_command_duration.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - started
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Keep pool gauges current on every checkout and checkin of a connection."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+
+    def update_pool_gauges(*_):
+        db_pool_checked_out.set(pool.checkedout())
+        db_pool_overflow.set(max(pool.overflow(), 0))
+
+    event.listen(pool, "checkout", update_pool_gauges)
+    event.listen(pool, "checkin", update_pool_gauges)
+
+
+def generate_metrics() -> tuple[bytes, str]:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,173 @@
+"""Adaptive Sentry trace and profile sampling.
+
+Every transaction is sampled at the base rate of its route,
+``settings.sentry_route_sample_rates`` keyed by route template, or
+``settings.sentry_traces_sample_rate`` for other routes. A request slower than
+``settings.sentry_slow_request_threshold`` or failing with a 5xx status raises the
+rate of its route to ``settings.sentry_boosted_sample_rate`` for
+``settings.sentry_boost_duration`` seconds. Sentry decides before the request is
+handled, so it is the following requests of a misbehaving route that get traced.
+Each worker starts about ``settings.sentry_max_traces_per_second`` traces per
+second at most: once the expected number of sampled traces of the previous second
+exceeds it, rates are scaled down proportionally. Rates are returned to Sentry
+rather than decided here, so that it knows the real rate to extrapolate counts
+with. Traces sampled by the caller are kept whole and do not count towards the cap.
+
+Settings can be overridden by a JSON file at ``settings.sentry_sampling_path``
+with the same keys without the ``sentry_`` prefix, for example
+``{"traces_sample_rate": 0.01, "route_sample_rates": {"/v1/token/refresh": 0.001}}``.
+The file is reloaded when it changes and on SIGHUP.
+"""
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Annotated, Iterable
+
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.routing import BaseRoute, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+Rate = Annotated[float, Field(ge=0, le=1)]
+
+
+class SamplingConfig(BaseModel):
+    """Sampling settings, see the module docstring."""
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    traces_sample_rate: Rate
+    route_sample_rates: dict[str, Rate]
+    slow_request_threshold: float = Field(gt=0)
+    boosted_sample_rate: Rate
+    boost_duration: float = Field(ge=0)
+    max_traces_per_second: float = Field(gt=0)
+    profiles_sample_rate: Rate
+
+    @classmethod
+    def from_settings(cls, **overrides) -> "SamplingConfig":
+        defaults = {
+            name: getattr(settings, f"sentry_{name}") for name in cls.model_fields
+        }
+        return cls(**{**defaults, **overrides})
+
+
+class TraceSampler:
+    """``traces_sampler`` and ``profiles_sampler`` for ``sentry_sdk.init``."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.routes: list[Route] = []
+        self.boosted_until: dict[str, float] = {}
+        self._mtime_ns: int | None = None
+        self._second = 0
+        self._demand = 0.0
+        self._previous_demand = 0.0
+        self.reload()
+
+    def bind(self, routes: Iterable[BaseRoute]):
+        """Routes used to find the route template of a request before it is routed."""
+        self.routes = [route for route in routes if isinstance(route, Route)]
+
+    def traces_sampler(self, sampling_context: dict) -> float:
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            # Keep distributed traces whole, the caller has already decided.
+            return float(parent_sampled)
+        rate = self.rate(self.resolve_route(sampling_context.get("asgi_scope")))
+        return self._cap(rate)
+
+    def profiles_sampler(self, sampling_context: dict) -> float:
+        return self.config.profiles_sample_rate
+
+    def rate(self, route: str | None) -> float:
+        if route is not None and self.boosted_until.get(route, 0.0) > time.monotonic():
+            return self.config.boosted_sample_rate
+        return self.config.route_sample_rates.get(route, self.config.traces_sample_rate)
+
+    def resolve_route(self, scope: Scope | None) -> str | None:
+        if not scope or scope["type"] != "http":
+            return None
+        for route in self.routes:
+            if route.path_regex.match(scope["path"]):
+                return route.path
+        return None
+
+    def observe(self, route: str, duration: float, status: int):
+        """Boost sampling of the route if the request was slow or failed."""
+        if status >= 500 or duration >= self.config.slow_request_threshold:
+            self.boosted_until[route] = time.monotonic() + self.config.boost_duration
+
+    def reload(self):
+        overrides = {}
+        mtime_ns = None
+        if self.path is not None:
+            mtime_ns = self.path.stat().st_mtime_ns
+            overrides = json.loads(self.path.read_text())
+        self.config = SamplingConfig.from_settings(**overrides)
+        self._mtime_ns = mtime_ns
+        logger.info("Loaded Sentry sampling settings %s", self.config)
+
+    def reload_if_changed(self):
+        if self.path is None:
+            return
+        try:
+            if self.path.stat().st_mtime_ns != self._mtime_ns:
+                self.reload()
+        except (OSError, ValueError):
+            logger.exception("Cannot reload Sentry sampling settings from %s", self.path)
+
+    async def watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+
+    def _cap(self, rate: float) -> float:
+        """Scale the rate down if more traces than the cap are expected this second.
+
+        Demand is the sum of uncapped rates, which is the expected number of traces
+        without the cap. The demand of the previous second predicts the current one.
+        """
+        second = int(time.monotonic())
+        if second != self._second:
+            self._previous_demand = self._demand if second == self._second + 1 else 0.0
+            self._demand = 0.0
+            self._second = second
+        self._demand += rate
+        demand = max(self._demand, self._previous_demand)
+        if demand <= self.config.max_traces_per_second:
+            return rate
+        return rate * self.config.max_traces_per_second / demand
+
+
+class SamplingMiddleware:
+    """Report latency and status of every request to ``TraceSampler.observe``."""
+
+    def __init__(self, app: ASGIApp, sampler: TraceSampler):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if route := scope.get("route"):
+                self.sampler.observe(route.path, time.perf_counter() - started, status)
@@ -1,6 +1,35 @@
-from pydantic import PostgresDsn, RedisDsn
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, PostgresDsn, RedisDsn, field_validator
 from pydantic_settings import BaseSettings
 
+from app.core.enums import MonolithSyncMode
+
+
+class JWTVerificationKey(BaseModel):
+    """Previous (or upcoming) public key that is still accepted during rotation."""
+
+    model_config = ConfigDict(frozen=True)
+
+    kid: str
+    algorithm: str
+    public_key: str
+
+
+class RateLimitRule(BaseModel):
+    """Allow ``limit`` requests per ``window`` seconds for every value of ``key``.
+
+    ``ip`` and ``username`` count requests of a client IP or a username, ``route``
+    counts all requests to the route.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    key: Literal["ip", "username", "route"]
+    limit: int
+    window: float
+
 
 class Settings(BaseSettings):
     """Settings for the application derived from environment."""
@@ -17,9 +46,49 @@ class Settings(BaseSettings):
     monolith_host: str | None = None
     monolith_internal_token_header: str | None = None
     monolith_internal_token: str | None = None
+    internal_token_header: str = "X-Internal-Token"
+    internal_token: str | None = None
+    monolith_timeout: float = 5.0
+    monolith_attempt_deadline: float = 10.0
+    monolith_retry_attempts: int = 5
+    monolith_retry_max_delay: float = 30.0
+    monolith_retry_backoff_multiplier: float = 0.2
+    monolith_retry_backoff_max: float = 5.0
+    monolith_max_connections: int = 100
+    monolith_max_keepalive_connections: int = 20
+    monolith_sync_mode: MonolithSyncMode = MonolithSyncMode.inline
+    monolith_sync_batch_size: int = 50
+    monolith_sync_interval: float = 5.0
+    monolith_sync_max_attempts: int = 20
+    monolith_sync_retry_base_delay: int = 10
+    monolith_sync_claim_duration: int = 60
     jwt_algorithm: str = "RS512"
     jwt_rsa_private_key: str | None = None
     jwt_rsa_public_key: str | None = None
+    jwt_key_id: str | None = None
+    jwt_verification_keys: list[JWTVerificationKey] = []
+    jwks_max_age: int = 300
+    token_introspection_max_batch: int = 500
+    forward_auth_cache_ttl: float = 5.0
+    forward_auth_cache_maxsize: int = 10_000
+    session_activity_flush_interval: float = 10.0
+    session_activity_flush_batch_size: int = 500
+    session_activity_min_interval: float = 300.0
+    session_activity_max_pending: int = 100_000
+    session_list_page_size: int = 100
+    session_list_max_page_size: int = 1000
+    revocation_key: str = "revoked-sessions"
+    revocation_channel: str = "revoked-sessions"
+    revocation_filter_capacity: int = 1_000_000
+    revocation_filter_error_rate: float = 0.001
+    revocation_filter_rebuild_interval: float = 3600.0
+    revocation_store_attempts: int = 3
+    revocation_store_retry_delay: float = 0.1
+    session_gc_enabled: bool = True
+    session_gc_interval: float = 3600.0
+    session_gc_chunk_size: int = 1000
+    session_gc_idle_days: int = 90
+    max_sessions_per_user: int | None = 100
     jwt_access_token_lifetime_minutes: int = 5
     jwt_refresh_token_lifetime_days: int = 365
     jwt_issuer: str = "KapibaraAuth"
@@ -29,17 +98,81 @@ class Settings(BaseSettings):
     smtp_password: str | None = None
     smtp_host: str | None = None
     smtp_port: int | None = None
+    smtp_idle_timeout: int = 60
+    email_worker_enabled: bool = True
+    email_outbox_stream: str = "email:outbox"
+    email_outbox_group: str = "email-senders"
+    email_outbox_retry_key: str = "email:outbox:retry"
+    email_outbox_dead_letter_key: str = "email:outbox:dead"
+    email_outbox_batch_size: int = 50
+    email_outbox_block_ms: int = 5000
+    email_outbox_claim_idle_ms: int = 5 * 60 * 1000
+    email_outbox_max_attempts: int = 5
+    email_outbox_retry_base_delay: int = 30
     redis_host: str | None = None
     redis_port: int = 6379
     redis_db: str = "1"
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5.0
+    redis_socket_timeout: float = 2.0
+    redis_socket_connect_timeout: float = 2.0
+    redis_health_check_interval: int = 30
+    user_cache_local_ttl: float = 5.0
+    user_cache_local_maxsize: int = 10_000
+    user_cache_redis_ttl: int = 5 * 60
+    user_cache_invalidation_channel: str = "user-snapshot:invalidate"
     confirmation_code_length: int = 32
     confirmation_code_ttl: int = 15 * 60
     sentry_dsn: str | None = None
+    sentry_traces_sample_rate: float = 0.05
+    sentry_route_sample_rates: dict[str, float] = {}
+    sentry_slow_request_threshold: float = 1.0
+    sentry_boosted_sample_rate: float = 1.0
+    sentry_boost_duration: float = 60.0
+    sentry_max_traces_per_second: float = 10.0
+    sentry_profiles_sample_rate: float = 0.1
+    sentry_sampling_path: Path | None = None
+    sentry_sampling_reload_interval: float = 30.0
     username_min_length: int = 4
     username_max_length: int = 15
     username_allowed_chars_pattern: str = r"^[a-zA-Z0-9.\-_]+$"
+    username_blocklist_path: Path = (
+        Path(__file__).resolve().parent / "data" / "usernames-blacklist.txt"
+    )
+    username_blocklist_reload_interval: float = 30.0
     password_min_length: int = 4
     password_max_similarity: float = 0.7
+    breached_passwords_path: Path | None = None
+    password_hashing_workers: int = 2
+    password_hashing_queue_size: int = 32
+    rate_limit_enabled: bool = True
+    rate_limit_key_prefix: str = "rate-limit"
+    rate_limit_local_maxsize: int = 10_000
+    rate_limits: dict[str, list[RateLimitRule]] = {
+        "login": [
+            RateLimitRule(key="ip", limit=30, window=60),
+            RateLimitRule(key="username", limit=10, window=60),
+            RateLimitRule(key="route", limit=500, window=1),
+        ],
+        "register": [
+            RateLimitRule(key="ip", limit=20, window=3600),
+            RateLimitRule(key="route", limit=50, window=1),
+        ],
+        "password_confirm": [
+            RateLimitRule(key="ip", limit=20, window=60),
+            RateLimitRule(key="route", limit=100, window=1),
+        ],
+    }
+    login_lockout_threshold: int = 5
+    login_lockout_window: float = 15 * 60
+    login_lockout_base_duration: float = 30.0
+    login_lockout_max_duration: float = 60 * 60
+
+    @field_validator("sentry_sampling_path", "breached_passwords_path", mode="before")
+    @classmethod
+    def empty_path_to_none(cls, value):
+        # An empty variable would otherwise become Path("."), the current directory.
+        return value or None
 
 
 settings = Settings()
@@ -57,6 +190,18 @@ def get_db_url() -> str:
     )
 
 
+def get_async_db_url() -> str:
+    return str(
+        PostgresDsn.build(
+            scheme="postgresql+asyncpg",
+            username=settings.postgres_user,
+            password=settings.postgres_password,
+            host=settings.postgres_server,
+            path=settings.postgres_db,
+        )
+    )
+
+
 def get_redis_url() -> str:
     return str(
         RedisDsn.build(
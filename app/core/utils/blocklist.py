@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Lines starting with this prefix forbid only the whole username, not its substrings.
+EXACT_MATCH_PREFIX = "="
+
+
+class _Automaton(NamedTuple):
+    """Aho-Corasick automaton stored as flat lists indexed by node number."""
+
+    goto: list[dict[str, int]]
+    fail: list[int]
+    depth: list[int]
+    substring_match: list[bool]
+    exact_match: list[bool]
+
+    @classmethod
+    def build(cls, substrings: Iterable[str], exact: Iterable[str]) -> "_Automaton":
+        automaton = cls(
+            goto=[{}], fail=[0], depth=[0], substring_match=[False], exact_match=[False]
+        )
+        for pattern in substrings:
+            automaton.substring_match[automaton._insert(pattern)] = True
+        for pattern in exact:
+            automaton.exact_match[automaton._insert(pattern)] = True
+        automaton._link_failures()
+        return automaton
+
+    def matches(self, text: str) -> bool:
+        """Check if ``text`` contains any substring pattern or equals an exact one."""
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            if self.substring_match[node]:
+                return True
+        return self.exact_match[node] and self.depth[node] == len(text)
+
+    def _insert(self, pattern: str) -> int:
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.depth.append(self.depth[node] + 1)
+                self.substring_match.append(False)
+                self.exact_match.append(False)
+                self.goto[node][char] = next_node
+            node = next_node
+        return node
+
+    def _link_failures(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.substring_match[self.fail[child]]:
+                    self.substring_match[child] = True
+
+
+class UsernameBlocklist:
+    """Usernames forbidden to register.
+
+    Patterns are read from a file with one pattern per line. A username is blocked if
+    it contains any of the patterns, or equals a pattern prefixed with ``=``. Lines
+    starting with ``#`` are ignored. The file is compiled into an Aho-Corasick
+    automaton, so every check is a single pass over the username without disk access.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._mtime_ns: int | None = None
+        self._automaton = _Automaton.build([], [])
+        self.reload()
+
+    def is_blocked(self, username: str) -> bool:
+        return self._automaton.matches(username.lower().strip())
+
+    def reload(self):
+        mtime_ns = self.path.stat().st_mtime_ns
+        substrings, exact = [], []
+        with open(self.path) as f:
+            for line in f:
+                pattern = line.strip().lower()
+                if not pattern or pattern.startswith("#"):
+                    continue
+                if pattern.startswith(EXACT_MATCH_PREFIX):
+                    exact.append(pattern.removeprefix(EXACT_MATCH_PREFIX).strip())
+                else:
+                    substrings.append(pattern)
+        # Swap the whole automaton at once, so checks never see a half built one.
+        self._automaton = _Automaton.build(substrings, exact)
+        self._mtime_ns = mtime_ns
+        logger.info(
+            "Loaded %s username blocklist patterns from %s",
+            len(substrings) + len(exact),
+            self.path,
+        )
+
+    def reload_if_changed(self):
+        try:
+            if self.path.stat().st_mtime_ns != self._mtime_ns:
+                self.reload()
+        except OSError:
+            logger.exception("Cannot reload username blocklist from %s", self.path)
+
+    async def watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
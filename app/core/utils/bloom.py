@@ -0,0 +1,65 @@
+import hashlib
+import math
+import mmap
+import struct
+from pathlib import Path
+
+# Magic, bit count and hash count, followed by the bits.
+FILE_HEADER = struct.Struct("<8sQI")
+FILE_MAGIC = b"KBLOOM01"
+
+
+class BloomFilter:
+    """Fixed size Bloom filter.
+
+    Membership test never gives false negatives, false positives happen with roughly
+    ``error_rate`` probability while the filter holds up to ``capacity`` items.
+    """
+
+    def __init__(self, *, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    @classmethod
+    def open(cls, path: Path) -> "BloomFilter":
+        """Memory-map a filter written by ``save`` read-only.
+
+        Pages are loaded lazily and shared by every process mapping the same file.
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < FILE_HEADER.size:
+            mapped.close()
+            raise ValueError(f"{path} is not a Bloom filter file")
+        magic, size, hash_count = FILE_HEADER.unpack_from(mapped)
+        if magic != FILE_MAGIC or len(mapped) != FILE_HEADER.size + math.ceil(size / 8):
+            mapped.close()
+            raise ValueError(f"{path} is not a Bloom filter file")
+        bloom_filter = cls.__new__(cls)
+        bloom_filter.size = size
+        bloom_filter.hash_count = hash_count
+        bloom_filter.bits = memoryview(mapped)[FILE_HEADER.size :]
+        return bloom_filter
+
+    def save(self, path: Path):
+        with open(path, "wb") as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, self.size, self.hash_count))
+            f.write(self.bits)
+
+    def add(self, item: bytes):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def _positions(self, item: bytes):
+        # Kirsch-Mitzenmacher: k positions from two halves of a single digest.
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
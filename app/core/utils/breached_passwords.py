@@ -0,0 +1,78 @@
+"""Offline check of passwords against a breached passwords corpus.
+
+The corpus is compiled into a Bloom filter file of SHA-1 digests of the passwords,
+which takes about 1.8 bytes per password at the default error rate. Every worker
+memory-maps the file read-only, so the workers of a host share the same pages
+and no worker keeps its own copy of the list. Build the file with
+
+    python -m app.core.utils.breached_passwords passwords.txt breached.bloom
+        [--format plain|sha1] [--error-rate 0.001]
+
+``plain`` lists have a password per line, ``sha1`` lists have a hex digest per
+line optionally followed by ``:count``, like Have I Been Pwned downloads. Then set
+``settings.breached_passwords_path`` to the built file.
+"""
+import argparse
+import hashlib
+import logging
+import sys
+from pathlib import Path
+from typing import Iterator
+
+from app.core.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class BreachedPasswords:
+    """Breached passwords Bloom filter, every check passes without a filter file."""
+
+    def __init__(self, path: Path | None):
+        self.filter = BloomFilter.open(path) if path else None
+        if self.filter:
+            logger.info("Loaded breached passwords filter from %s", path)
+
+    def __contains__(self, password: str) -> bool:
+        if self.filter is None:
+            return False
+        return hashlib.sha1(password.encode()).digest() in self.filter
+
+
+def read_digests(path: Path, sha1: bool) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            if sha1:
+                yield bytes.fromhex(line.split(b":", 1)[0].decode())
+            else:
+                yield hashlib.sha1(line).digest()
+
+
+def build(source: Path, sha1: bool, error_rate: float) -> BloomFilter:
+    capacity = sum(1 for _ in read_digests(source, sha1))
+    bloom_filter = BloomFilter(capacity=max(capacity, 1), error_rate=error_rate)
+    for digest in read_digests(source, sha1):
+        bloom_filter.add(digest)
+    return bloom_filter
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="Breached passwords list.")
+    parser.add_argument("output", type=Path, help="Bloom filter file to write.")
+    parser.add_argument("--format", choices=("plain", "sha1"), default="plain")
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    bloom_filter = build(args.source, args.format == "sha1", args.error_rate)
+    bloom_filter.save(args.output)
+    sys.stdout.write(
+        f"Wrote {bloom_filter.size // 8} bytes, {bloom_filter.hash_count} hashes "
+        f"to {args.output}\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import base64
+import functools
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from jwt import DecodeError, PyJWS
+
+from app.core.settings import JWTVerificationKey, settings
+
+# RFC 7638, members of the JWK that take part in the thumbprint.
+THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    """Parsed key together with the algorithm and key id it is used with."""
+
+    kid: str | None
+    algorithm: str
+    key: Any
+
+
+@functools.lru_cache(maxsize=8)
+def _prepare_jwt_key(algorithm: str, key: str):
+    """Parse the key once, otherwise PyJWT parses PEM for every token."""
+    return PyJWS().get_algorithm_by_name(algorithm).prepare_key(key)
+
+
+def _is_asymmetric(algorithm: str) -> bool:
+    return not algorithm.startswith("HS")
+
+
+def _public_jwk(algorithm: str, public_key: str) -> dict:
+    jwk_algorithm = PyJWS().get_algorithm_by_name(algorithm)
+    return jwk_algorithm.to_jwk(_prepare_jwt_key(algorithm, public_key), as_dict=True)
+
+
+@functools.lru_cache(maxsize=8)
+def _thumbprint(algorithm: str, public_key: str) -> str:
+    jwk = _public_jwk(algorithm, public_key)
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _current_key_id() -> str | None:
+    if settings.jwt_key_id:
+        return settings.jwt_key_id
+    # Symmetric secret is never published, so there is nothing to identify it by.
+    if not _is_asymmetric(settings.jwt_algorithm):
+        return None
+    return _thumbprint(settings.jwt_algorithm, settings.jwt_rsa_public_key)
+
+
+def get_signing_key() -> JWTKey:
+    return _get_signing_key(
+        settings.jwt_algorithm, settings.jwt_rsa_private_key, _current_key_id()
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _get_signing_key(algorithm: str, private_key: str, kid: str | None) -> JWTKey:
+    return JWTKey(
+        kid=kid, algorithm=algorithm, key=_prepare_jwt_key(algorithm, private_key)
+    )
+
+
+def get_verification_keys() -> dict[str | None, JWTKey]:
+    """Keys accepted for verification by ``kid``.
+
+    Tokens without ``kid`` were issued before key ids were introduced and are
+    verified with the current key.
+    """
+    return _get_verification_keys(
+        settings.jwt_algorithm,
+        settings.jwt_rsa_public_key,
+        _current_key_id(),
+        tuple(settings.jwt_verification_keys),
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _get_verification_keys(
+    algorithm: str,
+    public_key: str,
+    kid: str | None,
+    extra_keys: tuple[JWTVerificationKey, ...],
+) -> dict[str | None, JWTKey]:
+    current = JWTKey(
+        kid=kid, algorithm=algorithm, key=_prepare_jwt_key(algorithm, public_key)
+    )
+    keys = {
+        extra.kid: JWTKey(
+            kid=extra.kid,
+            algorithm=extra.algorithm,
+            key=_prepare_jwt_key(extra.algorithm, extra.public_key),
+        )
+        for extra in extra_keys
+    }
+    keys[kid] = current
+    keys[None] = current
+    return keys
+
+
+def get_verification_key(kid: str | None) -> JWTKey:
+    try:
+        return get_verification_keys()[kid]
+    except KeyError:
+        raise DecodeError(f"Unknown key id {kid!r}")
+
+
+def get_jwks() -> dict:
+    """JSON Web Key Set with every public key that is accepted for verification."""
+    return _get_jwks(
+        settings.jwt_algorithm,
+        settings.jwt_rsa_public_key,
+        _current_key_id(),
+        tuple(settings.jwt_verification_keys),
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _get_jwks(
+    algorithm: str,
+    public_key: str,
+    kid: str | None,
+    extra_keys: tuple[JWTVerificationKey, ...],
+) -> dict:
+    published = [(kid, algorithm, public_key)] + [
+        (extra.kid, extra.algorithm, extra.public_key) for extra in extra_keys
+    ]
+    return {
+        "keys": [
+            {
+                **_public_jwk(key_algorithm, key),
+                "kid": key_id,
+                "alg": key_algorithm,
+                "use": "sig",
+            }
+            for key_id, key_algorithm, key in published
+            if key_id and _is_asymmetric(key_algorithm)
+        ]
+    }
@@ -0,0 +1,23 @@
+import base64
+import datetime
+import uuid
+
+from app.core.exceptions import InvalidCursor
+
+
+def encode_session_cursor(
+    last_activity: datetime.datetime, session_uuid: uuid.UUID
+) -> str:
+    """Opaque cursor pointing at the last session of a page."""
+    raw = f"{last_activity.isoformat()}|{session_uuid}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_session_cursor(cursor: str) -> tuple[datetime.datetime, uuid.UUID]:
+    try:
+        last_activity, session_uuid = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        )
+        return datetime.datetime.fromisoformat(last_activity), uuid.UUID(session_uuid)
+    except ValueError:
+        raise InvalidCursor()
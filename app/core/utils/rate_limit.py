@@ -0,0 +1,181 @@
+import hashlib
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import NoScriptError, RedisError
+
+from app.core.settings import RateLimitRule, settings
+from app.core.utils.cache import TTLCache
+from app.core.utils.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one counter prefix per limit, then an optional lockout key.
+# ARGV: number of limits, then limit and window in ms of every limit.
+# Returns {1, 0} when allowed, {0, retry after ms} otherwise.
+#
+# Sliding window counter: the count of the previous fixed window is weighted by the
+# part of it still covered by the sliding window. Counters of every window are
+# keyed by the prefix and the window number, which is why the script needs a single
+# Redis rather than a cluster.
+CHECK_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local limits = tonumber(ARGV[1])
+if #KEYS > limits then
+    local locked_ms = redis.call('PTTL', KEYS[limits + 1])
+    if locked_ms > 0 then
+        return {0, locked_ms}
+    end
+end
+local counters = {}
+for i = 1, limits do
+    local limit = tonumber(ARGV[i * 2])
+    local window = tonumber(ARGV[i * 2 + 1])
+    local number = math.floor(now_ms / window)
+    local elapsed = now_ms - number * window
+    local previous = tonumber(redis.call('GET', KEYS[i] .. ':' .. (number - 1)) or 0)
+    local current = tonumber(redis.call('GET', KEYS[i] .. ':' .. number) or 0)
+    local excess = previous * (window - elapsed) / window + current + 1 - limit
+    if excess > 0 then
+        local retry_ms = window - elapsed
+        if previous > 0 then
+            retry_ms = math.min(retry_ms, math.ceil(excess * window / previous))
+        end
+        return {0, retry_ms}
+    end
+    counters[i] = KEYS[i] .. ':' .. number
+end
+for i = 1, limits do
+    redis.call('INCR', counters[i])
+    redis.call('PEXPIRE', counters[i], ARGV[i * 2 + 1] * 2)
+end
+return {1, 0}
+"""
+
+# KEYS: failures counter, lockout key.
+# ARGV: threshold, failures window ms, base lockout ms, max lockout ms.
+# Returns lockout duration in ms, 0 if the threshold is not reached.
+FAILURE_SCRIPT = """
+local failures = redis.call('INCR', KEYS[1])
+local threshold = tonumber(ARGV[1])
+local lockout_ms = 0
+if failures >= threshold then
+    lockout_ms = math.floor(
+        math.min(tonumber(ARGV[3]) * 2 ^ (failures - threshold), tonumber(ARGV[4]))
+    )
+    redis.call('SET', KEYS[2], failures, 'PX', lockout_ms)
+end
+redis.call('PEXPIRE', KEYS[1], math.max(tonumber(ARGV[2]), lockout_ms))
+return lockout_ms
+"""
+
+SCRIPT_SHAS = {
+    script: hashlib.sha1(script.encode()).hexdigest()
+    for script in (CHECK_SCRIPT, FAILURE_SCRIPT)
+}
+
+
+class RateLimiter:
+    """Sliding window rate limits shared by all workers through Redis.
+
+    All limits of a request and the lockout of its username are checked by a single
+    Lua script call. Every worker also keeps token buckets for the recently used
+    keys, so a client flooding a single worker is rejected without a round trip to
+    Redis. The buckets only reject clients which are over the shared limit already.
+    """
+
+    def __init__(self):
+        self.local_buckets: TTLCache[TokenBucket] = TTLCache(
+            maxsize=settings.rate_limit_local_maxsize, ttl=60
+        )
+
+    async def check(
+        self,
+        redis: Redis,
+        limits: list[tuple[str, RateLimitRule]],
+        lockout_key: str | None = None,
+    ) -> float:
+        """Count the request, returns seconds to wait if it must be rejected."""
+        if not settings.rate_limit_enabled:
+            return 0.0
+        for key, rule in limits:
+            if retry_after := self._check_local(key, rule):
+                return retry_after
+        keys = [key for key, _ in limits]
+        args = [len(limits)]
+        for _, rule in limits:
+            args += [rule.limit, int(rule.window * 1000)]
+        if lockout_key:
+            keys.append(lockout_key)
+        try:
+            allowed, retry_after_ms = await self._eval(redis, CHECK_SCRIPT, keys, args)
+        except RedisError:
+            # Better to let clients in than to lock everybody out with Redis.
+            logger.exception("Cannot check rate limits of %s", keys)
+            return 0.0
+        return 0.0 if allowed else retry_after_ms / 1000
+
+    async def record_failure(self, redis: Redis, username: str):
+        """Count a failed login, lock the username out after too many of them.
+
+        Every failure over ``settings.login_lockout_threshold`` doubles the lockout.
+        """
+        if not settings.rate_limit_enabled:
+            return
+        keys = [failures_key(username), lockout_key(username)]
+        args = [
+            settings.login_lockout_threshold,
+            int(settings.login_lockout_window * 1000),
+            int(settings.login_lockout_base_duration * 1000),
+            int(settings.login_lockout_max_duration * 1000),
+        ]
+        try:
+            lockout_ms = await self._eval(redis, FAILURE_SCRIPT, keys, args)
+        except RedisError:
+            logger.exception("Cannot record failed login of %s", username)
+            return
+        if lockout_ms:
+            logger.warning("Locked out %s for %s ms", username, lockout_ms)
+
+    async def reset_failures(self, redis: Redis, username: str):
+        if not settings.rate_limit_enabled:
+            return
+        try:
+            await redis.delete(failures_key(username))
+        except RedisError:
+            logger.exception("Cannot reset failed logins of %s", username)
+
+    def _check_local(self, key: str, rule: RateLimitRule) -> float:
+        bucket = self.local_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate=rule.limit / rule.window, capacity=rule.limit)
+        # A bucket unused for a window is full again, forgetting it changes nothing.
+        self.local_buckets.set(key, bucket, ttl=rule.window)
+        if bucket.consume():
+            return 0.0
+        return (1 - bucket.tokens) / bucket.rate
+
+    @staticmethod
+    async def _eval(redis: Redis, script: str, keys: list[str], args: list):
+        try:
+            return await redis.evalsha(SCRIPT_SHAS[script], len(keys), *keys, *args)
+        except NoScriptError:
+            # EVAL caches the script, so the next EVALSHA finds it.
+            return await redis.eval(script, len(keys), *keys, *args)
+
+
+def limit_key(route: str, rule: RateLimitRule, value: str) -> str:
+    # Window is a part of the key, so several limits of the same kind can coexist.
+    return f"{settings.rate_limit_key_prefix}:{route}:{rule.key}:{rule.window:g}:{value}"
+
+
+def lockout_key(username: str) -> str:
+    return f"{settings.rate_limit_key_prefix}:lockout:{username.strip().lower()}"
+
+
+def failures_key(username: str) -> str:
+    return f"{settings.rate_limit_key_prefix}:failures:{username.strip().lower()}"
+
+
+rate_limiter = RateLimiter()
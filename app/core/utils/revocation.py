@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Iterable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from app.core.exceptions import SessionRevocationFailed
+from app.core.settings import settings
+from app.core.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRevocationList:
+    """Sessions whose access tokens must be rejected before they expire.
+
+    Redis sorted set ``settings.revocation_key`` is the source of truth, members are
+    session uuids scored by the time their last access token expires. Every worker
+    mirrors it into an in-process Bloom filter, so that checking a token which was
+    not revoked costs no network round trip. Only filter hits are confirmed in Redis.
+    New revocations are broadcast over pub/sub, the filter is rebuilt from Redis
+    periodically to forget expired ones.
+    """
+
+    def __init__(self):
+        self.filter = self._new_filter()
+        self.rebuild_at = 0.0
+
+    async def revoke(self, redis: Redis, session_uuids: Iterable[uuid.UUID | str]):
+        members = [str(session_uuid) for session_uuid in session_uuids]
+        if not members:
+            return
+        now = time.time()
+        expires_at = now + settings.jwt_access_token_lifetime_minutes * 60
+        for member in members:
+            self.filter.add(member.encode())
+        try:
+            await self._store(redis, members, expires_at, now)
+        except RedisError:
+            # Filter hits are confirmed in Redis, so the revocation is not in effect.
+            logger.exception("Cannot store revoked sessions %s", members)
+            raise SessionRevocationFailed()
+
+    async def is_revoked(self, redis: Redis, session_uuid: uuid.UUID | str) -> bool:
+        member = str(session_uuid)
+        if member.encode() not in self.filter:
+            return False
+        try:
+            expires_at = await redis.zscore(settings.revocation_key, member)
+        except RedisError:
+            logger.exception("Cannot check if session %s is revoked", member)
+            # Filter hits are almost always real revocations, fail closed.
+            return True
+        return expires_at is not None and expires_at > time.time()
+
+    async def listen(self, redis: Redis):
+        """Keep the filter in sync with revocations made by other workers."""
+        while True:
+            try:
+                async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(settings.revocation_channel)
+                    # Subscribed first, so nothing revoked during the load is missed.
+                    await self.rebuild(redis)
+                    await self._consume_revocations(redis, pubsub)
+            except (RedisError, OSError):
+                logger.exception("Session revocation listener failed")
+                await asyncio.sleep(1)
+
+    async def rebuild(self, redis: Redis):
+        revocation_filter = self._new_filter()
+        members = await redis.zrangebyscore(settings.revocation_key, time.time(), "+inf")
+        for member in members:
+            revocation_filter.add(member)
+        self.filter = revocation_filter
+        self.rebuild_at = time.monotonic() + settings.revocation_filter_rebuild_interval
+        logger.debug("Loaded %s revoked sessions", len(members))
+
+    async def _consume_revocations(self, redis: Redis, pubsub):
+        while True:
+            message = await pubsub.get_message(timeout=1.0)
+            if message:
+                for member in message["data"].split(b","):
+                    self.filter.add(member)
+            if time.monotonic() >= self.rebuild_at:
+                await self.rebuild(redis)
+
+    @staticmethod
+    @retry(
+        retry=retry_if_exception_type(RedisError),
+        stop=stop_after_attempt(settings.revocation_store_attempts),
+        wait=wait_exponential(multiplier=settings.revocation_store_retry_delay),
+        reraise=True,
+    )
+    async def _store(redis: Redis, members: list[str], expires_at: float, now: float):
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(settings.revocation_key, dict.fromkeys(members, expires_at))
+            pipe.zremrangebyscore(settings.revocation_key, "-inf", now)
+            pipe.publish(settings.revocation_channel, ",".join(members))
+            await pipe.execute()
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter(
+            capacity=settings.revocation_filter_capacity,
+            error_rate=settings.revocation_filter_error_rate,
+        )
+
+
+session_revocations = SessionRevocationList()
@@ -2,42 +2,79 @@ import datetime
 import logging
 import secrets
 import uuid
-from pathlib import Path
-from smtplib import SMTPException
 
 import bcrypt
 import jwt
 from fastapi import Request
 from jwt import DecodeError, ExpiredSignatureError, MissingRequiredClaimError
 from redis.asyncio import Redis
-from sqlalchemy.exc import DataError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.email import send_email
+from app.core import metrics
+from app.core.email import enqueue_email
 from app.core.enums import ConfirmationCodeType, TokenType
 from app.core.exceptions import TokenExpired, TokenInvalid, TokenNotFound, WrongTokenType
+from app.core.executors import BoundedExecutor
 from app.core.settings import settings
+from app.core.utils.blocklist import UsernameBlocklist
+from app.core.utils.breached_passwords import BreachedPasswords
 from app.core.utils.email import get_email_contents
+from app.core.utils.jwt_keys import get_signing_key, get_verification_key
+from app.core.utils.session_activity import session_activity_buffer
 from app.crud import crud_user_session
 from app.models.user import User
-from app.schemas.response_schema import AccessToken, RefreshToken, Token
+from app.schemas.response_schema import (
+    AccessToken,
+    RefreshToken,
+    Token,
+    TokenIntrospection,
+)
 from app.schemas.security_schema import ConfirmationCodeData
 
 logger = logging.getLogger(__name__)
 
+username_blocklist = UsernameBlocklist(settings.username_blocklist_path)
+breached_passwords = BreachedPasswords(settings.breached_passwords_path)
 
-def generate_hashed_password(plain_password: str | bytes) -> str:
+password_hashing_executor = BoundedExecutor(
+    name="password-hashing",
+    max_workers=settings.password_hashing_workers,
+    max_queue_size=settings.password_hashing_queue_size,
+)
+
+
+async def generate_hashed_password(plain_password: str | bytes) -> str:
+    """Hash password with bcrypt outside of the event loop."""
     if isinstance(plain_password, str):
         plain_password = plain_password.encode()
-    return bcrypt.hashpw(plain_password, bcrypt.gensalt()).decode()
+    hashed_password = await password_hashing_executor.run(
+        bcrypt.hashpw, plain_password, bcrypt.gensalt()
+    )
+    return hashed_password.decode()
 
 
-def check_password(plain_password: str | bytes, hashed_password: str | bytes) -> bool:
+async def check_password(
+    plain_password: str | bytes, hashed_password: str | bytes
+) -> bool:
+    """Check password against bcrypt hash outside of the event loop."""
     if isinstance(plain_password, str):
         plain_password = plain_password.encode()
     if isinstance(hashed_password, str):
         hashed_password = hashed_password.encode()
-    return bcrypt.checkpw(plain_password, hashed_password)
+    return await password_hashing_executor.run(
+        bcrypt.checkpw, plain_password, hashed_password
+    )
+
+
+def _encode_token(payload: dict) -> str:
+    signing_key = get_signing_key()
+    with metrics.jwt_duration.labels("sign", signing_key.algorithm).time():
+        return jwt.encode(
+            payload=payload,
+            key=signing_key.key,
+            algorithm=signing_key.algorithm,
+            headers={"kid": signing_key.kid} if signing_key.kid else None,
+        )
 
 
 async def generate_jwt_access_token(user: User, jti: str | uuid.UUID = None) -> str:
@@ -52,11 +89,7 @@ async def generate_jwt_access_token(user: User, jti: str | uuid.UUID = None) ->
         user_id=str(user.uuid),
         is_active=user.is_active,
     )
-    return jwt.encode(
-        payload=token.model_dump(),
-        key=settings.jwt_rsa_private_key,
-        algorithm=settings.jwt_algorithm,
-    )
+    return _encode_token(token.model_dump())
 
 
 async def generate_jwt_refresh_token(*, user: User, jti: str | uuid.UUID = None) -> str:
@@ -71,28 +104,30 @@ async def generate_jwt_refresh_token(*, user: User, jti: str | uuid.UUID = None)
         jti=str(jti),
         user_id=str(user.uuid),
     )
-    return jwt.encode(
-        payload=token.model_dump(),
-        key=settings.jwt_rsa_private_key,
-        algorithm=settings.jwt_algorithm,
-    )
+    return _encode_token(token.model_dump())
 
 
 async def decode_token(token: str) -> Token:
-    return Token(
-        **jwt.decode(
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except jwt.InvalidTokenError as e:
+        # Header errors like a non-string kid must be handled as any bad token.
+        raise DecodeError(str(e)) from e
+    verification_key = get_verification_key(kid)
+    with metrics.jwt_duration.labels("verify", verification_key.algorithm).time():
+        payload = jwt.decode(
             jwt=token,
-            key=settings.jwt_rsa_public_key,
-            algorithms=[settings.jwt_algorithm],
+            key=verification_key.key,
+            algorithms=[verification_key.algorithm],
             audience=settings.jwt_audience,
             issuer=settings.jwt_issuer,
             options={"require": ["exp", "iss", "aud", "jti", "user_id"]},
         )
-    )
+    return Token(**payload)
 
 
 async def refresh_access_token(  # noqa: C901
-    db: Session,
+    db: AsyncSession,
     refresh_token: str,
     request: Request | None = None,
     user_agent: str | None = None,
@@ -120,27 +155,69 @@ async def refresh_access_token(  # noqa: C901
         raise TokenInvalid()
 
     try:
-        user_session = await crud_user_session.get_user_session_by_uuid(
-            db, user_session_uuid
-        )
-    except DataError:
+        user_session_uuid = uuid.UUID(user_session_uuid)
+    except ValueError:
         logger.info("Not valid jti claim format in refresh token %s", refresh_token)
         raise TokenNotFound()
 
+    user_session = await crud_user_session.get_user_session_by_uuid(db, user_session_uuid)
+
     if not user_session:
         logger.info("Can't find user session from refresh token %s", refresh_token)
         raise TokenNotFound()
 
-    if request:
-        user_session.ip = request.client.host
-    if user_agent:
-        user_session.useragent = user_agent
-    user_session.last_activity = datetime.datetime.now()
-    db.commit()
+    session_activity_buffer.record(
+        user_session.uuid,
+        ip=request.client.host if request else None,
+        useragent=user_agent,
+        last_activity=datetime.datetime.now(),
+    )
 
     return await generate_jwt_access_token(user=user_session.user, jti=user_session_uuid)
 
 
+async def _decode_for_introspection(
+    token: str,
+) -> tuple[Token, uuid.UUID] | TokenIntrospection:
+    try:
+        claims = await decode_token(token)
+        if claims.token_type != TokenType.access.value:
+            return TokenIntrospection(active=False, error=WrongTokenType.error_type)
+        return claims, uuid.UUID(claims.jti)
+    except ExpiredSignatureError:
+        return TokenIntrospection(active=False, error=TokenExpired.error_type)
+    except (jwt.InvalidTokenError, ValueError):
+        return TokenIntrospection(active=False, error=TokenInvalid.error_type)
+
+
+async def introspect_tokens(
+    db: AsyncSession, tokens: list[str]
+) -> list[TokenIntrospection]:
+    """Check a batch of tokens, sessions of all of them are looked up in one query."""
+    decoded = [await _decode_for_introspection(token) for token in tokens]
+    existing_session_uuids = await crud_user_session.get_existing_user_session_uuids(
+        db, {item[1] for item in decoded if isinstance(item, tuple)}
+    )
+    results = []
+    for item in decoded:
+        if isinstance(item, TokenIntrospection):
+            results.append(item)
+            continue
+        claims, session_uuid = item
+        if session_uuid in existing_session_uuids:
+            results.append(TokenIntrospection(active=True, claims=claims))
+        else:
+            results.append(
+                TokenIntrospection(
+                    active=False,
+                    revoked=True,
+                    error=TokenNotFound.error_type,
+                    claims=claims,
+                )
+            )
+    return results
+
+
 async def generate_and_email_confirmation_code(redis: Redis, user: User):
     code = await generate_confirmation_code(
         redis, user, code_type=ConfirmationCodeType.email
@@ -152,19 +229,14 @@ async def generate_and_email_confirmation_code(redis: Redis, user: User):
             "user": user,
         },
     )
-    try:
-        await send_email(
-            sender=settings.default_email_from,
-            to=user.email,
-            subject=email_content.subject,
-            message=email_content.message,
-            html_message=email_content.html_message,
-        )
-    except SMTPException:
-        # Ok, what we can do here. Let's not fail user registration at least.
-        # This will get logged to sentry and should be alerting us, so that we can
-        # help user manually activate their account.
-        logger.exception("Cannot send confirmation email to a user %s", user.username)
+    await enqueue_email(
+        redis,
+        sender=settings.default_email_from,
+        to=user.email,
+        subject=email_content.subject,
+        message=email_content.message,
+        html_message=email_content.html_message,
+    )
 
 
 async def generate_confirmation_code(
@@ -198,10 +270,8 @@ async def fetch_confirmation_code_data(
 
 
 def is_username_allowed_to_register(username: str) -> bool:
-    usernames_blacklist_file = (
-        Path(__file__).resolve().parent.parent / "data" / "usernames-blacklist.txt"
-    )
-    with open(usernames_blacklist_file) as f:
-        usernames = {x.strip() for x in f}
+    return not username_blocklist.is_blocked(username)
+
 
-    return username.lower().strip() not in usernames
+def is_password_breached(password: str) -> bool:
+    return password in breached_passwords
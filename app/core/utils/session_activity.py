@@ -0,0 +1,154 @@
+import asyncio
+import datetime
+import itertools
+import logging
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import DateTime, String, Text, Uuid, column, func, update, values
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import settings
+from app.core.utils.cache import TTLCache
+from app.db.session import SessionLocal
+from app.models.user import UserSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionActivity:
+    """Latest activity of a session which is not written to the database yet."""
+
+    ip: str | None
+    useragent: str | None
+    last_activity: datetime.datetime
+
+
+class SessionActivityBuffer:
+    """Coalesce ``UserSession`` activity updates and write them in batches.
+
+    Only the latest activity of every session is kept. A session is written at most
+    once per ``settings.session_activity_min_interval`` seconds, newer activity waits
+    in the buffer until the interval passes.
+
+    At most ``settings.session_activity_max_pending`` sessions are buffered. When
+    flushes keep failing, activity of the least recently active sessions is dropped
+    rather than letting the buffer grow without bound.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+        # Ordered from the least recently active session.
+        self.pending: dict[uuid.UUID, SessionActivity] = {}
+        self.dropped = 0
+        self.recently_flushed: TTLCache[bool] = TTLCache(
+            maxsize=settings.session_activity_max_pending,
+            ttl=settings.session_activity_min_interval,
+        )
+
+    def record(
+        self,
+        session_uuid: uuid.UUID,
+        *,
+        ip: str | None,
+        useragent: str | None,
+        last_activity: datetime.datetime,
+    ):
+        self.pending.pop(session_uuid, None)
+        self.pending[session_uuid] = SessionActivity(
+            ip=ip, useragent=useragent, last_activity=last_activity
+        )
+        self._drop_overflow()
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(settings.session_activity_flush_interval)
+            if self.dropped:
+                logger.warning(
+                    "Dropped activity of %s sessions, the buffer was full", self.dropped
+                )
+                self.dropped = 0
+            try:
+                async with self.session_factory() as db:
+                    await self.flush(db)
+            except (SQLAlchemyError, OSError):
+                logger.exception("Cannot flush session activity")
+
+    async def close(self):
+        """Write everything that is left, ignoring the minimal interval."""
+        try:
+            async with self.session_factory() as db:
+                await self.flush(db, force=True)
+        except (SQLAlchemyError, OSError):
+            logger.exception("Cannot flush session activity on shutdown")
+
+    async def flush(self, db: AsyncSession, force: bool = False) -> int:
+        """Write due activity, returns number of written sessions."""
+        due = {
+            session_uuid: activity
+            for session_uuid, activity in self.pending.items()
+            if force or not self.recently_flushed.get(session_uuid)
+        }
+        if not due:
+            return 0
+        for session_uuid in due:
+            del self.pending[session_uuid]
+
+        items = list(due.items())
+        batch_size = settings.session_activity_flush_batch_size
+        try:
+            for start in range(0, len(items), batch_size):
+                await db.execute(
+                    self._update_query(items[start : start + batch_size]),
+                    execution_options={"synchronize_session": False},
+                )
+            await db.commit()
+        except SQLAlchemyError:
+            # Keep activity for the next flush unless a newer one was recorded meanwhile.
+            self.pending = {**due, **self.pending}
+            self._drop_overflow()
+            raise
+
+        for session_uuid in due:
+            self.recently_flushed.set(session_uuid, True)
+        logger.debug("Flushed activity of %s sessions", len(items))
+        return len(items)
+
+    def _drop_overflow(self):
+        overflow = len(self.pending) - settings.session_activity_max_pending
+        if overflow <= 0:
+            return
+        for session_uuid in list(itertools.islice(self.pending, overflow)):
+            del self.pending[session_uuid]
+        self.dropped += overflow
+
+    @staticmethod
+    def _update_query(items: list[tuple[uuid.UUID, SessionActivity]]):
+        activity = values(
+            column("uuid", Uuid),
+            column("ip", String),
+            column("useragent", Text),
+            column("last_activity", DateTime),
+            name="activity",
+        ).data(
+            [
+                (session_uuid, item.ip, item.useragent, item.last_activity)
+                for session_uuid, item in items
+            ]
+        )
+        return (
+            update(UserSession)
+            .where(UserSession.uuid == activity.c.uuid)
+            .values(
+                ip=func.coalesce(activity.c.ip, UserSession.ip),
+                useragent=func.coalesce(activity.c.useragent, UserSession.useragent),
+                last_activity=func.greatest(
+                    activity.c.last_activity, UserSession.last_activity
+                ),
+            )
+        )
+
+
+session_activity_buffer = SessionActivityBuffer()
@@ -0,0 +1,26 @@
+import time
+
+
+class TokenBucket:
+    """In-process token bucket refilled at ``rate`` tokens per second.
+
+    Holds at most ``capacity`` tokens, which is the largest allowed burst.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def consume(self, tokens: float = 1.0) -> bool:
+        """Take ``tokens`` if there are enough of them."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
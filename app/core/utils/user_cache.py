@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import uuid
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.core.utils.cache import TTLCache
+from app.crud import crud_user
+from app.schemas.user_schema import UserSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class UserSnapshotCache:
+    """Two level cache of ``UserSnapshot`` keyed by user uuid.
+
+    Snapshots are looked up in the process memory first, then in Redis, and only then
+    loaded from the database. Invalidation is broadcast over Redis pub/sub, so that
+    every worker drops its local copy.
+    """
+
+    def __init__(self):
+        self.local: TTLCache[UserSnapshot] = TTLCache(
+            maxsize=settings.user_cache_local_maxsize,
+            ttl=settings.user_cache_local_ttl,
+        )
+
+    async def get(
+        self, db: AsyncSession, redis: Redis, user_uuid: uuid.UUID
+    ) -> UserSnapshot | None:
+        if snapshot := self.local.get(user_uuid):
+            return snapshot
+
+        snapshot = await self._get_from_redis(redis, user_uuid)
+        if not snapshot:
+            user = await crud_user.get_by_uuid(db, user_uuid=user_uuid)
+            if not user:
+                return None
+            snapshot = UserSnapshot.model_validate(user)
+            await self._set_to_redis(redis, snapshot)
+
+        self.local.set(user_uuid, snapshot)
+        return snapshot
+
+    async def invalidate(self, redis: Redis, user_uuid: uuid.UUID):
+        self.local.pop(user_uuid)
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.delete(self._key(user_uuid))
+                pipe.publish(settings.user_cache_invalidation_channel, str(user_uuid))
+                await pipe.execute()
+        except RedisError:
+            logger.exception("Cannot invalidate cached user %s", user_uuid)
+
+    async def listen_for_invalidations(self, redis: Redis):
+        """Drop local snapshots invalidated by other workers."""
+        while True:
+            try:
+                async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(settings.user_cache_invalidation_channel)
+                    await self._consume_invalidations(pubsub)
+            except (RedisError, OSError):
+                logger.exception("User cache invalidation listener failed")
+                # Could have missed invalidations while disconnected.
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    async def _consume_invalidations(self, pubsub):
+        while True:
+            message = await pubsub.get_message(timeout=1.0)
+            if message:
+                self.local.pop(uuid.UUID(message["data"].decode()))
+
+    async def _get_from_redis(
+        self, redis: Redis, user_uuid: uuid.UUID
+    ) -> UserSnapshot | None:
+        try:
+            cached = await redis.get(self._key(user_uuid))
+        except RedisError:
+            logger.exception("Cannot read cached user %s", user_uuid)
+            return None
+        return UserSnapshot.model_validate_json(cached) if cached else None
+
+    async def _set_to_redis(self, redis: Redis, snapshot: UserSnapshot):
+        try:
+            await redis.set(
+                self._key(snapshot.uuid),
+                snapshot.model_dump_json(),
+                ex=settings.user_cache_redis_ttl,
+            )
+        except RedisError:
+            logger.exception("Cannot cache user %s", snapshot.uuid)
+
+    def _key(self, user_uuid: uuid.UUID) -> str:
+        return f"user-snapshot:{user_uuid}"
+
+
+user_snapshot_cache = UserSnapshotCache()
@@ -3,65 +3,88 @@ import logging
 import uuid
 
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.enums import MonolithSyncMode
+from app.core.settings import settings
 from app.core.utils.security import generate_hashed_password
 from app.external.exceptions import MonolithUserCreateException
 from app.external.monolith import create_user_on_monolith
-from app.models.user import User
+from app.models.user import User, UserSyncOutbox
 from app.schemas import user_schema
 
 logger = logging.getLogger(__name__)
 
 
 async def update_user_password(
-    db: Session, db_user: User, obj_in: user_schema.UserPasswordUpdate
+    db: AsyncSession, db_user: User, obj_in: user_schema.UserPasswordUpdate
 ) -> User | None:
     """
     Will update User in DB. Mostly reserved for the password resetting.
     """
-    db_user.password = generate_hashed_password(obj_in.password)
-    db.commit()
+    db_user.password = await generate_hashed_password(obj_in.password)
+    await db.commit()
     return db_user
 
 
-async def create_user(db: Session, user: user_schema.UserCreate) -> User:
+async def create_user(db: AsyncSession, user: user_schema.UserCreate) -> User:
     db_user = User(**user.model_dump())
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 
 async def create_user_and_sync_to_monolith(
-    *, db: Session, user: user_schema.UserCreate
+    *, db: AsyncSession, user: user_schema.UserCreate
 ) -> User:
     db_user = User(
         uuid=uuid.uuid4(),
         username=user.username,
         email=user.email,
-        password=generate_hashed_password(user.password),
+        password=await generate_hashed_password(user.password),
     )
     db.add(db_user)
+    if settings.monolith_sync_mode == MonolithSyncMode.deferred:
+        db.add(UserSyncOutbox(user_uuid=db_user.uuid))
+        await db.commit()
+        logger.info("User %s queued for sync to the monolith", user.username)
+        return db_user
+
     try:
-        create_user_on_monolith(user=db_user)
+        await create_user_on_monolith(user=db_user)
         db_user.synced_at = datetime.datetime.now()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.exception("Can't create user %s on monolith", user.username)
         raise MonolithUserCreateException(f"Error {e}")
     logger.info("User %s synced to the monolith", user.username)
-    db.commit()
+    await db.commit()
     return db_user
 
 
-async def get_by_email(db: Session, email: EmailStr) -> User | None:
-    return db.query(User).filter(User.email == email).first()
+async def get_by_email(db: AsyncSession, email: EmailStr) -> User | None:
+    return await db.scalar(select(User).where(func.lower(User.email) == email.lower()))
+
 
+async def get_by_username(db: AsyncSession, username: str) -> User | None:
+    return await db.scalar(
+        select(User).where(func.lower(User.username) == username.lower())
+    )
 
-async def get_by_username(db: Session, username: str) -> User | None:
-    return db.query(User).filter(User.username == username).first()
+
+async def get_by_username_or_email(db: AsyncSession, login: str) -> User | None:
+    """Find user by username or email in one query, preferring username match."""
+    login = login.lower()
+    username_matches = func.lower(User.username) == login
+    return await db.scalar(
+        select(User)
+        .where(or_(username_matches, func.lower(User.email) == login))
+        .order_by(username_matches.desc())
+        .limit(1)
+    )
 
 
-async def get_by_uuid(db: Session, user_uuid: str | uuid.UUID) -> User | None:
-    return db.query(User).filter(User.uuid == user_uuid).first()
+async def get_by_uuid(db: AsyncSession, user_uuid: str | uuid.UUID) -> User | None:
+    return await db.scalar(select(User).where(User.uuid == user_uuid))
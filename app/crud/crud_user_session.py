@@ -1,49 +1,143 @@
+import datetime
 import uuid
-from typing import Type
+from typing import TYPE_CHECKING, Collection, Sequence
 
 from fastapi import Request
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from app.core.settings import settings
 from app.models.user import User, UserSession
 
+if TYPE_CHECKING:
+    from app.schemas.user_schema import UserSnapshot
+
 
 async def create_user_session(
-    *, db: Session, user: User, request: Request, user_agent: str | None
-) -> UserSession:
-    user_session = UserSession(user=user, ip=request.client.host, useragent=user_agent)
+    *, db: AsyncSession, user: User, request: Request, user_agent: str | None
+) -> tuple[UserSession, list[uuid.UUID]]:
+    """Create session, returns it and uuids of sessions evicted to stay under the cap.
+
+    The least recently active sessions are evicted once the user has
+    ``settings.max_sessions_per_user`` of them.
+    """
+    evicted_uuids = []
+    if settings.max_sessions_per_user:
+        # Serialize session creation of the user, so concurrent logins can't overshoot.
+        await db.execute(
+            select(User.uuid)
+            .where(User.uuid == user.uuid)
+            .with_for_update(key_share=True)
+        )
+        evicted_uuids = await _evict_sessions_over_limit(
+            db, user.uuid, keep=settings.max_sessions_per_user - 1
+        )
+    user_session = UserSession(
+        user_uuid=user.uuid, ip=request.client.host, useragent=user_agent
+    )
     db.add(user_session)
-    db.commit()
-    return user_session
+    await db.commit()
+    return user_session, evicted_uuids
+
+
+async def _evict_sessions_over_limit(
+    db: AsyncSession, user_uuid: uuid.UUID, keep: int
+) -> list[uuid.UUID]:
+    over_limit = (
+        select(UserSession.uuid)
+        .where(UserSession.user_uuid == user_uuid)
+        .order_by(UserSession.last_activity.desc(), UserSession.uuid.desc())
+        .offset(keep)
+    )
+    result = await db.execute(
+        delete(UserSession)
+        .where(UserSession.uuid.in_(over_limit))
+        .returning(UserSession.uuid),
+        execution_options={"synchronize_session": False},
+    )
+    return list(result.scalars())
 
 
 async def delete_user_sessions(
-    *, db: Session, user: User, exclude_uuids: list[uuid.UUID | str] = None
-) -> None:
-    query = db.query(UserSession).filter(UserSession.user == user)
+    *,
+    db: AsyncSession,
+    user: "User | UserSnapshot",
+    exclude_uuids: list[uuid.UUID | str] = None,
+) -> list[uuid.UUID]:
+    """Delete sessions of the user, returns uuids of the deleted ones."""
+    query = (
+        delete(UserSession)
+        .where(UserSession.user_uuid == user.uuid)
+        .returning(UserSession.uuid)
+    )
     if exclude_uuids:
-        query = query.filter(UserSession.uuid.notin_(exclude_uuids))
-    query.delete()
-    db.commit()
+        query = query.where(UserSession.uuid.notin_(exclude_uuids))
+    result = await db.execute(query, execution_options={"synchronize_session": False})
+    deleted_uuids = list(result.scalars())
+    await db.commit()
+    return deleted_uuids
 
 
 async def delete_user_session(
-    *, db: Session, user: User, user_session_uuid: str | uuid.UUID
+    *, db: AsyncSession, user: "User | UserSnapshot", user_session_uuid: str | uuid.UUID
 ) -> bool:
-    query = db.query(UserSession).filter(
-        UserSession.user == user, UserSession.uuid == user_session_uuid
+    query = delete(UserSession).where(
+        UserSession.user_uuid == user.uuid, UserSession.uuid == user_session_uuid
     )
-    result = query.delete()
-    db.commit()
-    return bool(result)
+    result = await db.execute(query, execution_options={"synchronize_session": False})
+    await db.commit()
+    return bool(result.rowcount)
+
 
+async def get_user_sessions_page(
+    db: AsyncSession,
+    user_uuid: str | uuid.UUID,
+    *,
+    limit: int,
+    after: tuple[datetime.datetime, uuid.UUID] | None = None,
+) -> Sequence[Row]:
+    """Sessions ordered by the latest activity, only the columns of ``UserSessionOut``.
 
-async def get_user_sessions_by_user_uuid(
-    db: Session, user_uuid: str | uuid.UUID
-) -> list[Type[UserSession]] | None:
-    return db.query(UserSession).filter(UserSession.user_uuid == user_uuid).all()
+    Keyset pagination: ``after`` is ``(last_activity, uuid)`` of the last session on
+    the previous page.
+    """
+    query = (
+        select(
+            UserSession.uuid,
+            UserSession.ip,
+            UserSession.useragent,
+            UserSession.last_activity,
+            UserSession.created_at,
+        )
+        .where(UserSession.user_uuid == user_uuid)
+        .order_by(UserSession.last_activity.desc(), UserSession.uuid.desc())
+        .limit(limit)
+    )
+    if after:
+        query = query.where(
+            tuple_(UserSession.last_activity, UserSession.uuid) < tuple_(*after)
+        )
+    result = await db.execute(query)
+    return result.all()
 
 
 async def get_user_session_by_uuid(
-    db: Session, user_session_uuid: str | uuid.UUID
+    db: AsyncSession, user_session_uuid: str | uuid.UUID
 ) -> UserSession | None:
-    return db.query(UserSession).filter(UserSession.uuid == user_session_uuid).first()
+    return await db.scalar(
+        select(UserSession)
+        .options(joinedload(UserSession.user))
+        .where(UserSession.uuid == user_session_uuid)
+    )
+
+
+async def get_existing_user_session_uuids(
+    db: AsyncSession, user_session_uuids: Collection[uuid.UUID]
+) -> set[uuid.UUID]:
+    if not user_session_uuids:
+        return set()
+    result = await db.scalars(
+        select(UserSession.uuid).where(UserSession.uuid.in_(user_session_uuids))
+    )
+    return set(result)
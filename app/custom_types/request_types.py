@@ -2,6 +2,13 @@ from typing import Annotated
 
 from fastapi import Body, Header
 
+from app.core.settings import settings
+
 UserAgent = Annotated[str | None, Header()]
 
 RefreshToken = Annotated[str, Body(embed=True)]
+
+Tokens = Annotated[
+    list[str],
+    Body(embed=True, min_length=1, max_length=settings.token_introspection_max_batch),
+]
@@ -0,0 +1,26 @@
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from app.core.metrics import InstrumentedRedis
+from app.core.settings import get_redis_url, settings
+
+
+def create_redis_client(socket_timeout: float | None = None) -> Redis:
+    """Create Redis client backed by a connection pool shared by the whole process.
+
+    ``socket_timeout`` overrides ``settings.redis_socket_timeout`` for clients
+    running blocking commands.
+    """
+    connection_pool = BlockingConnectionPool.from_url(
+        get_redis_url(),
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_timeout=socket_timeout or settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+    )
+    return InstrumentedRedis(connection_pool=connection_pool)
+
+
+async def close_redis_client(redis_client: Redis):
+    await redis_client.close()
+    await redis_client.connection_pool.disconnect()
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
-from app.core.settings import get_db_url
+from app.core.metrics import instrument_engine
+from app.core.settings import get_async_db_url
 
-engine = create_engine(get_db_url(), pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_async_engine(get_async_db_url(), pool_pre_ping=True)
+instrument_engine(engine)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
@@ -1,50 +1,107 @@
+import secrets
 import uuid
 
-import redis.asyncio as redis
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt import DecodeError, ExpiredSignatureError, MissingRequiredClaimError
 from pydantic import ValidationError
-from sqlalchemy.exc import DataError
-from sqlalchemy.orm import Session
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import TokenType
 from app.core.exceptions import (
     Forbidden,
     TokenExpired,
     TokenInvalid,
+    TokenRevoked,
+    TooManyRequests,
     UserFromTokenNotFound,
     WrongTokenType,
 )
-from app.core.settings import get_redis_url
+from app.core.settings import settings
+from app.core.utils.rate_limit import limit_key, lockout_key, rate_limiter
+from app.core.utils.revocation import session_revocations
 from app.core.utils.security import decode_token
-from app.crud import crud_user
+from app.core.utils.user_cache import user_snapshot_cache
 from app.db.session import SessionLocal
-from app.models.user import User
+from app.schemas.response_schema import Token
+from app.schemas.security_schema import TokenPrincipal
+from app.schemas.user_schema import UserSnapshot
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-async def get_redis():
-    redis_client = redis.from_url(get_redis_url())
-    try:
-        yield redis_client
-    finally:
-        await redis_client.close()
+async def get_redis(request: Request) -> Redis:
+    return request.app.state.redis
 
 
-async def get_current_user_and_session_uuid(
+class RateLimit:
+    """Reject requests over ``settings.rate_limits[route]`` before any other work.
+
+    The username is read from ``username_field`` of the JSON body, which FastAPI
+    has already parsed by the time dependencies are solved. With ``lockout``
+    usernames locked out after failed logins are rejected too.
+    """
+
+    def __init__(
+        self, route: str, username_field: str | None = None, lockout: bool = False
+    ):
+        self.route = route
+        self.username_field = username_field
+        self.lockout = lockout
+
+    async def __call__(self, request: Request, redis: Redis = Depends(get_redis)):
+        username = await self._get_username(request)
+        values = {
+            "ip": request.client.host if request.client else "unknown",
+            "username": username.strip().lower() if username else None,
+            "route": "",
+        }
+        limits = [
+            (limit_key(self.route, rule, values[rule.key]), rule)
+            for rule in settings.rate_limits.get(self.route, [])
+            if values[rule.key] is not None
+        ]
+        retry_after = await rate_limiter.check(
+            redis, limits, lockout_key(username) if self.lockout and username else None
+        )
+        if retry_after:
+            raise TooManyRequests(retry_after=retry_after)
+
+    async def _get_username(self, request: Request) -> str | None:
+        if not self.username_field:
+            return None
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        username = body.get(self.username_field) if isinstance(body, dict) else None
+        return username if isinstance(username, str) and username else None
+
+
+async def verify_internal_token(request: Request):
+    """Let in only internal services presenting ``settings.internal_token``.
+
+    Endpoints behind this dependency are closed while the token is not configured.
+    """
+    token = request.headers.get(settings.internal_token_header)
+    if not (
+        settings.internal_token
+        and token
+        and secrets.compare_digest(token.encode(), settings.internal_token.encode())
+    ):
+        raise Forbidden()
+
+
+async def get_access_token(
     auth: HTTPAuthorizationCredentials = Depends(
         HTTPBearer(auto_error=False, description="JWT Access token")
     ),
-    db: Session = Depends(get_db),
-) -> tuple[User, uuid.UUID | str]:
+    redis: Redis = Depends(get_redis),
+) -> Token:
     if not auth:
         raise Forbidden()
     try:
@@ -57,11 +114,39 @@ async def get_current_user_and_session_uuid(
         raise TokenExpired()
     if access_token.token_type != TokenType.access.value:
         raise WrongTokenType()
+    if await session_revocations.is_revoked(redis, access_token.jti):
+        raise TokenRevoked()
+    return access_token
 
+
+async def get_current_user_and_session_uuid(
+    access_token: Token = Depends(get_access_token),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+) -> tuple[UserSnapshot, uuid.UUID | str]:
     try:
-        user = await crud_user.get_by_uuid(db, user_uuid=access_token.user_id)
-    except DataError:
+        user_uuid = uuid.UUID(access_token.user_id)
+    except ValueError:
         raise TokenInvalid()
+    user = await user_snapshot_cache.get(db, redis, user_uuid)
     if not user:
         raise UserFromTokenNotFound()
     return user, access_token.jti
+
+
+async def get_token_principal(
+    access_token: Token = Depends(get_access_token),
+) -> TokenPrincipal:
+    """Trust the signed access token claims without checking the database.
+
+    Suitable for read endpoints which only need to know who is calling: the user
+    could have been deleted or deactivated during the access token lifetime.
+    """
+    try:
+        return TokenPrincipal(
+            user_uuid=access_token.user_id,
+            session_uuid=access_token.jti,
+            is_active=access_token.is_active,
+        )
+    except ValidationError:
+        raise TokenInvalid()
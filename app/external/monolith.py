@@ -1,38 +1,86 @@
-import requests
-from requests import status_codes
+import asyncio
+import time
+from http import HTTPStatus
+
+import httpx
 from tenacity import (
     retry,
     retry_if_not_exception_type,
     stop_after_attempt,
     stop_after_delay,
+    wait_exponential,
 )
 
+from app.core import metrics
 from app.core.settings import settings
 from app.external.exceptions import MonolithUserCreateException
 from app.models.user import User
 from app.schemas.user_schema import UserCreateOnMonolith
 
+_client: httpx.AsyncClient | None = None
+
+
+def get_monolith_client() -> httpx.AsyncClient:
+    """Return HTTP client shared by all requests to the monolith.
+
+    Keeping one client keeps connections to the monolith alive between requests.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        headers = {}
+        if settings.monolith_internal_token_header and settings.monolith_internal_token:
+            headers[
+                settings.monolith_internal_token_header
+            ] = settings.monolith_internal_token
+        _client = httpx.AsyncClient(
+            base_url=settings.monolith_host or "",
+            headers=headers,
+            timeout=settings.monolith_timeout,
+            limits=httpx.Limits(
+                max_connections=settings.monolith_max_connections,
+                max_keepalive_connections=settings.monolith_max_keepalive_connections,
+            ),
+        )
+    return _client
+
+
+async def close_monolith_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 @retry(
     retry=retry_if_not_exception_type(MonolithUserCreateException),
-    stop=(stop_after_delay(30) | stop_after_attempt(5)),
+    stop=(
+        stop_after_delay(settings.monolith_retry_max_delay)
+        | stop_after_attempt(settings.monolith_retry_attempts)
+    ),
+    wait=wait_exponential(
+        multiplier=settings.monolith_retry_backoff_multiplier,
+        max=settings.monolith_retry_backoff_max,
+    ),
+    before_sleep=lambda _: metrics.monolith_retries.inc(),
 )
-def create_user_on_monolith(*, user: User):
-    create_user_url = f"{settings.monolith_host}/v1/users/"
+async def create_user_on_monolith(*, user: User):
     user_to_monolith = UserCreateOnMonolith(
         external_user_uid=user.uuid,
         username=user.username,
         email=user.email,
     )
-    result = requests.post(
-        create_user_url,
-        headers={
-            settings.monolith_internal_token_header: settings.monolith_internal_token
-        },
-        data=user_to_monolith.model_dump(),
-        timeout=10,
-    )
-    if result.status_code == status_codes.codes.BAD_REQUEST:
+    outcome = "error"
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.monolith_attempt_deadline):
+            result = await get_monolith_client().post(
+                "/v1/users/", data=user_to_monolith.model_dump(mode="json")
+            )
+        outcome = str(result.status_code)
+    finally:
+        metrics.monolith_request_duration.labels(outcome).observe(
+            time.perf_counter() - started
+        )
+    if result.status_code == HTTPStatus.BAD_REQUEST:
         raise MonolithUserCreateException(f"Error {result.content}")
-    if not result.ok:
-        result.raise_for_status()
+    result.raise_for_status()
@@ -1,20 +1,42 @@
+import asyncio
 import logging
+import signal
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from sentry_sdk.integrations.redis import RedisIntegration
 from starlette.responses import JSONResponse
 
+from app.core.enums import MonolithSyncMode
 from app.core.exceptions import KapibaraException
+from app.core.metrics import MetricsMiddleware, errors, generate_metrics
+from app.core.sampling import SamplingMiddleware, TraceSampler
 from app.core.settings import settings
+from app.core.utils.jwt_keys import get_jwks, get_signing_key, get_verification_keys
+from app.core.utils.revocation import session_revocations
+from app.core.utils.security import password_hashing_executor, username_blocklist
+from app.core.utils.session_activity import session_activity_buffer
+from app.core.utils.user_cache import user_snapshot_cache
+from app.db.redis import close_redis_client, create_redis_client
+from app.db.session import engine
+from app.external.monolith import close_monolith_client
+from app.v1.endpoints import well_known
 from app.v1.urls import router
+from app.workers.email_sender import EmailWorker, create_worker_redis_client
+from app.workers.monolith_sync import MonolithSyncDispatcher
+from app.workers.session_gc import SessionGarbageCollector
 
-if settings.sentry_dsn:
+trace_sampler = (
+    TraceSampler(settings.sentry_sampling_path) if settings.sentry_dsn else None
+)
+
+if trace_sampler:
     import sentry_sdk
 
     sentry_sdk.init(
         dsn=settings.sentry_dsn,
-        traces_sample_rate=1.0,
-        profiles_sample_rate=1.0,
+        traces_sampler=trace_sampler.traces_sampler,
+        profiles_sampler=trace_sampler.profiles_sampler,
         send_default_pii=True,
         environment=settings.environment,
         integrations=[
@@ -27,7 +49,60 @@ logging.basicConfig(
     format="%(levelname)s %(asctime)s %(name)s %(message)s",
 )
 
+
+def reload_configuration():
+    username_blocklist.reload_if_changed()
+    if trace_sampler:
+        trace_sampler.reload_if_changed()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail fast on misconfigured keys and have them parsed before the first request.
+    get_signing_key()
+    get_verification_keys()
+    get_jwks()
+    app.state.redis = create_redis_client()
+    workers = [
+        asyncio.create_task(
+            username_blocklist.watch(settings.username_blocklist_reload_interval)
+        ),
+        asyncio.create_task(
+            user_snapshot_cache.listen_for_invalidations(app.state.redis)
+        ),
+        asyncio.create_task(session_activity_buffer.run()),
+        asyncio.create_task(session_revocations.listen(app.state.redis)),
+    ]
+    with suppress(NotImplementedError, RuntimeError):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_configuration)
+    if trace_sampler and settings.sentry_sampling_path:
+        workers.append(
+            asyncio.create_task(
+                trace_sampler.watch(settings.sentry_sampling_reload_interval)
+            )
+        )
+    email_redis = create_worker_redis_client() if settings.email_worker_enabled else None
+    if email_redis:
+        workers.append(asyncio.create_task(EmailWorker(email_redis).run()))
+    if settings.monolith_sync_mode == MonolithSyncMode.deferred:
+        workers.append(asyncio.create_task(MonolithSyncDispatcher().run()))
+    if settings.session_gc_enabled:
+        workers.append(asyncio.create_task(SessionGarbageCollector().run()))
+    yield
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    await session_activity_buffer.close()
+    await close_redis_client(app.state.redis)
+    if email_redis:
+        await close_redis_client(email_redis)
+    await close_monolith_client()
+    await engine.dispose()
+    password_hashing_executor.shutdown()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.title,
     version=settings.version,
     license_info={
@@ -43,16 +118,35 @@ app = FastAPI(
         },
         {"name": "password", "description": "Сброс и смена паролей"},
         {"name": "session", "description": "Управлениями сессиями пользователей"},
+        {
+            "name": "forward-auth",
+            "description": "Проверка запросов для nginx auth_request и Traefik",
+        },
+        {"name": "jwks", "description": "Публичные ключи для проверки токенов"},
     ],
     debug=settings.debug,
 )
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(router, prefix="/v1")
+app.include_router(well_known.router, prefix="/.well-known", tags=["jwks"])
+
+if trace_sampler:
+    trace_sampler.bind(app.routes)
+    app.add_middleware(SamplingMiddleware, sampler=trace_sampler)
 
 
 @app.exception_handler(KapibaraException)
 async def base_exception_handler(request: Request, exc: KapibaraException):
+    errors.labels(exc.error_type, exc.status_code).inc()
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": [{"type": exc.error_type, "msg": exc.message}]},
+        headers=exc.headers,
     )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, content_type = generate_metrics()
+    return Response(content=content, media_type=content_type)
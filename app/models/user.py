@@ -13,12 +13,8 @@ class User(BaseTable):
     """User information."""
 
     uuid: Mapped[UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    username: Mapped[str] = mapped_column(
-        sa.String(16), nullable=False, unique=True, index=True
-    )
-    email: Mapped[EmailStr] = mapped_column(
-        sa.String(255), nullable=False, unique=True, index=True
-    )
+    username: Mapped[str] = mapped_column(sa.String(16), nullable=False)
+    email: Mapped[EmailStr] = mapped_column(sa.String(255), nullable=False)
     password: Mapped[str] = mapped_column(sa.String(72), nullable=False)
     email_activated_at: Mapped[datetime] = mapped_column(nullable=True)
     telegram_activated_at: Mapped[datetime] = mapped_column(nullable=True)
@@ -33,6 +29,11 @@ class User(BaseTable):
     is_active: Mapped[bool] = mapped_column(default=False, nullable=False, index=True)
     sessions: Mapped[list["UserSession"]] = relationship(back_populates="user")
 
+    __table_args__ = (
+        sa.Index("ix_user_username_lower", sa.func.lower(username), unique=True),
+        sa.Index("ix_user_email_lower", sa.func.lower(email), unique=True),
+    )
+
 
 class UserSession(BaseTable):
     """Store user session with various details."""
@@ -48,3 +49,23 @@ class UserSession(BaseTable):
     created_at: Mapped[datetime] = mapped_column(
         nullable=False, server_default=sa.func.now()
     )
+
+    __table_args__ = (
+        sa.Index("ix_usersession_user_uuid_last_activity", user_uuid, last_activity),
+    )
+
+
+class UserSyncOutbox(BaseTable):
+    """User waiting to be synced to the monolith."""
+
+    uuid: Mapped[UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    user_uuid: Mapped[UUID] = mapped_column(sa.ForeignKey("user.uuid"), unique=True)
+    user: Mapped["User"] = relationship()
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        nullable=False, server_default=sa.func.now(), index=True
+    )
+    last_error: Mapped[str] = mapped_column(sa.Text(), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        nullable=False, server_default=sa.func.now()
+    )
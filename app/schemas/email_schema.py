@@ -9,3 +9,16 @@ class EmailContents(BaseModel):
     subject: str
     message: str
     html_message: str | None = None
+
+
+class OutboxEmail(BaseModel):
+    """Email waiting in the outbox to be delivered by the email worker."""
+
+    sender: EmailStr
+    to: list[EmailStr]
+    subject: str
+    message: str
+    html_message: str | None = None
+    cc: list[EmailStr] | None = None
+    bcc: list[EmailStr] | None = None
+    attempts: int = 0
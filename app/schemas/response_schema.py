@@ -44,6 +44,15 @@ class RefreshToken(Token):
     token_type: TokenType = TokenType.refresh
 
 
+class TokenIntrospection(BaseModel):
+    """Introspection result for a single token."""
+
+    active: bool
+    revoked: bool = False
+    error: str | None = None
+    claims: Token | None = None
+
+
 class TokensPair(BaseModel):
     """Access / refresh tokens."""
 
@@ -17,3 +17,11 @@ class RestorePasswordData(BaseModel):
 
     code: str
     password: str
+
+
+class TokenPrincipal(BaseModel):
+    """Caller identity taken from access token claims."""
+
+    user_uuid: uuid.UUID
+    session_uuid: uuid.UUID
+    is_active: bool
@@ -8,7 +8,7 @@ from pydantic_core import PydanticCustomError
 from pydantic_core.core_schema import FieldValidationInfo
 
 from app.core.settings import settings
-from app.core.utils.security import is_username_allowed_to_register
+from app.core.utils.security import is_password_breached, is_username_allowed_to_register
 
 UsernameStr = constr(strip_whitespace=True)
 
@@ -19,8 +19,8 @@ class UserBase(BaseModel):
     email: EmailStr | None = None
 
 
-class UserCreate(UserBase):
-    """Model to create user."""
+class UserCredentials(UserBase):
+    """Credentials checked both when the user is created and on password reset."""
 
     email: EmailStr
     username: UsernameStr
@@ -58,12 +58,6 @@ class UserCreate(UserBase):
                 "Имя ({username}) содержит недопустимые символы.",
                 dict(username=value),
             )
-        if not is_username_allowed_to_register(value):
-            raise PydanticCustomError(
-                "forbidden_username",
-                "Имя ({username}) запрещено к регистрации.",
-                dict(username=value),
-            )
 
         return value
 
@@ -119,8 +113,34 @@ class UserCreate(UserBase):
 
         return value
 
+    @field_validator("password")
+    @classmethod
+    def check_password_not_breached(cls, value: str) -> str:
+        if is_password_breached(value):
+            raise PydanticCustomError(
+                "password_breached",
+                "Пароль есть в базах утекших паролей, выберите другой.",
+            )
+        return value
+
 
-class UserPasswordUpdate(UserCreate):
+class UserCreate(UserCredentials):
+    """Model to create user."""
+
+    @field_validator("username")
+    @classmethod
+    def check_username_allowed(cls, value: str) -> str:
+        # Only new usernames, the blocklist may grow after users are registered.
+        if not is_username_allowed_to_register(value):
+            raise PydanticCustomError(
+                "forbidden_username",
+                "Имя ({username}) запрещено к регистрации.",
+                dict(username=value),
+            )
+        return value
+
+
+class UserPasswordUpdate(UserCredentials):
     """Model to update user."""
 
     code: str
@@ -182,3 +202,13 @@ class UserSessionOut(BaseModel):
     useragent: str | None
     last_activity: datetime.datetime | None
     created_at: datetime.datetime
+
+
+class UserSnapshot(BaseModel):
+    """Subset of user fields cached to authorize requests without database."""
+
+    model_config = ConfigDict(from_attributes=True)
+    uuid: uuid.UUID
+    username: str
+    email: str
+    is_active: bool
@@ -0,0 +1,38 @@
+from app.benchmarks.hot_paths import (
+    Benchmark,
+    compare,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+class TestHotPaths:
+    def test_regressions_over_threshold_reported(self):
+        baseline = {"decode_token": 1e-4, "UserCreate": 1e-4, "removed": 1e-4}
+        results = {"decode_token": 1.5e-4, "UserCreate": 1.1e-4, "added": 1.0}
+
+        assert compare(results, baseline, max_regression=20) == [
+            "decode_token: 100.00 us -> 150.00 us (+50.0%)"
+        ]
+
+    def test_run_benchmarks(self):
+        calls = 0
+
+        async def noop():
+            nonlocal calls
+            calls += 1
+
+        results = run_benchmarks([Benchmark("noop", noop)], min_time=0.001, repeat=2)
+
+        assert list(results) == ["noop"]
+        assert 0 < results["noop"] < 0.001
+        assert calls > 2
+
+    def test_baseline_saved_and_loaded(self, tmp_path):
+        path = tmp_path / "baselines" / "hot_paths.json"
+        assert load_baseline(path) == {}
+
+        save_baseline(path, {"decode_token": 1e-4})
+
+        assert load_baseline(path) == {"decode_token": 1e-4}
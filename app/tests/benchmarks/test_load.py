@@ -0,0 +1,38 @@
+import argparse
+
+import pytest
+
+from app.benchmarks.load import parse_mix, summarize
+
+
+class TestLoadReport:
+    def test_parse_mix(self):
+        assert parse_mix("login=4,refresh,sessions=0") == {
+            "login": 4,
+            "refresh": 1,
+            "sessions": 0,
+        }
+
+    @pytest.mark.parametrize("mix", ("unknown=1", "login=x", "login=0", ""))
+    def test_parse_wrong_mix(self, mix):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix(mix)
+
+    def test_summarize(self):
+        summary = summarize([i / 1000 for i in range(1, 101)], errors=2, duration=2.0)
+        assert summary == {
+            "requests": 100,
+            "errors": 2,
+            "throughput_rps": 50.0,
+            "p50_ms": 50.5,
+            "p95_ms": 95.05,
+            "p99_ms": 99.01,
+            "max_ms": 100.0,
+        }
+
+    def test_summarize_without_requests(self):
+        assert summarize([], errors=0, duration=1.0) == {
+            "requests": 0,
+            "errors": 0,
+            "throughput_rps": 0.0,
+        }
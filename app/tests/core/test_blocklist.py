@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from app.core.utils.blocklist import UsernameBlocklist
+
+
+class TestUsernameBlocklist:
+    @pytest.fixture
+    def blocklist_file(self, tmp_path):
+        path = tmp_path / "blocklist.txt"
+        path.write_text("# comment\nadmin\nmoder\n\n=root\n=he\n")
+        return path
+
+    @pytest.mark.parametrize(
+        "username,expected_blocked",
+        (
+            ("admin", True),
+            (" Admin ", True),
+            ("superadmin1", True),
+            ("Moderator", True),
+            ("root", True),
+            ("ROOT", True),
+            ("rooter", False),
+            ("he", True),
+            ("hello", False),
+            ("she", False),
+            ("adm", False),
+            ("testuser", False),
+            ("", False),
+        ),
+    )
+    def test_is_blocked(self, blocklist_file, username, expected_blocked):
+        blocklist = UsernameBlocklist(blocklist_file)
+
+        assert blocklist.is_blocked(username) is expected_blocked
+
+    def test_overlapping_patterns(self, tmp_path):
+        path = tmp_path / "blocklist.txt"
+        path.write_text("abcd\nbc\n")
+        blocklist = UsernameBlocklist(path)
+
+        assert blocklist.is_blocked("xabcx") is True
+        assert blocklist.is_blocked("abxd") is False
+
+    def test_reload_if_changed(self, blocklist_file):
+        blocklist = UsernameBlocklist(blocklist_file)
+        assert blocklist.is_blocked("kapibara") is False
+
+        blocklist_file.write_text("kapibara\n")
+        stat = blocklist_file.stat()
+        os.utime(blocklist_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        blocklist.reload_if_changed()
+
+        assert blocklist.is_blocked("kapibara") is True
+        assert blocklist.is_blocked("admin") is False
+
+    def test_broken_reload_keeps_patterns(self, blocklist_file):
+        blocklist = UsernameBlocklist(blocklist_file)
+        blocklist_file.unlink()
+
+        blocklist.reload_if_changed()
+
+        assert blocklist.is_blocked("admin") is True
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.settings import Settings
+from app.core.utils.bloom import BloomFilter
+from app.core.utils.breached_passwords import BreachedPasswords, main
+from app.schemas.user_schema import UserCreate
+
+BREACHED = ["Qwerty-123!", "P@ssw0rd", "Тест-1234!"]
+
+
+class TestBreachedPasswords:
+    @pytest.fixture
+    def passwords_list(self, tmp_path):
+        path = tmp_path / "passwords.txt"
+        path.write_text("\n".join(BREACHED) + "\n\n")
+        return path
+
+    @pytest.mark.parametrize("sha1", (False, True))
+    def test_build_and_check(self, tmp_path, passwords_list, sha1):
+        if sha1:
+            passwords_list.write_text(
+                "".join(
+                    f"{hashlib.sha1(password.encode()).hexdigest().upper()}:42\n"
+                    for password in BREACHED
+                )
+            )
+        output = tmp_path / "breached.bloom"
+
+        main([str(passwords_list), str(output), "--format", "sha1" if sha1 else "plain"])
+        breached_passwords = BreachedPasswords(output)
+
+        assert all(password in breached_passwords for password in BREACHED)
+        assert "Unique-Pa55word!" not in breached_passwords
+
+    def test_file_shared_read_only(self, tmp_path, passwords_list):
+        output = tmp_path / "breached.bloom"
+        main([str(passwords_list), str(output)])
+
+        bloom_filter = BloomFilter.open(output)
+
+        assert bloom_filter.bits.readonly
+        with pytest.raises(TypeError):
+            bloom_filter.add(b"password")
+
+    def test_wrong_file(self, tmp_path):
+        path = tmp_path / "breached.bloom"
+        path.write_bytes(b"not a bloom filter file")
+
+        with pytest.raises(ValueError):
+            BreachedPasswords(path)
+
+    @pytest.mark.parametrize("content", (b"", b"KBLOOM01"))
+    def test_truncated_file(self, tmp_path, content):
+        path = tmp_path / "breached.bloom"
+        path.write_bytes(content)
+
+        with pytest.raises(ValueError):
+            BreachedPasswords(path)
+
+    def test_build_to_configured_path(self, tmp_path, passwords_list):
+        output = tmp_path / "breached.bloom"
+
+        with mock.patch.dict(os.environ, {"BREACHED_PASSWORDS_PATH": str(output)}):
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "app.core.utils.breached_passwords",
+                    str(passwords_list),
+                    str(output),
+                ],
+                capture_output=True,
+            )
+
+        assert result.returncode == 0, result.stderr.decode()
+        assert BREACHED[0] in BreachedPasswords(output)
+
+    def test_without_filter(self):
+        assert BREACHED[0] not in BreachedPasswords(None)
+
+    def test_blank_setting_disables_check(self):
+        with mock.patch.dict(os.environ, {"BREACHED_PASSWORDS_PATH": ""}):
+            path = Settings().breached_passwords_path
+
+        assert path is None
+        assert BREACHED[0] not in BreachedPasswords(path)
+
+    def test_user_create_rejects_breached_password(self, tmp_path, passwords_list):
+        output = tmp_path / "breached.bloom"
+        main([str(passwords_list), str(output)])
+
+        with mock.patch(
+            "app.core.utils.security.breached_passwords", BreachedPasswords(output)
+        ), pytest.raises(ValidationError) as error:
+            UserCreate(
+                username="someone", email="someone@example.com", password=BREACHED[0]
+            )
+
+        assert error.value.errors()[0]["type"] == "password_breached"
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.exceptions import ServiceOverloaded
+from app.core.executors import BoundedExecutor
+
+
+@pytest.mark.anyio
+class TestBoundedExecutor:
+    async def test_run(self):
+        executor = BoundedExecutor(name="test", max_workers=1, max_queue_size=0)
+
+        assert await executor.run(sum, [1, 2]) == 3
+        await asyncio.sleep(0)
+        assert executor.stats.pending == 0
+        assert executor.stats.completed == 1
+        executor.shutdown()
+
+    async def test_cancelled_job_stays_pending_until_done(self):
+        executor = BoundedExecutor(name="test", max_workers=1, max_queue_size=0)
+        started, release = threading.Event(), threading.Event()
+
+        def job():
+            started.set()
+            release.wait(5)
+
+        task = asyncio.create_task(executor.run(job))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert executor.stats.pending == 1
+        with pytest.raises(ServiceOverloaded):
+            await executor.run(job)
+
+        release.set()
+        while executor.stats.pending:
+            await asyncio.sleep(0.01)
+        assert executor.stats.completed == 1
+        executor.shutdown()
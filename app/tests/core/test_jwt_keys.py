@@ -0,0 +1,141 @@
+import base64
+import json
+import uuid
+from unittest import mock
+
+import jwt
+import pytest
+from jwt import DecodeError
+
+from app.benchmarks.jwt_algorithms import SUPPORTED_ALGORITHMS, generate_key_pair
+from app.core.enums import TokenType
+from app.core.settings import JWTVerificationKey, settings
+from app.core.utils.jwt_keys import _prepare_jwt_key, get_jwks, get_signing_key
+from app.core.utils.security import (
+    decode_token,
+    generate_jwt_access_token,
+    generate_jwt_refresh_token,
+)
+from app.models.user import User
+
+
+@pytest.mark.anyio
+class TestJWTKeys:
+    @pytest.mark.parametrize("algorithm", SUPPORTED_ALGORITHMS)
+    async def test_tokens_signed_and_verified(self, algorithm):
+        private_key, public_key = generate_key_pair(algorithm)
+        user = User(uuid=uuid.uuid4(), is_active=True)
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm=algorithm,
+            jwt_rsa_private_key=private_key,
+            jwt_rsa_public_key=public_key,
+        ):
+            access_token = await decode_token(await generate_jwt_access_token(user))
+            refresh_token = await decode_token(
+                await generate_jwt_refresh_token(user=user)
+            )
+
+        assert access_token.token_type == TokenType.access
+        assert access_token.user_id == str(user.uuid)
+        assert refresh_token.token_type == TokenType.refresh
+
+    async def test_key_parsed_once(self):
+        private_key, public_key = generate_key_pair("ES256")
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm="ES256",
+            jwt_rsa_private_key=private_key,
+            jwt_rsa_public_key=public_key,
+        ):
+            _prepare_jwt_key.cache_clear()
+            await generate_jwt_access_token(User(uuid=uuid.uuid4(), is_active=False))
+            misses = _prepare_jwt_key.cache_info().misses
+            for _ in range(3):
+                await generate_jwt_access_token(User(uuid=uuid.uuid4(), is_active=False))
+            assert get_signing_key() is get_signing_key()
+
+        assert _prepare_jwt_key.cache_info().misses == misses
+
+    async def test_token_has_kid_from_jwks(self):
+        private_key, public_key = generate_key_pair("ES256")
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm="ES256",
+            jwt_rsa_private_key=private_key,
+            jwt_rsa_public_key=public_key,
+        ):
+            token = await generate_jwt_access_token(
+                User(uuid=uuid.uuid4(), is_active=True)
+            )
+            jwks = get_jwks()
+
+        assert [key["kid"] for key in jwks["keys"]] == [
+            jwt.get_unverified_header(token)["kid"]
+        ]
+        assert "d" not in jwks["keys"][0]
+
+    async def test_previous_key_accepted_during_rotation(self):
+        old_private_key, old_public_key = generate_key_pair("RS256")
+        new_private_key, new_public_key = generate_key_pair("ES256")
+        user = User(uuid=uuid.uuid4(), is_active=True)
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm="RS256",
+            jwt_rsa_private_key=old_private_key,
+            jwt_rsa_public_key=old_public_key,
+            jwt_key_id="old",
+        ):
+            old_token = await generate_jwt_access_token(user)
+
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm="ES256",
+            jwt_rsa_private_key=new_private_key,
+            jwt_rsa_public_key=new_public_key,
+            jwt_key_id="new",
+            jwt_verification_keys=[
+                JWTVerificationKey(
+                    kid="old", algorithm="RS256", public_key=old_public_key
+                )
+            ],
+        ):
+            decoded = await decode_token(old_token)
+            jwks = get_jwks()
+
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm="ES256",
+            jwt_rsa_private_key=new_private_key,
+            jwt_rsa_public_key=new_public_key,
+            jwt_key_id="new",
+        ), pytest.raises(DecodeError):
+            await decode_token(old_token)
+
+        assert decoded.user_id == str(user.uuid)
+        assert {key["kid"]: key["alg"] for key in jwks["keys"]} == {
+            "new": "ES256",
+            "old": "RS256",
+        }
+
+    async def test_symmetric_key_not_published(self):
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm="HS256",
+            jwt_rsa_private_key="secret",
+            jwt_rsa_public_key="secret",
+            jwt_key_id="hmac",
+        ):
+            assert get_jwks() == {"keys": []}
+
+    @pytest.mark.parametrize("kid", (1, None, ["old"], {"kid": "old"}))
+    async def test_malformed_kid(self, kid):
+        token = await generate_jwt_access_token(User(uuid=uuid.uuid4(), is_active=True))
+        _, payload, signature = token.split(".")
+        header = {"alg": settings.jwt_algorithm, "typ": "JWT", "kid": kid}
+        encoded_header = base64.urlsafe_b64encode(json.dumps(header).encode())
+
+        with pytest.raises(DecodeError):
+            await decode_token(
+                ".".join((encoded_header.rstrip(b"=").decode(), payload, signature))
+            )
@@ -0,0 +1,62 @@
+import pytest
+from redis.exceptions import ConnectionError, NoScriptError
+
+from app.core.settings import RateLimitRule
+from app.core.utils.rate_limit import (
+    CHECK_SCRIPT,
+    FAILURE_SCRIPT,
+    SCRIPT_SHAS,
+    RateLimiter,
+    failures_key,
+    lockout_key,
+)
+
+RULE = RateLimitRule(key="ip", limit=2, window=60)
+
+
+@pytest.mark.anyio
+class TestRateLimiter:
+    async def test_allowed(self, redis):
+        retry_after = await RateLimiter().check(
+            redis, [("login-ip", RULE)], lockout_key("Bob")
+        )
+
+        assert retry_after == 0
+        redis.evalsha.assert_awaited_once_with(
+            SCRIPT_SHAS[CHECK_SCRIPT], 2, "login-ip", lockout_key("bob"), 1, 2, 60000
+        )
+
+    async def test_rejected_by_redis(self, redis):
+        redis.evalsha.return_value = [0, 1500]
+
+        assert await RateLimiter().check(redis, [("login-ip", RULE)]) == 1.5
+
+    async def test_rejected_locally_without_redis(self, redis):
+        rate_limiter = RateLimiter()
+        for _ in range(RULE.limit):
+            assert await rate_limiter.check(redis, [("login-ip", RULE)]) == 0
+
+        assert await rate_limiter.check(redis, [("login-ip", RULE)]) > 0
+        assert redis.evalsha.await_count == RULE.limit
+
+    async def test_script_loaded_on_first_use(self, redis):
+        redis.evalsha.side_effect = NoScriptError()
+        redis.eval.return_value = [1, 0]
+
+        assert await RateLimiter().check(redis, [("login-ip", RULE)]) == 0
+        redis.eval.assert_awaited_once_with(CHECK_SCRIPT, 1, "login-ip", 1, 2, 60000)
+
+    async def test_allowed_when_redis_is_down(self, redis):
+        redis.evalsha.side_effect = ConnectionError()
+
+        assert await RateLimiter().check(redis, [("login-ip", RULE)]) == 0
+
+    async def test_record_and_reset_failures(self, redis):
+        rate_limiter = RateLimiter()
+        await rate_limiter.record_failure(redis, " Bob ")
+        await rate_limiter.reset_failures(redis, "BOB")
+
+        sha, _, *keys_and_args = redis.evalsha.await_args.args
+        assert sha == SCRIPT_SHAS[FAILURE_SCRIPT]
+        assert keys_and_args[:2] == [failures_key("bob"), lockout_key("bob")]
+        redis.delete.assert_awaited_once_with(failures_key("bob"))
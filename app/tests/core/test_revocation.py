@@ -0,0 +1,106 @@
+import time
+import uuid
+from unittest import mock
+
+import pytest
+from redis.exceptions import RedisError
+
+from app.core.exceptions import SessionRevocationFailed
+from app.core.settings import settings
+from app.core.utils.bloom import BloomFilter
+from app.core.utils.revocation import SessionRevocationList
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [uuid.uuid4().bytes for _ in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        false_positives = sum(uuid.uuid4().bytes in bloom for _ in range(10_000))
+        assert false_positives < 300
+
+
+@pytest.mark.anyio
+class TestSessionRevocationList:
+    async def test_not_revoked_without_redis(self, redis):
+        revocations = SessionRevocationList()
+        assert await revocations.is_revoked(redis, uuid.uuid4()) is False
+        redis.zscore.assert_not_awaited()
+
+    async def test_revoked(self, redis):
+        revocations = SessionRevocationList()
+        session_uuid = uuid.uuid4()
+        await revocations.revoke(redis, [session_uuid])
+        redis.zscore.return_value = time.time() + 60
+
+        assert await revocations.is_revoked(redis, session_uuid) is True
+        pipeline = redis.pipeline.return_value.__aenter__.return_value
+        pipeline.publish.assert_called_once_with(
+            settings.revocation_channel, str(session_uuid)
+        )
+
+    @pytest.mark.parametrize("expires_at", (None, 0))
+    async def test_filter_false_positive_or_expired(self, redis, expires_at):
+        revocations = SessionRevocationList()
+        session_uuid = uuid.uuid4()
+        revocations.filter.add(str(session_uuid).encode())
+        redis.zscore.return_value = expires_at
+
+        assert await revocations.is_revoked(redis, session_uuid) is False
+
+    async def test_fail_closed_on_filter_hit(self, redis):
+        revocations = SessionRevocationList()
+        session_uuid = uuid.uuid4()
+        revocations.filter.add(str(session_uuid).encode())
+        redis.zscore.side_effect = RedisError
+
+        assert await revocations.is_revoked(redis, session_uuid) is True
+
+    async def test_rebuild_forgets_expired(self, redis):
+        revocations = SessionRevocationList()
+        expired, active = str(uuid.uuid4()), str(uuid.uuid4())
+        await revocations.revoke(redis, [expired])
+        redis.zrangebyscore.return_value = [active.encode()]
+
+        await revocations.rebuild(redis)
+
+        assert active.encode() in revocations.filter
+        assert expired.encode() not in revocations.filter
+
+    async def test_revocations_from_other_workers(self, redis):
+        revocations = SessionRevocationList()
+        revocations.rebuild_at = time.monotonic() + 60
+        session_uuids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        pubsub = mock.AsyncMock()
+        pubsub.get_message.side_effect = [
+            {"data": ",".join(session_uuids).encode()},
+            RedisError,
+        ]
+
+        with pytest.raises(RedisError):
+            await revocations._consume_revocations(redis, pubsub)
+
+        assert all(
+            session_uuid.encode() in revocations.filter for session_uuid in session_uuids
+        )
+
+    async def test_store_retried(self, redis):
+        pipeline = redis.pipeline.return_value.__aenter__.return_value
+        pipeline.execute.side_effect = [RedisError, [1, 0, 1]]
+
+        with mock.patch("asyncio.sleep"):
+            await SessionRevocationList().revoke(redis, [uuid.uuid4()])
+
+        assert pipeline.execute.await_count == 2
+
+    async def test_store_failure_raised(self, redis):
+        pipeline = redis.pipeline.return_value.__aenter__.return_value
+        pipeline.execute.side_effect = RedisError
+
+        with mock.patch("asyncio.sleep"), pytest.raises(SessionRevocationFailed):
+            await SessionRevocationList().revoke(redis, [uuid.uuid4()])
+
+        assert pipeline.execute.await_count == settings.revocation_store_attempts
@@ -0,0 +1,137 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.sampling import SamplingMiddleware, TraceSampler
+from app.core.settings import Settings
+from app.main import app
+
+
+def _http_scope(path: str) -> dict:
+    return {"asgi_scope": {"type": "http", "path": path}, "parent_sampled": None}
+
+
+class TestTraceSampler:
+    @pytest.fixture
+    def sampler(self):
+        with mock.patch.multiple(
+            "app.core.sampling.settings",
+            sentry_traces_sample_rate=0.0,
+            sentry_route_sample_rates={"/v1/token/refresh": 1.0},
+            sentry_boosted_sample_rate=1.0,
+            sentry_max_traces_per_second=1000.0,
+        ):
+            sampler = TraceSampler()
+            sampler.bind(app.routes)
+            yield sampler
+
+    def test_route_rates(self, sampler: TraceSampler):
+        assert sampler.traces_sampler(_http_scope("/v1/token/refresh")) == 1.0
+        assert sampler.traces_sampler(_http_scope("/v1/user/login")) == 0.0
+        assert sampler.traces_sampler(_http_scope("/no-such-route")) == 0.0
+        assert sampler.traces_sampler({"parent_sampled": None}) == 0.0
+
+    def test_resolve_route_template(self, sampler: TraceSampler):
+        session_uuid = "6ef8f2a5-8f5e-4a3e-9d2c-5c0e2b0d2f4a"
+        scope = {"type": "http", "path": f"/v1/session/{session_uuid}"}
+
+        assert sampler.resolve_route(scope) == "/v1/session/{session_uuid}"
+
+    @pytest.mark.parametrize("parent_sampled", (True, False))
+    def test_parent_decision(self, sampler: TraceSampler, parent_sampled):
+        context = {**_http_scope("/v1/token/refresh"), "parent_sampled": parent_sampled}
+
+        with mock.patch("app.core.sampling.settings.sentry_max_traces_per_second", 1.0):
+            sampler.reload()
+        rates = [sampler.traces_sampler(context) for _ in range(10)]
+
+        assert rates == [float(parent_sampled)] * 10
+        # Traces of callers don't take the share of traces started here.
+        assert sampler.traces_sampler(_http_scope("/v1/token/refresh")) == 1.0
+
+    @pytest.mark.parametrize(
+        "duration,status,expected_rate",
+        ((0.01, 200, 0.0), (0.01, 503, 1.0), (5.0, 200, 1.0), (0.01, 401, 0.0)),
+    )
+    def test_boost_slow_or_failing_route(
+        self, sampler: TraceSampler, duration, status, expected_rate
+    ):
+        sampler.observe("/v1/user/login", duration, status)
+
+        assert sampler.traces_sampler(_http_scope("/v1/user/login")) == expected_rate
+
+    def test_boost_expires(self, sampler: TraceSampler):
+        sampler.observe("/v1/user/login", 0.01, 500)
+
+        with mock.patch("app.core.sampling.time.monotonic", return_value=1e12):
+            assert sampler.rate("/v1/user/login") == 0.0
+
+    def test_traces_per_second_cap(self, sampler: TraceSampler):
+        with mock.patch("app.core.sampling.settings.sentry_max_traces_per_second", 2.0):
+            sampler.reload()
+
+        with mock.patch("app.core.sampling.time.monotonic", return_value=100.5):
+            first_second = [
+                sampler.traces_sampler(_http_scope("/v1/token/refresh"))
+                for _ in range(10)
+            ]
+        with mock.patch("app.core.sampling.time.monotonic", return_value=101.5):
+            next_second = [
+                sampler.traces_sampler(_http_scope("/v1/token/refresh"))
+                for _ in range(10)
+            ]
+        with mock.patch("app.core.sampling.time.monotonic", return_value=200.5):
+            after_pause = sampler.traces_sampler(_http_scope("/v1/token/refresh"))
+
+        assert first_second[:2] == [1.0, 1.0]
+        assert first_second[-1] == pytest.approx(0.2)
+        # Previous second predicts 10 traces, so every trace gets the same share.
+        assert next_second == [pytest.approx(0.2)] * 10
+        assert sum(next_second) == pytest.approx(2.0)
+        assert after_pause == 1.0
+
+    def test_reload_from_file(self, tmp_path):
+        path = tmp_path / "sampling.json"
+        path.write_text(json.dumps({"traces_sample_rate": 1.0}))
+        sampler = TraceSampler(path)
+        assert sampler.rate("/v1/user/login") == 1.0
+
+        path.write_text(json.dumps({"traces_sample_rate": 0.0}))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        sampler.reload_if_changed()
+        assert sampler.rate("/v1/user/login") == 0.0
+
+        path.write_text(json.dumps({"traces_sample_rate": 2.0}))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+        sampler.reload_if_changed()
+        assert sampler.rate("/v1/user/login") == 0.0
+
+    def test_blank_path_setting(self):
+        with mock.patch.dict(os.environ, {"SENTRY_SAMPLING_PATH": ""}):
+            assert Settings().sentry_sampling_path is None
+
+    def test_profiles_sampler(self, tmp_path):
+        path = tmp_path / "sampling.json"
+        path.write_text(json.dumps({"profiles_sample_rate": 0.25}))
+
+        assert TraceSampler(path).profiles_sampler({}) == 0.25
+
+
+@pytest.mark.anyio
+class TestSamplingMiddleware:
+    async def test_observe_requests(self):
+        sampler = mock.Mock()
+        middleware = SamplingMiddleware(app, sampler=sampler)
+
+        async with AsyncClient(app=middleware, base_url="http://test") as ac:
+            await ac.get("/v1/session/")
+            await ac.get("/no-such-route")
+
+        [observed] = sampler.observe.call_args_list
+        route, _, status = observed.args
+        assert route == "/v1/session/"
+        assert status == 403
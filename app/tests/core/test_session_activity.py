@@ -0,0 +1,130 @@
+import datetime
+import uuid
+from unittest import mock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.core.utils.session_activity import SessionActivityBuffer
+from app.models.user import User, UserSession
+
+
+@pytest.fixture
+async def user_sessions(db: AsyncSession, user: User) -> list[UserSession]:
+    user_sessions = []
+    for _ in range(3):
+        user_session = UserSession(user=user, ip="127.0.0.1", useragent="pytest")
+        db.add(user_session)
+        await db.commit()
+        user_sessions.append(user_session)
+    return user_sessions
+
+
+@pytest.mark.anyio
+class TestSessionActivityBuffer:
+    async def test_flushed_in_batches(self, db: AsyncSession, user_sessions):
+        buffer = SessionActivityBuffer()
+        last_activity = datetime.datetime(2030, 1, 1)
+        for user_session in user_sessions:
+            buffer.record(
+                user_session.uuid,
+                ip="10.0.0.1",
+                useragent=None,
+                last_activity=last_activity,
+            )
+        buffer.record(uuid.uuid4(), ip=None, useragent=None, last_activity=last_activity)
+
+        with mock.patch.object(settings, "session_activity_flush_batch_size", 2):
+            assert await buffer.flush(db) == 4
+
+        for user_session in user_sessions:
+            await db.refresh(user_session)
+            assert user_session.ip == "10.0.0.1"
+            assert user_session.useragent == "pytest"
+            assert user_session.last_activity == last_activity
+        assert buffer.pending == {}
+
+    async def test_latest_activity_kept(self, db: AsyncSession, user_sessions):
+        buffer = SessionActivityBuffer()
+        user_session = user_sessions[0]
+        for useragent in ("first", "second"):
+            buffer.record(
+                user_session.uuid,
+                ip=None,
+                useragent=useragent,
+                last_activity=datetime.datetime(2030, 1, 1),
+            )
+
+        assert await buffer.flush(db) == 1
+        await db.refresh(user_session)
+        assert user_session.useragent == "second"
+        assert user_session.ip == "127.0.0.1"
+
+    async def test_older_activity_does_not_overwrite(
+        self, db: AsyncSession, user_sessions
+    ):
+        buffer = SessionActivityBuffer()
+        user_session = user_sessions[0]
+        last_activity = user_session.last_activity
+        buffer.record(
+            user_session.uuid,
+            ip=None,
+            useragent=None,
+            last_activity=datetime.datetime(2000, 1, 1),
+        )
+
+        await buffer.flush(db)
+        await db.refresh(user_session)
+        assert user_session.last_activity == last_activity
+
+    async def test_min_interval(self, db: AsyncSession, user_sessions):
+        buffer = SessionActivityBuffer()
+        session_uuid = user_sessions[0].uuid
+        activity = dict(ip=None, useragent=None, last_activity=datetime.datetime.now())
+        buffer.record(session_uuid, **activity)
+        assert await buffer.flush(db) == 1
+
+        buffer.record(session_uuid, **activity)
+        assert await buffer.flush(db) == 0
+        assert session_uuid in buffer.pending
+        assert await buffer.flush(db, force=True) == 1
+
+    async def test_kept_on_failure(self, db: AsyncSession, user_sessions):
+        buffer = SessionActivityBuffer()
+        session_uuid = user_sessions[0].uuid
+        buffer.record(
+            session_uuid, ip=None, useragent=None, last_activity=datetime.datetime.now()
+        )
+
+        with mock.patch.object(db, "execute", side_effect=SQLAlchemyError), pytest.raises(
+            SQLAlchemyError
+        ):
+            await buffer.flush(db)
+
+        assert session_uuid in buffer.pending
+        assert await db.scalar(
+            select(UserSession).where(UserSession.uuid == session_uuid)
+        )
+
+    async def test_capped_while_flushes_fail(self, db: AsyncSession):
+        buffer = SessionActivityBuffer()
+        session_uuids = [uuid.uuid4() for _ in range(5)]
+        now = datetime.datetime.now()
+
+        with mock.patch.object(settings, "session_activity_max_pending", 3):
+            for session_uuid in session_uuids[:3]:
+                buffer.record(session_uuid, ip=None, useragent=None, last_activity=now)
+            with mock.patch.object(
+                db, "execute", side_effect=SQLAlchemyError
+            ), pytest.raises(SQLAlchemyError):
+                await buffer.flush(db)
+            # Recently active session is kept, the least recently active is dropped.
+            buffer.record(session_uuids[0], ip=None, useragent=None, last_activity=now)
+            for session_uuid in session_uuids[3:]:
+                buffer.record(session_uuid, ip=None, useragent=None, last_activity=now)
+
+        assert list(buffer.pending) == [session_uuids[0], *session_uuids[3:]]
+        assert buffer.dropped == 2
@@ -0,0 +1,58 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.utils.user_cache import UserSnapshotCache
+from app.models.user import User
+from app.schemas.user_schema import UserSnapshot
+
+
+@pytest.mark.anyio
+class TestUserSnapshotCache:
+    def setup_method(self):
+        self.cache = UserSnapshotCache()
+        self.patch_get_by_uuid = mock.patch(
+            "app.core.utils.user_cache.crud_user.get_by_uuid"
+        )
+
+    async def test_snapshot_loaded_from_db_once(
+        self, db: AsyncSession, redis, user: User
+    ):
+        with mock.patch(
+            "app.core.utils.user_cache.crud_user.get_by_uuid", return_value=user
+        ) as mock_get_by_uuid:
+            first = await self.cache.get(db, redis, user.uuid)
+            second = await self.cache.get(db, redis, user.uuid)
+
+        mock_get_by_uuid.assert_awaited_once()
+        assert first == second == UserSnapshot.model_validate(user)
+        redis.set.assert_awaited_once()
+
+    async def test_snapshot_loaded_from_redis(self, db: AsyncSession, redis, user: User):
+        redis.get.return_value = UserSnapshot.model_validate(user).model_dump_json()
+
+        with self.patch_get_by_uuid as mock_get_by_uuid:
+            snapshot = await self.cache.get(db, redis, user.uuid)
+
+        mock_get_by_uuid.assert_not_called()
+        assert snapshot.uuid == user.uuid
+
+    async def test_missing_user_is_not_cached(self, db: AsyncSession, redis, user: User):
+        with self.patch_get_by_uuid as mock_get_by_uuid:
+            mock_get_by_uuid.return_value = None
+            assert await self.cache.get(db, redis, user.uuid) is None
+
+        redis.set.assert_not_called()
+        assert len(self.cache.local) == 0
+
+    async def test_invalidate(self, db: AsyncSession, redis, user: User):
+        await self.cache.get(db, redis, user.uuid)
+        assert len(self.cache.local) == 1
+
+        await self.cache.invalidate(redis, user.uuid)
+
+        assert len(self.cache.local) == 0
+        pipeline = redis.pipeline.return_value.__aenter__.return_value
+        pipeline.delete.assert_called_once()
+        pipeline.publish.assert_called_once()
@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from http import HTTPStatus
+from unittest import mock
+
+import httpx
+import pytest
+from tenacity import RetryError, stop_after_attempt, wait_none
+
+from app.core.settings import settings
+from app.external.exceptions import MonolithUserCreateException
+from app.external.monolith import create_user_on_monolith, get_monolith_client
+from app.models.user import User
+
+create_user_without_backoff = create_user_on_monolith.retry_with(
+    stop=stop_after_attempt(3), wait=wait_none()
+)
+
+
+@pytest.mark.anyio
+class TestMonolith:
+    def setup_method(self):
+        self.user = User(uuid=uuid.uuid4(), username="someone", email="s@example.com")
+        self.requests: list[httpx.Request] = []
+
+    @pytest.fixture
+    def responses(self):
+        """Statuses the monolith answers with, ``None`` to hang past the deadline."""
+        statuses = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            status = statuses.pop(0)
+            if status is None:
+                await asyncio.sleep(10)
+            return httpx.Response(status)
+
+        client = httpx.AsyncClient(
+            base_url="http://monolith", transport=httpx.MockTransport(handler)
+        )
+        with mock.patch("app.external.monolith._client", client):
+            yield statuses
+
+    async def test_created(self, responses):
+        responses.append(HTTPStatus.CREATED)
+
+        await create_user_without_backoff(user=self.user)
+
+        [request] = self.requests
+        assert request.url.path == "/v1/users/"
+        assert f"external_user_uid={self.user.uuid}" in request.content.decode()
+
+    async def test_server_errors_retried(self, responses):
+        responses.extend((HTTPStatus.BAD_GATEWAY, HTTPStatus.BAD_GATEWAY, 201))
+
+        await create_user_without_backoff(user=self.user)
+
+        assert len(self.requests) == 3
+
+    async def test_retries_exhausted(self, responses):
+        responses.extend([HTTPStatus.SERVICE_UNAVAILABLE] * 3)
+
+        with pytest.raises(RetryError):
+            await create_user_without_backoff(user=self.user)
+
+        assert len(self.requests) == 3
+
+    async def test_bad_request_not_retried(self, responses):
+        responses.append(HTTPStatus.BAD_REQUEST)
+
+        with pytest.raises(MonolithUserCreateException):
+            await create_user_without_backoff(user=self.user)
+
+        assert len(self.requests) == 1
+
+    async def test_attempt_deadline(self, responses):
+        responses.extend((None, HTTPStatus.CREATED))
+
+        with mock.patch.object(settings, "monolith_attempt_deadline", 0.05):
+            await create_user_without_backoff(user=self.user)
+
+        assert len(self.requests) == 2
+
+
+@pytest.mark.anyio
+class TestMonolithClient:
+    @pytest.fixture(autouse=True)
+    def new_client(self):
+        with mock.patch("app.external.monolith._client", None):
+            yield
+
+    @pytest.mark.parametrize(
+        "header,token", ((None, None), ("X-Internal-Token", None), (None, "secret"))
+    )
+    async def test_token_header_needs_both_settings(self, header, token):
+        with mock.patch.multiple(
+            settings,
+            monolith_internal_token_header=header,
+            monolith_internal_token=token,
+        ):
+            client = get_monolith_client()
+
+        assert "X-Internal-Token" not in client.headers
+        await client.aclose()
+
+    async def test_token_header(self):
+        with mock.patch.multiple(
+            settings,
+            monolith_internal_token_header="X-Internal-Token",
+            monolith_internal_token="secret",
+        ):
+            client = get_monolith_client()
+
+        assert client.headers["X-Internal-Token"] == "secret"
+        await client.aclose()
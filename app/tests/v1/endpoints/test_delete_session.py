@@ -1,15 +1,19 @@
 import datetime
+import time
 import uuid
 from http import HTTPStatus
+from unittest import mock
 
 import jwt
 import pytest
 from freezegun import freeze_time
 from httpx import AsyncClient
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import TokenType
 from app.core.settings import settings
+from app.deps import get_redis
 from app.main import app
 from app.models.user import User, UserSession
 
@@ -28,26 +32,33 @@ class TestDeleteSession:
         ),
     )
     async def test_delete_sessions(
-        self, db: Session, except_current, expected_sessions_count, access_token_and_user
+        self,
+        db: AsyncSession,
+        except_current,
+        expected_sessions_count,
+        access_token_and_user,
     ):
         access_token, user = access_token_and_user
+        await db.refresh(user, ["sessions"])
         current_session_uuid = user.sessions[0].uuid
         first_session = UserSession(user=user, ip="127.0.0.1", useragent="Test UA")
         db.add(first_session)
-        db.commit()
+        await db.commit()
         second_session = UserSession(user=user, ip="127.0.0.1", useragent="Test UA")
         db.add(second_session)
-        db.commit()
+        await db.commit()
 
         # Create another user in order to check if we don't delete their sessions
         another_user = User(
             username="testusername", email="email@example.com", password="password"
         )
         db.add(another_user)
-        db.commit()
+        await db.commit()
         db.add(UserSession(user=another_user, ip="127.0.0.1", useragent="Test UA"))
-        db.commit()
+        await db.commit()
 
+        await db.refresh(user, ["sessions"])
+        await db.refresh(another_user, ["sessions"])
         assert len(user.sessions) == 3
         assert len(another_user.sessions) == 1
         result = await self._delete_sessions(
@@ -55,6 +66,8 @@ class TestDeleteSession:
             headers={"Authorization": f"Bearer {access_token}"},
         )
         assert result.status_code == HTTPStatus.NO_CONTENT
+        await db.refresh(user, ["sessions"])
+        await db.refresh(another_user, ["sessions"])
         assert len(user.sessions) == expected_sessions_count
         assert len(another_user.sessions) == 1
         if expected_sessions_count == 1:
@@ -129,6 +142,48 @@ class TestDeleteSession:
         response = result.json()
         assert response["detail"][0]["type"] == expected_error_type
 
+    async def test_deleted_sessions_access_tokens_revoked(
+        self, db: AsyncSession, redis, access_token_and_user
+    ):
+        access_token, user = access_token_and_user
+        await db.refresh(user, ["sessions"])
+        current_session_uuid = str(user.sessions[0].uuid)
+        headers = {"Authorization": f"Bearer {access_token}"}
+        redis.zscore.return_value = time.time() + 60
+
+        with mock.patch.dict(app.dependency_overrides, {get_redis: lambda: redis}):
+            result = await self._delete_sessions(
+                headers=headers, params={"except_current": False}
+            )
+            assert result.status_code == HTTPStatus.NO_CONTENT
+            result = await self._delete_sessions(headers=headers)
+
+        assert result.status_code == HTTPStatus.UNAUTHORIZED
+        assert result.json()["detail"][0]["type"] == "token_revoked"
+        pipeline = redis.pipeline.return_value.__aenter__.return_value
+        pipeline.zadd.assert_called_once_with(
+            settings.revocation_key, {current_session_uuid: mock.ANY}
+        )
+        redis.zscore.assert_awaited_once_with(
+            settings.revocation_key, current_session_uuid
+        )
+
+    async def test_revocation_not_stored(self, access_token_and_user, redis):
+        access_token, _ = access_token_and_user
+        pipeline = redis.pipeline.return_value.__aenter__.return_value
+        pipeline.execute.side_effect = RedisError
+
+        with mock.patch.dict(
+            app.dependency_overrides, {get_redis: lambda: redis}
+        ), mock.patch("asyncio.sleep"):
+            result = await self._delete_sessions(
+                headers={"Authorization": f"Bearer {access_token}"},
+                params={"except_current": False},
+            )
+
+        assert result.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert result.json()["detail"][0]["type"] == "session_revocation_failed"
+
     async def _delete_sessions(self, headers: dict, params: dict = None):
         async with AsyncClient(app=app, base_url="http://test") as ac:
             return await ac.delete("/v1/session/", params=params, headers=headers)
@@ -6,7 +6,7 @@ import jwt
 import pytest
 from freezegun import freeze_time
 from httpx import AsyncClient
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import TokenType
 from app.core.settings import settings
@@ -16,33 +16,38 @@ from app.models.user import User, UserSession
 
 @pytest.mark.anyio
 class TestDeleteSingleSession:
-    async def test_delete_single_session(self, db: Session, access_token_and_user):
+    async def test_delete_single_session(self, db: AsyncSession, access_token_and_user):
         access_token, user = access_token_and_user
         another_session = UserSession(user=user, ip="127.0.0.1", useragent="Test UA")
         db.add(another_session)
-        db.commit()
+        await db.commit()
 
+        await db.refresh(user, ["sessions"])
         assert len(user.sessions) == 2
         result = await self._delete_session(
             str(another_session.uuid),
             headers={"Authorization": f"Bearer {access_token}"},
         )
         assert result.status_code == HTTPStatus.NO_CONTENT
+        await db.refresh(user, ["sessions"])
         assert len(user.sessions) == 1
 
-    async def test_delete_single_session_not_existing(self, access_token_and_user):
+    async def test_delete_single_session_not_existing(
+        self, db: AsyncSession, access_token_and_user
+    ):
         access_token, user = access_token_and_user
 
         result = await self._delete_session(
             str(uuid.uuid4()), headers={"Authorization": f"Bearer {access_token}"}
         )
         assert result.status_code == HTTPStatus.NOT_FOUND
+        await db.refresh(user, ["sessions"])
         assert len(user.sessions) == 1
         response = result.json()
         assert response["detail"][0]["type"] == "not_found"
 
     async def test_cannot_delete_other_user_session(
-        self, db: Session, access_token_and_user
+        self, db: AsyncSession, access_token_and_user
     ):
         access_token, original_user = access_token_and_user
 
@@ -52,19 +57,21 @@ class TestDeleteSingleSession:
             password="password",
         )
         db.add(another_user)
-        db.commit()
+        await db.commit()
 
         another_user_session = UserSession(
             user=another_user, ip="127.0.0.1", useragent="Test UA"
         )
         db.add(another_user_session)
-        db.commit()
+        await db.commit()
 
         result = await self._delete_session(
             str(another_user_session.uuid),
             headers={"Authorization": f"Bearer {access_token}"},
         )
         assert result.status_code == HTTPStatus.NOT_FOUND
+        await db.refresh(original_user, ["sessions"])
+        await db.refresh(another_user, ["sessions"])
         assert len(original_user.sessions) == 1
         assert len(another_user.sessions) == 1
 
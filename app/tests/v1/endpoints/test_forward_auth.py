@@ -0,0 +1,93 @@
+import datetime
+import hashlib
+import time
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from freezegun import freeze_time
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.core.utils.user_cache import user_snapshot_cache
+from app.main import app
+from app.v1.endpoints.forward_auth import forward_auth_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_forward_auth_cache():
+    forward_auth_cache.clear()
+    yield
+    forward_auth_cache.clear()
+
+
+@pytest.mark.anyio
+class TestForwardAuth:
+    async def test_authorized(self, db: AsyncSession, access_token_and_user):
+        access_token, user = access_token_and_user
+        result = await self._forward_auth(access_token)
+
+        await db.refresh(user, ["sessions"])
+        assert result.status_code == HTTPStatus.OK
+        assert result.content == b""
+        assert result.headers["x-user-id"] == str(user.uuid)
+        assert result.headers["x-session-id"] == str(user.sessions[0].uuid)
+
+    @pytest.mark.parametrize("authorization", (None, "Bearer wrong", "Basic dXNlcg=="))
+    async def test_unauthorized(self, authorization: str | None):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            result = await ac.get(
+                "/v1/forward-auth/",
+                headers={"Authorization": authorization} if authorization else {},
+            )
+        assert result.status_code == HTTPStatus.UNAUTHORIZED
+        assert result.content == b""
+
+    async def test_expired(self, access_token_and_user):
+        access_token, _ = access_token_and_user
+        with freeze_time(
+            datetime.datetime.now()
+            + datetime.timedelta(minutes=settings.jwt_access_token_lifetime_minutes + 1)
+        ):
+            result = await self._forward_auth(access_token)
+        assert result.status_code == HTTPStatus.UNAUTHORIZED
+
+    async def test_result_memoised(self, access_token_and_user):
+        access_token, _ = access_token_and_user
+        with mock.patch.object(
+            user_snapshot_cache, "get", wraps=user_snapshot_cache.get
+        ) as get_user:
+            first = await self._forward_auth(access_token)
+            second = await self._forward_auth(access_token)
+
+        assert first.status_code == second.status_code == HTTPStatus.OK
+        assert first.headers["x-session-id"] == second.headers["x-session-id"]
+        get_user.assert_awaited_once()
+
+    async def test_memoised_not_longer_than_exp(self, access_token_and_user):
+        access_token, _ = access_token_and_user
+        with mock.patch.object(settings, "forward_auth_cache_ttl", 3600):
+            result = await self._forward_auth(access_token)
+
+        assert result.status_code == HTTPStatus.OK
+        expires_at, _ = forward_auth_cache._data[
+            hashlib.sha256(access_token.encode()).digest()
+        ]
+        assert expires_at - time.monotonic() <= (
+            settings.jwt_access_token_lifetime_minutes * 60
+        )
+
+    async def test_not_found_user_not_memoised(self, access_token_and_user):
+        access_token, _ = access_token_and_user
+        with mock.patch.object(user_snapshot_cache, "get", return_value=None):
+            result = await self._forward_auth(access_token)
+
+        assert result.status_code == HTTPStatus.UNAUTHORIZED
+        assert len(forward_auth_cache) == 0
+
+    async def _forward_auth(self, access_token: str):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            return await ac.get(
+                "/v1/forward-auth/", headers={"Authorization": f"Bearer {access_token}"}
+            )
@@ -0,0 +1,108 @@
+import datetime
+import uuid
+from http import HTTPStatus
+from unittest import mock
+
+import jwt
+import pytest
+from freezegun import freeze_time
+from httpx import AsyncClient
+
+from app.core.settings import settings
+from app.core.utils.security import generate_jwt_access_token
+from app.crud import crud_user_session
+from app.main import app
+from app.models.user import User
+
+
+@pytest.mark.anyio
+class TestIntrospectToken:
+    async def test_batch_introspected(
+        self, access_token_and_user: tuple[str, User], refresh_token: str
+    ):
+        access_token, user = access_token_and_user
+        revoked_token = await generate_jwt_access_token(user=user, jti=uuid.uuid4())
+        tokens = [
+            access_token,
+            revoked_token,
+            refresh_token,
+            jwt.encode({"some": "token"}, "secret"),
+        ]
+        with mock.patch.object(
+            crud_user_session,
+            "get_existing_user_session_uuids",
+            wraps=crud_user_session.get_existing_user_session_uuids,
+        ) as lookup:
+            result = await self._introspect(data={"tokens": tokens})
+
+        assert result.status_code == HTTPStatus.OK
+        active, revoked, refresh, invalid = result.json()
+        lookup.assert_awaited_once()
+        assert active["active"] is True
+        assert active["claims"]["user_id"] == str(user.uuid)
+        assert active["claims"]["token_type"] == "access"
+        assert revoked["active"] is False
+        assert revoked["revoked"] is True
+        assert revoked["error"] == "session_from_token_not_found"
+        assert refresh == {
+            "active": False,
+            "revoked": False,
+            "error": "wrong_token_type",
+            "claims": None,
+        }
+        assert invalid == {
+            "active": False,
+            "revoked": False,
+            "error": "token_invalid",
+            "claims": None,
+        }
+
+    async def test_expired_token(self, access_token_and_user: tuple[str, User]):
+        access_token, _ = access_token_and_user
+        with freeze_time(
+            datetime.datetime.now()
+            + datetime.timedelta(minutes=settings.jwt_access_token_lifetime_minutes + 1)
+        ):
+            result = await self._introspect(data={"tokens": [access_token]})
+
+        assert result.status_code == HTTPStatus.OK
+        [expired] = result.json()
+        assert expired["active"] is False
+        assert expired["error"] == "token_expired"
+
+    @pytest.mark.parametrize("size", (0, settings.token_introspection_max_batch + 1))
+    async def test_batch_size_limited(self, size: int):
+        result = await self._introspect(data={"tokens": ["token"] * size})
+        assert result.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    @pytest.mark.parametrize(
+        "internal_token,headers",
+        (
+            ("internal-secret", {}),
+            ("internal-secret", {"X-Internal-Token": "wrong"}),
+            (None, {"X-Internal-Token": ""}),
+        ),
+    )
+    async def test_internal_token_required(
+        self, access_token_and_user: tuple[str, User], internal_token, headers
+    ):
+        access_token, _ = access_token_and_user
+        with mock.patch.object(settings, "internal_token", internal_token):
+            async with AsyncClient(app=app, base_url="http://test") as ac:
+                result = await ac.post(
+                    "/v1/token/introspect",
+                    json={"tokens": [access_token]},
+                    headers=headers,
+                )
+
+        assert result.status_code == HTTPStatus.FORBIDDEN
+        assert result.json()["detail"][0]["type"] == "forbidden"
+
+    async def _introspect(self, data: dict):
+        with mock.patch.object(settings, "internal_token", "internal-secret"):
+            async with AsyncClient(app=app, base_url="http://test") as ac:
+                return await ac.post(
+                    "/v1/token/introspect",
+                    json=data,
+                    headers={settings.internal_token_header: "internal-secret"},
+                )
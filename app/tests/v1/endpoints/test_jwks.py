@@ -0,0 +1,38 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+
+from app.benchmarks.jwt_algorithms import generate_key_pair
+from app.core.settings import settings
+from app.main import app
+
+
+@pytest.mark.anyio
+class TestJWKS:
+    async def test_jwks(self):
+        private_key, public_key = generate_key_pair("RS256")
+        with mock.patch.multiple(
+            settings,
+            jwt_algorithm="RS256",
+            jwt_rsa_private_key=private_key,
+            jwt_rsa_public_key=public_key,
+        ):
+            async with AsyncClient(app=app, base_url="http://test") as ac:
+                result = await ac.get("/.well-known/jwks.json")
+                not_modified = await ac.get(
+                    "/.well-known/jwks.json",
+                    headers={"If-None-Match": result.headers["etag"]},
+                )
+
+        assert result.status_code == HTTPStatus.OK
+        assert (
+            result.headers["cache-control"] == f"public, max-age={settings.jwks_max_age}"
+        )
+        [key] = result.json()["keys"]
+        assert key["kty"] == "RSA"
+        assert key["alg"] == "RS256"
+        assert key["kid"]
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        assert not_modified.content == b""
@@ -1,13 +1,20 @@
+import datetime
+import uuid
 from http import HTTPStatus
+from unittest import mock
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import TokenType
-from app.core.utils.security import decode_token
+from app.core.settings import settings
+from app.core.utils.rate_limit import failures_key, lockout_key
+from app.core.utils.security import decode_token, password_hashing_executor
+from app.deps import get_redis
 from app.main import app
-from app.models.user import User
+from app.models.user import User, UserSession
 from app.tests.data import TestUser
 
 
@@ -19,6 +26,8 @@ class TestLoginUser:
             (TestUser.username, TestUser.password, HTTPStatus.OK),
             (TestUser.username, "wrongpassword", HTTPStatus.UNAUTHORIZED),
             (TestUser.email, TestUser.password, HTTPStatus.OK),
+            (TestUser.username.upper(), TestUser.password, HTTPStatus.OK),
+            (TestUser.email.upper(), TestUser.password, HTTPStatus.OK),
             (TestUser.email, "wrongpassword", HTTPStatus.UNAUTHORIZED),
             ("wrongusername", TestUser.password, HTTPStatus.UNAUTHORIZED),
             ("wrongemail@example.com", TestUser.password, HTTPStatus.UNAUTHORIZED),
@@ -34,11 +43,11 @@ class TestLoginUser:
         username,
         password,
         expected_status_code,
-        db: Session,
+        db: AsyncSession,
         user: User,
     ):
         user.is_active = user_is_active
-        db.commit()
+        await db.commit()
 
         result = await self._login({"username": username, "password": password})
 
@@ -47,6 +56,7 @@ class TestLoginUser:
         if expected_status_code != HTTPStatus.OK:
             assert response["detail"][0]["type"] == "wrong_credentials"
             return
+        await db.refresh(user, ["sessions"])
         assert len(user.sessions) == 1
         assert response["uuid"] == str(user.uuid)
         assert response["username"] == user.username
@@ -63,6 +73,79 @@ class TestLoginUser:
         assert refresh_token.user_id == str(user.uuid)
         assert refresh_token.jti == str(user.sessions[0].uuid)
 
+    async def test_login_password_hashing_overloaded(self, user: User):
+        saturated = (
+            password_hashing_executor.max_workers
+            + password_hashing_executor.max_queue_size
+        )
+        with mock.patch.object(password_hashing_executor.stats, "pending", saturated):
+            result = await self._login(
+                {"username": TestUser.username, "password": TestUser.password}
+            )
+
+        assert result.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        response = result.json()
+        assert response["detail"][0]["type"] == "service_overloaded"
+
+    async def test_oldest_sessions_evicted_over_limit(
+        self, db: AsyncSession, redis, user: User
+    ):
+        sessions = []
+        for minutes in range(3):
+            user_session = UserSession(
+                user=user,
+                ip="127.0.0.1",
+                last_activity=datetime.datetime(2030, 1, 1)
+                + datetime.timedelta(minutes=minutes),
+            )
+            db.add(user_session)
+            await db.commit()
+            sessions.append(user_session)
+
+        with mock.patch.object(settings, "max_sessions_per_user", 2), mock.patch.dict(
+            app.dependency_overrides, {get_redis: lambda: redis}
+        ):
+            result = await self._login(
+                data={"username": TestUser.username, "password": TestUser.password}
+            )
+
+        assert result.status_code == HTTPStatus.OK
+        access_token = await decode_token(result.json()["access_token"])
+        remaining = set(await db.scalars(select(UserSession.uuid)))
+        assert remaining == {sessions[-1].uuid, uuid.UUID(access_token.jti)}
+        pipeline = redis.pipeline.return_value.__aenter__.return_value
+        pipeline.zadd.assert_called_once_with(
+            settings.revocation_key,
+            {str(sessions[0].uuid): mock.ANY, str(sessions[1].uuid): mock.ANY},
+        )
+
+    async def test_rate_limited_before_password_check(self, redis, user: User):
+        redis.evalsha.return_value = [0, 2500]
+
+        with mock.patch.dict(
+            app.dependency_overrides, {get_redis: lambda: redis}
+        ), mock.patch("app.v1.endpoints.user.check_password") as mock_check_password:
+            result = await self._login(
+                {"username": TestUser.username, "password": TestUser.password}
+            )
+
+        assert result.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert result.headers["retry-after"] == "3"
+        assert result.json()["detail"][0]["type"] == "too_many_requests"
+        redis.evalsha.assert_awaited_once()
+        mock_check_password.assert_not_called()
+
+    async def test_failed_login_recorded(self, redis, user: User):
+        with mock.patch.dict(app.dependency_overrides, {get_redis: lambda: redis}):
+            result = await self._login(
+                {"username": TestUser.username, "password": "wrongpassword"}
+            )
+
+        assert result.status_code == HTTPStatus.UNAUTHORIZED
+        _, _, failures, lockout, *_ = redis.evalsha.await_args.args
+        assert failures == failures_key(TestUser.username)
+        assert lockout == lockout_key(TestUser.username)
+
     async def _login(self, data: dict):
         async with AsyncClient(app=app, base_url="http://test") as ac:
             return await ac.post("/v1/user/login", json=data)
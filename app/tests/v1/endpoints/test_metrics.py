@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+from app.models.user import User
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.anyio
+class TestMetrics:
+    async def test_metrics(self, user: User):
+        route = {"method": "POST", "route": "/v1/user/login", "status": "401"}
+        requests_before = _sample("kapibara_http_request_duration_seconds_count", **route)
+        errors_before = _sample(
+            "kapibara_errors_total", error_type="wrong_credentials", status="401"
+        )
+        verified_before = _sample(
+            "kapibara_executor_run_seconds_count", executor="password-hashing"
+        )
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            login = await ac.post(
+                "/v1/user/login",
+                json={"username": user.username, "password": "wrongpassword"},
+            )
+            result = await ac.get("/metrics")
+
+        assert login.status_code == HTTPStatus.UNAUTHORIZED
+        assert result.status_code == HTTPStatus.OK
+        assert result.headers["content-type"].startswith("text/plain")
+        assert "kapibara_http_request_duration_seconds_bucket" in result.text
+        assert (
+            _sample("kapibara_http_request_duration_seconds_count", **route)
+            == requests_before + 1
+        )
+        assert (
+            _sample("kapibara_errors_total", error_type="wrong_credentials", status="401")
+            == errors_before + 1
+        )
+        assert (
+            _sample("kapibara_executor_run_seconds_count", executor="password-hashing")
+            == verified_before + 1
+        )
+
+    async def test_unmatched_route(self):
+        before = _sample(
+            "kapibara_http_request_duration_seconds_count",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            await ac.get("/v1/no-such-route")
+
+        assert (
+            _sample(
+                "kapibara_http_request_duration_seconds_count",
+                method="GET",
+                route="unmatched",
+                status="404",
+            )
+            == before + 1
+        )
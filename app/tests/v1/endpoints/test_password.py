@@ -5,6 +5,7 @@ import pytest
 from httpx import AsyncClient
 
 from app.core.enums import ConfirmationCodeType
+from app.core.utils.security import password_hashing_executor
 from app.main import app
 from app.models.user import User, UserSession
 from app.schemas.security_schema import ConfirmationCodeData
@@ -116,10 +117,10 @@ class TestPassword:
     async def test_user_sessions_are_deleted(self, db, user: User):
         first_session = UserSession(user=user, ip="127.0.0.1", useragent="Test UA")
         db.add(first_session)
-        db.commit()
+        await db.commit()
         second_session = UserSession(user=user, ip="127.0.0.1", useragent="Test UA")
         db.add(second_session)
-        db.commit()
+        await db.commit()
         old_session_uuids = [first_session.uuid, second_session.uuid]
 
         with (
@@ -139,9 +140,56 @@ class TestPassword:
 
         assert result.status_code == HTTPStatus.CREATED, result.content.decode()
 
+        await db.refresh(user, ["sessions"])
         assert len(user.sessions) == 1
         assert user.sessions[0].uuid not in old_session_uuids
 
+    async def test_password_confirm_blocklisted_username(self, db, user: User):
+        # Registered before the blocklist started matching substrings.
+        user.username = "badminton"
+        await db.commit()
+
+        with (
+            self.mock_fetch_confirmation_code_data as mock_fetch_confirmation_code_data,
+            self.patch_external,
+        ):
+            mock_fetch_confirmation_code_data.return_value = ConfirmationCodeData(
+                user_uuid=user.uuid, code_type=ConfirmationCodeType.email
+            )
+
+            result = await self._password_confirm(
+                {
+                    "code": "code",
+                    "password": "jWe833WkF@5W",
+                }
+            )
+
+        assert result.status_code == HTTPStatus.CREATED, result.content.decode()
+
+    async def test_password_hashing_overloaded(self, user: User):
+        saturated = (
+            password_hashing_executor.max_workers
+            + password_hashing_executor.max_queue_size
+        )
+        with (
+            self.mock_fetch_confirmation_code_data as mock_fetch_confirmation_code_data,
+            self.patch_external,
+            mock.patch.object(password_hashing_executor.stats, "pending", saturated),
+        ):
+            mock_fetch_confirmation_code_data.return_value = ConfirmationCodeData(
+                user_uuid=user.uuid, code_type=ConfirmationCodeType.email
+            )
+
+            result = await self._password_confirm(
+                {
+                    "code": "code",
+                    "password": "jWe833WkF@5W",
+                }
+            )
+
+        assert result.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert result.json()["detail"][0]["type"] == "service_overloaded"
+
     async def _password_confirm(self, data: dict):
         async with AsyncClient(app=app, base_url="http://test") as ac:
             return await ac.post("/v1/password/confirm", json=data)
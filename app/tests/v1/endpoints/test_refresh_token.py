@@ -6,28 +6,34 @@ import jwt
 import pytest
 from freezegun import freeze_time
 from httpx import AsyncClient
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import TokenType
 from app.core.settings import settings
 from app.core.utils.security import generate_jwt_refresh_token
+from app.core.utils.session_activity import session_activity_buffer
 from app.main import app
 from app.models.user import User, UserSession
 
 
 @pytest.mark.anyio
 class TestRefreshToken:
-    async def test_token_refreshed(self, db: Session, refresh_token: str):
+    async def test_token_refreshed(self, db: AsyncSession, refresh_token: str):
         token_refresh_timestamp = datetime.datetime.now() + datetime.timedelta(
             days=settings.jwt_refresh_token_lifetime_days - 1
         )
         with freeze_time(token_refresh_timestamp):
             result = await self._refresh_token(data={"refresh_token": refresh_token})
 
-        user_session = db.query(UserSession).first()
+        user_session = await db.scalar(select(UserSession))
         assert result.status_code == HTTPStatus.CREATED
         response = result.json()
         assert response["refresh_token"] == refresh_token
+        assert user_session.last_activity != token_refresh_timestamp
+
+        await session_activity_buffer.flush(db, force=True)
+        await db.refresh(user_session)
         assert user_session.last_activity == token_refresh_timestamp
 
     async def test_cannot_be_refreshed_with_wrong_token_type(self, access_token_and_user):
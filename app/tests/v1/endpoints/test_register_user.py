@@ -4,12 +4,15 @@ from unittest import mock
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.enums import MonolithSyncMode
+from app.core.settings import settings
 from app.core.utils.security import check_password, generate_hashed_password
 from app.crud import crud_user
 from app.main import app
-from app.models.user import User
+from app.models.user import User, UserSyncOutbox
 
 
 @pytest.mark.anyio
@@ -30,7 +33,7 @@ class TestRegisterUser:
         )
         self.patch_create_user = mock.patch("app.crud.crud_user.create_user_on_monolith")
 
-    async def test_register_user(self, db: Session):
+    async def test_register_user(self, db: AsyncSession):
         with self.patch_create_user, self.patch_externals:
             result = await self._register(self.user_data)
 
@@ -42,9 +45,25 @@ class TestRegisterUser:
         assert response["refresh_token"] == await self.mock_refresh_token()
         user = await crud_user.get_by_email(db, self.user_data["email"])
         assert user.is_active is False
-        assert check_password(self.user_data["password"], user.password) is True
+        assert await check_password(self.user_data["password"], user.password) is True
+        await db.refresh(user, ["sessions"])
         assert len(user.sessions) == 1
 
+    async def test_register_user_deferred_sync(self, db: AsyncSession):
+        with (
+            mock.patch.object(settings, "monolith_sync_mode", MonolithSyncMode.deferred),
+            self.patch_create_user as mock_create_user,
+            self.patch_externals,
+        ):
+            result = await self._register(self.user_data)
+
+        assert result.status_code == HTTPStatus.CREATED, result.content.decode()
+        mock_create_user.assert_not_called()
+        user = await crud_user.get_by_email(db, self.user_data["email"])
+        assert user.synced_at is None
+        outbox_row = await db.scalar(select(UserSyncOutbox))
+        assert outbox_row.user_uuid == user.uuid
+
     @pytest.mark.parametrize(
         "username,expected_error_code",
         (
@@ -54,6 +73,7 @@ class TestRegisterUser:
             (" admin ", "forbidden_username"),
             ("moder ", "forbidden_username"),
             (" moderator", "forbidden_username"),
+            ("superadmin1", "forbidden_username"),
         ),
     )
     async def test_register_user_invalid_username(self, username, expected_error_code):
@@ -66,6 +86,7 @@ class TestRegisterUser:
         response = result.json()
         assert response["detail"][0]["type"] == expected_error_code
 
+    @pytest.mark.parametrize("change_case", (str.lower, str.upper))
     @pytest.mark.parametrize(
         "existing_data,expected_error_type",
         (
@@ -74,20 +95,20 @@ class TestRegisterUser:
         ),
     )
     async def test_register_user_with_existing_data(
-        self, db: Session, existing_data, expected_error_type
+        self, db: AsyncSession, existing_data, expected_error_type, change_case
     ):
         existing_db_user = User(
             uuid=uuid.uuid4(),
             username="newuser",
             email="tst@example.com",
-            password=generate_hashed_password("password"),
+            password=await generate_hashed_password("password"),
         )
         db.add(existing_db_user)
         data = {
             "email": "other@example.com",
             "username": "username",
             "password": "ComplexPassword123!",
-            existing_data: getattr(existing_db_user, existing_data),
+            existing_data: change_case(getattr(existing_db_user, existing_data)),
         }
         with self.patch_create_user, self.patch_externals:
             result = await self._register(data)
@@ -96,7 +117,7 @@ class TestRegisterUser:
         response = result.json()
         assert response["detail"][0]["type"] == expected_error_type
 
-    async def test_register_user_monolith_not_responding(self, db: Session):
+    async def test_register_user_monolith_not_responding(self, db: AsyncSession):
         with mock.patch(
             "app.crud.crud_user.create_user_on_monolith",
             side_effect=Exception("From test"),
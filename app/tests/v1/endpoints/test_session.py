@@ -1,12 +1,16 @@
+import base64
 import datetime
+import json
 import uuid
 from http import HTTPStatus
+from unittest import mock
 
 import jwt
 import pytest
 from freezegun import freeze_time
 from httpx import AsyncClient
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.enums import TokenType
 from app.core.settings import settings
@@ -16,7 +20,7 @@ from app.models.user import UserSession
 
 @pytest.mark.anyio
 class TestSession:
-    async def test_list_sessions(self, db: Session, access_token_and_user):
+    async def test_list_sessions(self, db: AsyncSession, access_token_and_user):
         access_token, _ = access_token_and_user
         result = await self._get_sessions(
             headers={"Authorization": f"Bearer {access_token}"}
@@ -24,9 +28,21 @@ class TestSession:
         assert result.status_code == HTTPStatus.OK
         response = result.json()
         assert len(response) == 1
-        session = db.query(UserSession).first()
+        session = await db.scalar(select(UserSession))
         assert response[0]["uuid"] == str(session.uuid)
 
+    async def test_list_sessions_does_not_load_user(
+        self, db: AsyncSession, access_token_and_user
+    ):
+        access_token, _ = access_token_and_user
+        with mock.patch("app.deps.user_snapshot_cache.get") as mock_get_user:
+            result = await self._get_sessions(
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
+        assert result.status_code == HTTPStatus.OK
+        assert len(result.json()) == 1
+        mock_get_user.assert_not_called()
+
     async def test_list_sessions_wrong_token(self, refresh_token):
         result = await self._get_sessions(
             headers={"Authorization": f"Bearer {refresh_token}"}
@@ -77,9 +93,14 @@ class TestSession:
         result = await self._get_sessions(
             headers={"Authorization": f"Bearer {access_token}"}
         )
+        if isinstance(user_id, uuid.UUID) and isinstance(jti, uuid.UUID):
+            # Listing trusts token claims, so unknown user just has no sessions.
+            assert result.status_code == HTTPStatus.OK
+            assert result.json() == []
+            return
         assert result.status_code == HTTPStatus.UNAUTHORIZED
         response = result.json()
-        assert response["detail"][0]["type"] in ("token_invalid", "user_not_found")
+        assert response["detail"][0]["type"] == "token_invalid"
 
     @pytest.mark.parametrize(
         "auth_header,expected_error_type,expected_status_code",
@@ -96,9 +117,76 @@ class TestSession:
         response = result.json()
         assert response["detail"][0]["type"] == expected_error_type
 
-    async def _get_sessions(self, headers: dict):
+    async def test_list_sessions_non_string_kid(self, access_token_and_user):
+        access_token, _ = access_token_and_user
+        _, payload, signature = access_token.split(".")
+        header = {"alg": settings.jwt_algorithm, "typ": "JWT", "kid": 1}
+        encoded_header = base64.urlsafe_b64encode(json.dumps(header).encode())
+        token = ".".join((encoded_header.rstrip(b"=").decode(), payload, signature))
+
+        result = await self._get_sessions(headers={"Authorization": f"Bearer {token}"})
+
+        assert result.status_code == HTTPStatus.UNAUTHORIZED
+        assert result.json()["detail"][0]["type"] == "token_invalid"
+
+    async def test_list_sessions_paginated(self, db: AsyncSession, access_token_and_user):
+        access_token, user = access_token_and_user
+        for minutes in range(4):
+            db.add(
+                UserSession(
+                    user=user,
+                    ip="127.0.0.1",
+                    last_activity=datetime.datetime(2030, 1, 1)
+                    + datetime.timedelta(minutes=minutes),
+                )
+            )
+            await db.commit()
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        pages, cursor = [], None
+        while True:
+            result = await self._get_sessions(
+                headers=headers,
+                params={"limit": 2, **({"cursor": cursor} if cursor else {})},
+            )
+            assert result.status_code == HTTPStatus.OK
+            pages.append(result.json())
+            cursor = result.headers.get("x-next-cursor")
+            if not cursor:
+                break
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        sessions = [session for page in pages for session in page]
+        await db.refresh(user, ["sessions"])
+        assert {session["uuid"] for session in sessions} == {
+            str(user_session.uuid) for user_session in user.sessions
+        }
+        last_activities = [session["last_activity"] for session in sessions]
+        assert last_activities == sorted(last_activities, reverse=True)
+
+    @pytest.mark.parametrize(
+        "params, expected_status_code",
+        (
+            ({"cursor": "not a cursor"}, HTTPStatus.BAD_REQUEST),
+            ({"limit": 0}, HTTPStatus.UNPROCESSABLE_ENTITY),
+            (
+                {"limit": settings.session_list_max_page_size + 1},
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+            ),
+        ),
+    )
+    async def test_list_sessions_wrong_page(
+        self, access_token_and_user, params, expected_status_code
+    ):
+        access_token, _ = access_token_and_user
+        result = await self._get_sessions(
+            headers={"Authorization": f"Bearer {access_token}"}, params=params
+        )
+        assert result.status_code == expected_status_code
+
+    async def _get_sessions(self, headers: dict, params=None):
         async with AsyncClient(app=app, base_url="http://test") as ac:
-            return await ac.get("/v1/session/", headers=headers)
+            return await ac.get("/v1/session/", params=params, headers=headers)
 
     async def _delete_sessions(self, headers: dict, params=None):
         async with AsyncClient(app=app, base_url="http://test") as ac:
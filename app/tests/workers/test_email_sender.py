@@ -0,0 +1,121 @@
+import asyncio
+import json
+from smtplib import SMTPException
+from unittest import mock
+
+import pytest
+
+from app.core.settings import settings
+from app.db.redis import close_redis_client
+from app.schemas.email_schema import OutboxEmail
+from app.workers.email_sender import EmailWorker, create_worker_redis_client
+
+
+@pytest.mark.anyio
+class TestEmailWorker:
+    def setup_method(self):
+        self.pipe = mock.MagicMock()
+        self.pipe.execute = mock.AsyncMock()
+        self.redis = mock.MagicMock()
+        self.redis.pipeline.return_value.__aenter__.return_value = self.pipe
+        self.smtp_session = mock.MagicMock()
+        self.worker = EmailWorker(self.redis, smtp_session=self.smtp_session)
+
+    async def test_sent_emails_are_removed_from_outbox(self):
+        await self.worker.process(
+            [(b"1-0", self._fields()), (b"2-0", self._fields(to="b@example.com"))]
+        )
+
+        assert self.smtp_session.send.call_count == 2
+        self.pipe.xack.assert_called_once_with(
+            settings.email_outbox_stream, settings.email_outbox_group, b"1-0", b"2-0"
+        )
+        self.pipe.xdel.assert_called_once_with(
+            settings.email_outbox_stream, b"1-0", b"2-0"
+        )
+        self.pipe.zadd.assert_not_called()
+        self.pipe.lpush.assert_not_called()
+
+    async def test_failed_email_is_scheduled_for_retry(self):
+        self.smtp_session.send.side_effect = SMTPException("From test")
+
+        await self.worker.process([(b"1-0", self._fields())])
+
+        self.pipe.zadd.assert_called_once()
+        key, members = self.pipe.zadd.call_args.args
+        assert key == settings.email_outbox_retry_key
+        (payload,) = members
+        assert json.loads(payload)["attempts"] == 1
+        self.pipe.xack.assert_called_once()
+        self.pipe.lpush.assert_not_called()
+
+    @pytest.mark.parametrize("fields", ({b"payload": b"not json"}, {}))
+    async def test_malformed_email_goes_to_dead_letter(self, fields):
+        await self.worker.process([(b"1-0", fields)])
+
+        self.smtp_session.send.assert_not_called()
+        self.pipe.lpush.assert_called_once()
+        assert self.pipe.lpush.call_args.args[0] == settings.email_outbox_dead_letter_key
+        self.pipe.xack.assert_called_once()
+
+    async def test_email_goes_to_dead_letter_after_last_attempt(self):
+        self.smtp_session.send.side_effect = SMTPException("From test")
+
+        await self.worker.process(
+            [(b"1-0", self._fields(attempts=settings.email_outbox_max_attempts - 1))]
+        )
+
+        self.pipe.zadd.assert_not_called()
+        self.pipe.lpush.assert_called_once()
+        key, payload = self.pipe.lpush.call_args.args
+        assert key == settings.email_outbox_dead_letter_key
+        assert json.loads(payload)["attempts"] == settings.email_outbox_max_attempts
+
+    async def test_empty_outbox_read_outlasts_socket_timeout(self):
+        """XREADGROUP blocks longer than the usual socket timeout on an empty stream."""
+        server = await asyncio.start_server(_idle_stream_server, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        with mock.patch.multiple(
+            settings,
+            redis_host="127.0.0.1",
+            redis_port=port,
+            redis_socket_timeout=0.1,
+            email_outbox_block_ms=300,
+        ):
+            redis = create_worker_redis_client()
+            try:
+                messages = await EmailWorker(redis)._read_new()
+            finally:
+                await close_redis_client(redis)
+                server.close()
+
+        assert messages == []
+
+    def _fields(self, to: str = "a@example.com", attempts: int = 0) -> dict:
+        email = OutboxEmail(
+            sender="no-reply@example.com",
+            to=[to],
+            subject="Subject",
+            message="Message",
+            attempts=attempts,
+        )
+        return {b"payload": email.model_dump_json().encode()}
+
+
+async def _idle_stream_server(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Redis speaking just enough RESP to answer XREADGROUP after its BLOCK time."""
+    while header := await reader.readline():
+        command = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            command.append((await reader.readexactly(length + 2))[:-2].upper())
+        if command[0] == b"XREADGROUP":
+            block_ms = int(command[command.index(b"BLOCK") + 1])
+            await asyncio.sleep(block_ms / 1000)
+            writer.write(b"*-1\r\n")
+        elif command[0] == b"PING":
+            writer.write(b"+PONG\r\n")
+        else:
+            writer.write(b"+OK\r\n")
+        await writer.drain()
+    writer.close()
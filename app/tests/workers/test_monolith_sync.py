@@ -0,0 +1,113 @@
+import asyncio
+import datetime
+from unittest import mock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.external.exceptions import MonolithUserCreateException
+from app.models.user import User, UserSyncOutbox
+from app.workers.monolith_sync import MonolithSyncDispatcher
+
+
+@pytest.mark.anyio
+class TestMonolithSyncDispatcher:
+    def setup_method(self):
+        self.dispatcher = MonolithSyncDispatcher()
+        self.patch_create_user = mock.patch(
+            "app.workers.monolith_sync.create_user_on_monolith_once"
+        )
+
+    async def test_synced_users_are_removed_from_outbox(
+        self, db: AsyncSession, user: User
+    ):
+        db.add(UserSyncOutbox(user_uuid=user.uuid))
+        await db.commit()
+
+        with self.patch_create_user as mock_create_user:
+            processed = await self.dispatcher.dispatch_batch(db)
+
+        assert processed == 1
+        mock_create_user.assert_awaited_once_with(user=user)
+        assert user.synced_at is not None
+        assert await db.scalar(select(UserSyncOutbox)) is None
+
+    async def test_failed_sync_is_retried_later(self, db: AsyncSession, user: User):
+        db.add(UserSyncOutbox(user_uuid=user.uuid))
+        await db.commit()
+
+        with self.patch_create_user as mock_create_user:
+            mock_create_user.side_effect = Exception("From test")
+            processed = await self.dispatcher.dispatch_batch(db)
+
+        assert processed == 1
+        assert user.synced_at is None
+        outbox_row = await db.scalar(select(UserSyncOutbox))
+        assert outbox_row.attempts == 1
+        assert "From test" in outbox_row.last_error
+        assert outbox_row.next_attempt_at > datetime.datetime.now()
+
+        with self.patch_create_user as mock_create_user:
+            assert await self.dispatcher.dispatch_batch(db) == 0
+        mock_create_user.assert_not_called()
+
+    async def test_exhausted_rows_are_skipped(self, db: AsyncSession, user: User):
+        db.add(
+            UserSyncOutbox(
+                user_uuid=user.uuid, attempts=settings.monolith_sync_max_attempts
+            )
+        )
+        await db.commit()
+
+        with self.patch_create_user as mock_create_user:
+            assert await self.dispatcher.dispatch_batch(db) == 0
+        mock_create_user.assert_not_called()
+
+    async def test_rows_claimed_before_calling_monolith(
+        self, db: AsyncSession, user: User
+    ):
+        outbox_row = UserSyncOutbox(user_uuid=user.uuid)
+        db.add(outbox_row)
+        await db.commit()
+        during_call = {}
+
+        async def create_user(user):
+            during_call["in_transaction"] = db.in_transaction()
+            during_call["next_attempt_at"] = outbox_row.next_attempt_at
+
+        with self.patch_create_user as mock_create_user:
+            mock_create_user.side_effect = create_user
+            assert await self.dispatcher.dispatch_batch(db) == 1
+
+        assert during_call["in_transaction"] is False
+        assert during_call["next_attempt_at"] > datetime.datetime.now()
+
+    async def test_rejected_user_is_not_retried(self, db: AsyncSession, user: User):
+        db.add(UserSyncOutbox(user_uuid=user.uuid))
+        await db.commit()
+
+        with self.patch_create_user as mock_create_user:
+            mock_create_user.side_effect = MonolithUserCreateException("Error 400")
+            assert await self.dispatcher.dispatch_batch(db) == 1
+
+        assert user.synced_at is None
+        assert await db.scalar(select(UserSyncOutbox)) is None
+
+    async def test_run_survives_unexpected_errors(self):
+        dispatcher = MonolithSyncDispatcher(session_factory=mock.MagicMock())
+
+        with (
+            mock.patch.object(
+                dispatcher, "dispatch_batch", side_effect=[ValueError("From test"), 0]
+            ) as mock_dispatch_batch,
+            mock.patch(
+                "app.workers.monolith_sync.asyncio.sleep",
+                side_effect=[None, asyncio.CancelledError],
+            ),
+            pytest.raises(asyncio.CancelledError),
+        ):
+            await dispatcher.run()
+
+        assert mock_dispatch_batch.await_count == 2
@@ -0,0 +1,64 @@
+import datetime
+from unittest import mock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import settings
+from app.models.user import User, UserSession
+from app.workers.session_gc import SessionGarbageCollector
+
+
+@pytest.mark.anyio
+class TestSessionGarbageCollector:
+    async def _add_session(
+        self, db: AsyncSession, user: User, *, created_days_ago: int, idle_days: int
+    ) -> UserSession:
+        now = datetime.datetime.now()
+        user_session = UserSession(
+            user=user,
+            ip="127.0.0.1",
+            created_at=now - datetime.timedelta(days=created_days_ago),
+            last_activity=now - datetime.timedelta(days=idle_days),
+        )
+        db.add(user_session)
+        await db.commit()
+        return user_session
+
+    @mock.patch.object(settings, "jwt_refresh_token_lifetime_days", 365)
+    async def test_expired_and_idle_sessions_deleted(self, db: AsyncSession, user: User):
+        refresh_lifetime = settings.jwt_refresh_token_lifetime_days
+        idle_days = settings.session_gc_idle_days
+        active = await self._add_session(db, user, created_days_ago=0, idle_days=0)
+        recently_used = await self._add_session(
+            db, user, created_days_ago=idle_days + 10, idle_days=idle_days - 1
+        )
+        await self._add_session(
+            db, user, created_days_ago=refresh_lifetime + 1, idle_days=refresh_lifetime
+        )
+        await self._add_session(
+            db, user, created_days_ago=idle_days + 10, idle_days=idle_days + 1
+        )
+
+        with mock.patch.object(settings, "session_gc_chunk_size", 1):
+            deleted = await SessionGarbageCollector().collect(db)
+
+        assert deleted == 2
+        remaining = set(await db.scalars(select(UserSession.uuid)))
+        assert remaining == {active.uuid, recently_used.uuid}
+
+    async def test_sessions_with_live_access_tokens_kept(
+        self, db: AsyncSession, user: User
+    ):
+        user_session = await self._add_session(
+            db, user, created_days_ago=settings.session_gc_idle_days + 10, idle_days=1
+        )
+
+        with mock.patch.object(
+            settings, "jwt_access_token_lifetime_minutes", 2 * 24 * 60
+        ), mock.patch.object(settings, "session_gc_idle_days", 0):
+            deleted = await SessionGarbageCollector().collect(db)
+
+        assert deleted == 0
+        assert await db.scalar(select(UserSession.uuid)) == user_session.uuid
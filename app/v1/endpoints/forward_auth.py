@@ -0,0 +1,83 @@
+import hashlib
+import time
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import deps
+from app.core.exceptions import KapibaraException
+from app.core.settings import settings
+from app.core.utils.cache import TTLCache
+from app.core.utils.revocation import session_revocations
+
+router = APIRouter()
+
+# sha256 of the token -> (user uuid, session uuid). Entries never outlive token `exp`.
+forward_auth_cache: TTLCache[tuple[str, str]] = TTLCache(
+    maxsize=settings.forward_auth_cache_maxsize, ttl=settings.forward_auth_cache_ttl
+)
+
+
+def _unauthorized() -> Response:
+    return Response(
+        status_code=HTTPStatus.UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+@router.get(
+    "/",
+    summary="Проверка access токена для прокси",
+    response_class=Response,
+    status_code=HTTPStatus.OK,
+    responses={
+        HTTPStatus.OK: {
+            "description": "Токен валиден, идентификаторы в заголовках "
+            "`X-User-Id` и `X-Session-Id`.",
+        },
+        HTTPStatus.UNAUTHORIZED: {
+            "description": "Токен отсутствует, невалиден или пользователь не найден.",
+        },
+    },
+)
+async def forward_auth(
+    auth: HTTPAuthorizationCredentials
+    | None = Depends(HTTPBearer(auto_error=False, description="JWT Access token")),
+    db: AsyncSession = Depends(deps.get_db),
+    redis: Redis = Depends(deps.get_redis),
+) -> Response:
+    """Эндпоинт для nginx `auth_request` и Traefik ForwardAuth.
+
+    Проверяет заголовок `Authorization: Bearer` так же, как остальные эндпоинты, и
+    отвечает без тела: `200` с заголовками `X-User-Id`/`X-Session-Id` или `401`.
+    Успешная проверка запоминается на несколько секунд, но не дольше `exp` токена.
+    Отзыв сессии проверяется и для запомненных токенов.
+    """
+    if not auth:
+        return _unauthorized()
+    cache_key = hashlib.sha256(auth.credentials.encode()).digest()
+    identity = forward_auth_cache.get(cache_key)
+    if identity is None:
+        try:
+            access_token = await deps.get_access_token(auth, redis)
+            user, session_uuid = await deps.get_current_user_and_session_uuid(
+                access_token, db, redis
+            )
+        except KapibaraException:
+            return _unauthorized()
+        identity = (str(user.uuid), str(session_uuid))
+        ttl = min(
+            settings.forward_auth_cache_ttl, access_token.exp.timestamp() - time.time()
+        )
+        if ttl > 0:
+            forward_auth_cache.set(cache_key, identity, ttl=ttl)
+    elif await session_revocations.is_revoked(redis, identity[1]):
+        forward_auth_cache.pop(cache_key)
+        return _unauthorized()
+    user_uuid, session_uuid = identity
+    return Response(
+        status_code=HTTPStatus.OK,
+        headers={"X-User-Id": user_uuid, "X-Session-Id": session_uuid},
+    )
@@ -5,19 +5,22 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Header, HTTPException, Request  # , Body
 from pydantic import ValidationError
 from redis.asyncio import Redis
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import deps
 from app.core.exceptions import (
     PasswordResetCodeInvalid,
     PasswordResetException,
     PasswordResetUserNotFound,
+    ServiceOverloaded,
 )
+from app.core.utils.revocation import session_revocations
 from app.core.utils.security import (
     fetch_confirmation_code_data,
     generate_jwt_access_token,
     generate_jwt_refresh_token,
 )
+from app.core.utils.user_cache import user_snapshot_cache
 from app.crud import crud_user, crud_user_session
 from app.crud.crud_user_session import delete_user_sessions
 from app.schemas import security_schema, user_schema
@@ -31,6 +34,7 @@ router = APIRouter()
     "/confirm",
     response_model=user_schema.UserUpdatedWithJWT,
     status_code=HTTPStatus.CREATED,  # returns 201
+    dependencies=[Depends(deps.RateLimit("password_confirm"))],
     responses={
         HTTPStatus.CREATED: {
             "model": user_schema.UserUpdatedWithJWT,
@@ -40,12 +44,20 @@ router = APIRouter()
             "model": HTTPResponse,
             "description": "Произошла ошибка. Token недействителен!",
         },
+        HTTPStatus.TOO_MANY_REQUESTS: {
+            "model": HTTPResponse,
+            "description": "Слишком много запросов, повторите после Retry-After секунд.",
+        },
+        HTTPStatus.SERVICE_UNAVAILABLE: {
+            "model": HTTPResponse,
+            "description": "Сервис перегружен, попробуйте позже.",
+        },
     },
 )
 async def confirm(
     payload: security_schema.RestorePasswordData,
     request: Request,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     redis: Redis = Depends(deps.get_redis),
     user_agent: Annotated[str | None, Header()] = None,
 ):
@@ -77,13 +89,17 @@ async def confirm(
         updated_user = await crud_user.update_user_password(
             db=db, db_user=user, obj_in=user_in_update
         )
+    except ServiceOverloaded:
+        raise
     except Exception:
         raise PasswordResetException()
 
-    await delete_user_sessions(db=db, user=user)
-    user_session = await crud_user_session.create_user_session(
+    await session_revocations.revoke(redis, await delete_user_sessions(db=db, user=user))
+    await user_snapshot_cache.invalidate(redis, user.uuid)
+    user_session, evicted_uuids = await crud_user_session.create_user_session(
         db=db, user=user, request=request, user_agent=user_agent
     )
+    await session_revocations.revoke(redis, evicted_uuids)
     logger.info("User %s reset their password successfully", user.username)
 
     return user_schema.UserUpdatedWithJWT(
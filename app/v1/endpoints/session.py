@@ -1,15 +1,20 @@
 import logging
+import uuid
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Response
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import deps
 from app.core.exceptions import NotFound
+from app.core.settings import settings
+from app.core.utils.pagination import decode_session_cursor, encode_session_cursor
+from app.core.utils.revocation import session_revocations
+from app.core.utils.user_cache import user_snapshot_cache
 from app.crud import crud_user_session
-from app.deps import get_db
-from app.models.user import User
-from app.schemas import user_schema
+from app.deps import get_db, get_redis
+from app.schemas import security_schema, user_schema
 from app.schemas.response_schema import HTTPResponse
 
 router = APIRouter()
@@ -32,7 +37,7 @@ logger = logging.getLogger(__name__)
         HTTPStatus.BAD_REQUEST: {
             "model": HTTPResponse,
             "description": "Неверный тип токена, использован `refresh_token` "
-            "вместо `access_token`",
+            "вместо `access_token`, или неверный `cursor`",
         },
         HTTPStatus.FORBIDDEN: {
             "model": HTTPResponse,
@@ -40,23 +45,41 @@ logger = logging.getLogger(__name__)
         },
     },
 )
-def get_all(
-    current_user_and_session_uuid: tuple[User, str] = Depends(
-        deps.get_current_user_and_session_uuid
-    )
+async def get_all(
+    response: Response,
+    principal: security_schema.TokenPrincipal = Depends(deps.get_token_principal),
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(
+        settings.session_list_page_size, ge=1, le=settings.session_list_max_page_size
+    ),
+    cursor: str | None = None,
 ):
-    """Возвращает все сессии залогиненного пользователя.
+    """Возвращает сессии залогиненного пользователя, начиная с последней активной.
 
     Сессия создается когда используется `/user/login` endpoint.
 
+    Сессии отдаются страницами по `limit` штук. Если есть следующая страница, в
+    заголовке ответа `X-Next-Cursor` будет курсор, который нужно передать в параметре
+    `cursor` для ее получения.
+
     Необходима авторизация по токену, который должен быть передан в headers.
 
     ```
     Authorization: Bearer <access_token>
     ```
     """
-    current_user, _ = current_user_and_session_uuid
-    return current_user.sessions
+    sessions = await crud_user_session.get_user_sessions_page(
+        db,
+        principal.user_uuid,
+        limit=limit + 1,
+        after=decode_session_cursor(cursor) if cursor else None,
+    )
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        response.headers["X-Next-Cursor"] = encode_session_cursor(
+            sessions[-1].last_activity, sessions[-1].uuid
+        )
+    return sessions
 
 
 @router.delete(
@@ -79,20 +102,26 @@ def get_all(
             "model": HTTPResponse,
             "description": "Отсутствует заголовок авторизации",
         },
+        HTTPStatus.SERVICE_UNAVAILABLE: {
+            "model": HTTPResponse,
+            "description": "Не удалось отозвать сессии, попробуйте позже.",
+        },
     },
 )
 async def delete_all(
     except_current: bool = True,
-    current_user_and_session_uuid: tuple[User, str] = Depends(
+    current_user_and_session_uuid: tuple[user_schema.UserSnapshot, str] = Depends(
         deps.get_current_user_and_session_uuid
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """Удаляет пользовательские сессии.
 
     По умолчанию будут удалены все сессии, кроме текущей. Если `GET` параметр
-    `except_current=false`, будут удалены все сессии, включая текущую, и пользователь
-    сможет пользоваться сайтом до тех пор, пока не истечет действие `access_token`.
+    `except_current=false`, будут удалены все сессии, включая текущую.
+
+    `access_token` удаленных сессий перестают приниматься сразу же.
 
     Необходима авторизация по токену, который должен быть передан в headers.
     ```
@@ -103,9 +132,11 @@ async def delete_all(
     exclude_uuids = None
     if except_current:
         exclude_uuids = [session_uuid]
-    await crud_user_session.delete_user_sessions(
+    deleted_uuids = await crud_user_session.delete_user_sessions(
         db=db, user=current_user, exclude_uuids=exclude_uuids
     )
+    await session_revocations.revoke(redis, deleted_uuids)
+    await user_snapshot_cache.invalidate(redis, current_user.uuid)
 
 
 @router.delete(
@@ -132,14 +163,19 @@ async def delete_all(
             "model": HTTPResponse,
             "description": "Сессия не найдена",
         },
+        HTTPStatus.SERVICE_UNAVAILABLE: {
+            "model": HTTPResponse,
+            "description": "Не удалось отозвать сессию, попробуйте позже.",
+        },
     },
 )
 async def delete_one(
-    session_uuid: str,
-    current_user_and_session_uuid: tuple[User, str] = Depends(
+    session_uuid: uuid.UUID,
+    current_user_and_session_uuid: tuple[user_schema.UserSnapshot, str] = Depends(
         deps.get_current_user_and_session_uuid
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """Удаляет пользовательскую сессию.
 
@@ -155,3 +191,5 @@ async def delete_one(
     if not deleted:
         logger.info("Session %s not found for user %s", session_uuid, user.username)
         raise NotFound("Сессия не найдена.")
+    await session_revocations.revoke(redis, [session_uuid])
+    await user_snapshot_cache.invalidate(redis, user.uuid)
@@ -1,11 +1,11 @@
 from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import deps
-from app.core.utils.security import refresh_access_token
-from app.custom_types.request_types import RefreshToken, UserAgent
+from app.core.utils.security import introspect_tokens, refresh_access_token
+from app.custom_types.request_types import RefreshToken, Tokens, UserAgent
 from app.schemas import response_schema
 
 router = APIRouter()
@@ -33,7 +33,7 @@ router = APIRouter()
 async def refresh(
     refresh_token: RefreshToken,
     request: Request,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     user_agent: UserAgent = None,
 ):
     """Принимает `refresh_token`, проверяет его на валидность и присутствие в БД.
@@ -50,3 +50,33 @@ async def refresh(
         access_token=access_token,
         refresh_token=refresh_token,
     )
+
+
+@router.post(
+    "/introspect",
+    response_model=list[response_schema.TokenIntrospection],
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(deps.verify_internal_token)],
+    responses={
+        HTTPStatus.OK: {
+            "model": list[response_schema.TokenIntrospection],
+            "description": "Результат проверки для каждого токена, в том же порядке.",
+        },
+        HTTPStatus.FORBIDDEN: {
+            "model": response_schema.HTTPResponse,
+            "description": "Нет или неверный внутренний токен сервиса.",
+        },
+    },
+)
+async def introspect(tokens: Tokens, db: AsyncSession = Depends(deps.get_db)):
+    """Внутренний эндпоинт для API gateway: проверка пачки токенов за один запрос.
+
+    Доступен только внутренним сервисам, передающим `settings.internal_token` в
+    заголовке `settings.internal_token_header` (по умолчанию `X-Internal-Token`).
+
+    Для каждого токена возвращается `active`, `revoked`, тип ошибки и claims. Токен
+    считается отозванным, если подпись верна, но сессии из `jti` уже нет в БД.
+    Refresh токены неактивны с ошибкой `wrong_token_type`. Сессии всех токенов
+    ищутся одним запросом.
+    """
+    return await introspect_tokens(db, tokens)
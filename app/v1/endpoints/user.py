@@ -3,7 +3,7 @@ from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, Request
 from redis.asyncio import Redis
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from tenacity import RetryError
 
 from app import deps
@@ -13,6 +13,8 @@ from app.core.exceptions import (
     UserUsernameExist,
     WrongLoginCredentials,
 )
+from app.core.utils.rate_limit import rate_limiter
+from app.core.utils.revocation import session_revocations
 from app.core.utils.security import (
     check_password,
     generate_and_email_confirmation_code,
@@ -33,6 +35,7 @@ router = APIRouter()
     "/register",
     response_model=user_schema.UserWithJWT,
     status_code=HTTPStatus.CREATED,
+    dependencies=[Depends(deps.RateLimit("register", username_field="username"))],
     responses={
         HTTPStatus.CREATED: {
             "model": user_schema.UserWithJWT,
@@ -47,12 +50,16 @@ router = APIRouter()
             "description": "Ошибка синхронизации пользователя с монолитом. "
             "Необходимо повторить отправку данных.",
         },
+        HTTPStatus.TOO_MANY_REQUESTS: {
+            "model": HTTPResponse,
+            "description": "Слишком много запросов, повторите после Retry-After секунд.",
+        },
     },
 )
 async def register(
     user_in: user_schema.UserCreate,
     request: Request,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     redis: Redis = Depends(deps.get_redis),
     user_agent: UserAgent = None,
 ):
@@ -79,9 +86,10 @@ async def register(
 
     await generate_and_email_confirmation_code(redis=redis, user=user)
 
-    user_session = await crud_user_session.create_user_session(
+    user_session, evicted_uuids = await crud_user_session.create_user_session(
         db=db, user=user, request=request, user_agent=user_agent
     )
+    await session_revocations.revoke(redis, evicted_uuids)
     logger.info("User %s registered successfully", user_in.username)
     return user_schema.UserWithJWT(
         uuid=user.uuid,
@@ -96,6 +104,9 @@ async def register(
     "/login",
     response_model=user_schema.UserWithJWT,
     status_code=HTTPStatus.OK,
+    dependencies=[
+        Depends(deps.RateLimit("login", username_field="username", lockout=True))
+    ],
     responses={
         HTTPStatus.OK: {
             "model": user_schema.UserWithJWT,
@@ -105,32 +116,40 @@ async def register(
             "model": HTTPResponse,
             "description": "Пользователь с такими данными не существует.",
         },
+        HTTPStatus.TOO_MANY_REQUESTS: {
+            "model": HTTPResponse,
+            "description": "Слишком много запросов, повторите после Retry-After секунд.",
+        },
     },
 )
 async def login(
     payload: user_schema.UserLoginData,
     request: Request,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
+    redis: Redis = Depends(deps.get_redis),
     user_agent: UserAgent = None,
 ):
     """Позволяет пользователю залогиниться и получить access и refresh токены.
 
     - `username` - Может содержать имя пользователя, либо email.
     - `password` - Пароль
-    """
-    user = await crud_user.get_by_username(db, payload.username)
-    if not user:
-        user = await crud_user.get_by_email(db, payload.username)
 
-    if not user:
-        raise WrongLoginCredentials()
+    Если у пользователя уже максимальное количество сессий, самые давно не
+    использовавшиеся из них будут удалены.
 
-    if not check_password(payload.password, user.password):
+    После нескольких неудачных попыток вход под этим именем блокируется, каждая
+    следующая неудачная попытка удваивает время блокировки.
+    """
+    user = await crud_user.get_by_username_or_email(db, payload.username)
+    if not user or not await check_password(payload.password, user.password):
+        await rate_limiter.record_failure(redis, payload.username)
         raise WrongLoginCredentials()
+    await rate_limiter.reset_failures(redis, payload.username)
 
-    user_session = await crud_user_session.create_user_session(
+    user_session, evicted_uuids = await crud_user_session.create_user_session(
         db=db, user=user, request=request, user_agent=user_agent
     )
+    await session_revocations.revoke(redis, evicted_uuids)
     return user_schema.UserWithJWT(
         uuid=user.uuid,
         username=user.username,
@@ -0,0 +1,33 @@
+import hashlib
+import json
+from http import HTTPStatus
+
+from fastapi import APIRouter, Request, Response
+
+from app.core.settings import settings
+from app.core.utils.jwt_keys import get_jwks
+
+router = APIRouter()
+
+
+@router.get(
+    "/jwks.json",
+    summary="Публичные ключи для проверки токенов",
+    response_description="JSON Web Key Set со всеми действующими ключами",
+    status_code=HTTPStatus.OK,
+)
+async def jwks(request: Request) -> Response:
+    """Ключи для локальной проверки подписи токенов в других сервисах.
+
+    Ключ для конкретного токена выбирается по `kid` из заголовка токена. Во
+    время ротации ключей в наборе присутствуют и старые, и новые ключи.
+    """
+    body = json.dumps(get_jwks(), separators=(",", ":"), sort_keys=True)
+    etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.jwks_max_age}",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
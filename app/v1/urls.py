@@ -1,10 +1,11 @@
 from fastapi import APIRouter
 
-from app.v1.endpoints import code, password, session, token, user
+from app.v1.endpoints import code, forward_auth, password, session, token, user
 
 router = APIRouter()
 
 router.include_router(code.router, prefix="/code", tags=["code"])
+router.include_router(forward_auth.router, prefix="/forward-auth", tags=["forward-auth"])
 router.include_router(password.router, prefix="/password", tags=["password"])
 router.include_router(session.router, prefix="/session", tags=["session"])
 router.include_router(token.router, prefix="/token", tags=["token"])
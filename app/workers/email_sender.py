@@ -0,0 +1,192 @@
+"""Deliver emails from the Redis outbox.
+
+Emails are added to a Redis stream by ``app.core.email.enqueue_email``. The worker reads
+them through a consumer group, so several workers can share the outbox and emails
+of a crashed worker are picked up by others. Failed emails are retried with
+exponential backoff and parked in the dead letter list after the last attempt.
+
+The worker blocks on XREADGROUP for ``settings.email_outbox_block_ms``, longer than
+the usual Redis socket timeout, so it needs its own client from
+``create_worker_redis_client``.
+
+Started in-process by the application lifespan, or standalone with
+
+    python -m app.workers.email_sender
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from smtplib import SMTPException
+
+from pydantic import ValidationError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from app.core import metrics
+from app.core.email import SMTPSession
+from app.core.settings import settings
+from app.db.redis import close_redis_client, create_redis_client
+from app.schemas.email_schema import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Move emails which are due for retry back to the outbox stream.
+MOVE_DUE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, payload in ipairs(due) do
+    redis.call('XADD', KEYS[2], '*', 'payload', payload)
+    redis.call('ZREM', KEYS[1], payload)
+end
+return #due
+"""
+
+
+def create_worker_redis_client() -> Redis:
+    """Redis client whose reads outlast the blocking wait for new emails."""
+    return create_redis_client(
+        socket_timeout=settings.email_outbox_block_ms / 1000
+        + settings.redis_socket_timeout
+    )
+
+
+class EmailWorker:
+    """Send emails from the outbox over a single long living SMTP session."""
+
+    def __init__(self, redis: Redis, smtp_session: SMTPSession | None = None):
+        self.redis = redis
+        self.smtp_session = smtp_session or SMTPSession()
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._move_due_retries = redis.register_script(MOVE_DUE_RETRIES_SCRIPT)
+
+    async def run(self):
+        group_ready = False
+        try:
+            while True:
+                try:
+                    if not group_ready:
+                        await self.ensure_group()
+                        group_ready = True
+                    await self.run_once()
+                except (RedisError, OSError):
+                    logger.exception("Email worker %s failed", self.consumer)
+                    group_ready = False
+                    await asyncio.sleep(1)
+        finally:
+            await asyncio.to_thread(self.smtp_session.close)
+
+    async def ensure_group(self):
+        try:
+            await self.redis.xgroup_create(
+                settings.email_outbox_stream,
+                settings.email_outbox_group,
+                id="0",
+                mkstream=True,
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run_once(self):
+        await self._move_due_retries(
+            keys=[settings.email_outbox_retry_key, settings.email_outbox_stream],
+            args=[time.time(), settings.email_outbox_batch_size],
+        )
+        messages = await self._claim_abandoned() or await self._read_new()
+        if messages:
+            await self.process(messages)
+        else:
+            await asyncio.to_thread(self.smtp_session.close_if_idle)
+
+    async def process(self, messages: list[tuple[bytes, dict]]):
+        delivered = []
+        for message_id, fields in messages:
+            try:
+                email = OutboxEmail.model_validate_json(fields[b"payload"])
+            except (KeyError, ValidationError):
+                logger.error("Malformed email %s in the outbox: %s", message_id, fields)
+                await self._finish(message_id, dead_letter=fields.get(b"payload", b""))
+                metrics.emails.labels("dead_letter").inc()
+                continue
+            try:
+                await asyncio.to_thread(self.smtp_session.send, email)
+            except (SMTPException, OSError):
+                logger.exception("Cannot send email %s to %s", message_id, email.to)
+                await self._retry_later(message_id, email)
+                continue
+            delivered.append(message_id)
+
+        if delivered:
+            await self._finish(*delivered)
+            metrics.emails.labels("sent").inc(len(delivered))
+            logger.info("Sent %s emails from the outbox", len(delivered))
+
+    async def _claim_abandoned(self) -> list[tuple[bytes, dict]]:
+        """Take over emails read by workers which died before sending them."""
+        _, messages, *_ = await self.redis.xautoclaim(
+            settings.email_outbox_stream,
+            settings.email_outbox_group,
+            self.consumer,
+            min_idle_time=settings.email_outbox_claim_idle_ms,
+            count=settings.email_outbox_batch_size,
+        )
+        return [(message_id, fields) for message_id, fields in messages if fields]
+
+    async def _read_new(self) -> list[tuple[bytes, dict]]:
+        response = await self.redis.xreadgroup(
+            settings.email_outbox_group,
+            self.consumer,
+            {settings.email_outbox_stream: ">"},
+            count=settings.email_outbox_batch_size,
+            block=settings.email_outbox_block_ms,
+        )
+        if not response:
+            return []
+        _, messages = response[0]
+        return messages
+
+    async def _retry_later(self, message_id: bytes, email: OutboxEmail):
+        email.attempts += 1
+        if email.attempts >= settings.email_outbox_max_attempts:
+            logger.error("Giving up on email %s to %s", message_id, email.to)
+            await self._finish(message_id, dead_letter=email.model_dump_json())
+            metrics.emails.labels("dead_letter").inc()
+            return
+        delay = settings.email_outbox_retry_base_delay * 2 ** (email.attempts - 1)
+        await self._finish(
+            message_id, retry=(email.model_dump_json(), time.time() + delay)
+        )
+        metrics.emails.labels("retried").inc()
+
+    async def _finish(
+        self,
+        *message_ids: bytes,
+        dead_letter: str | bytes | None = None,
+        retry: tuple[str, float] | None = None,
+    ):
+        """Remove messages from the outbox, parking or rescheduling them atomically."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if dead_letter is not None:
+                pipe.lpush(settings.email_outbox_dead_letter_key, dead_letter)
+            if retry:
+                payload, due_at = retry
+                pipe.zadd(settings.email_outbox_retry_key, {payload: due_at})
+            pipe.xack(
+                settings.email_outbox_stream, settings.email_outbox_group, *message_ids
+            )
+            pipe.xdel(settings.email_outbox_stream, *message_ids)
+            await pipe.execute()
+
+
+async def main():
+    redis_client = create_worker_redis_client()
+    try:
+        await EmailWorker(redis_client).run()
+    finally:
+        await close_redis_client(redis_client)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""Push users queued in the ``UserSyncOutbox`` to the monolith.
+
+Used when ``settings.monolith_sync_mode`` is ``deferred``. Rows are claimed with
+``FOR UPDATE SKIP LOCKED`` by moving their ``next_attempt_at`` forward by
+``settings.monolith_sync_claim_duration`` in a short transaction, so several
+dispatchers can run at the same time without holding locks during monolith calls.
+Rows of a dispatcher which died are picked up again once their claim runs out.
+
+Started in-process by the application lifespan, or standalone with
+
+    python -m app.workers.monolith_sync
+"""
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import joinedload
+from tenacity import stop_after_attempt
+
+from app.core.settings import settings
+from app.db.session import SessionLocal
+from app.external.exceptions import MonolithUserCreateException
+from app.external.monolith import create_user_on_monolith
+from app.models.user import UserSyncOutbox
+
+logger = logging.getLogger(__name__)
+
+# Dispatcher has its own backoff, so every outbox row gets a single attempt per batch.
+create_user_on_monolith_once = create_user_on_monolith.retry_with(
+    stop=stop_after_attempt(1), reraise=True
+)
+
+
+class MonolithSyncDispatcher:
+    """Sync users from the outbox to the monolith in batches."""
+
+    def __init__(self, session_factory: async_sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+
+    async def run(self):
+        while True:
+            try:
+                async with self.session_factory() as db:
+                    synced = await self.dispatch_batch(db)
+            except Exception:
+                # Keep the loop alive, rows are claimed for a while only.
+                logger.exception("Monolith sync dispatcher failed")
+                synced = 0
+            if synced < settings.monolith_sync_batch_size:
+                await asyncio.sleep(settings.monolith_sync_interval)
+
+    async def dispatch_batch(self, db: AsyncSession) -> int:
+        """Sync one batch of due users, returns number of processed outbox rows."""
+        now = datetime.datetime.now()
+        outbox_rows = (
+            await db.scalars(
+                select(UserSyncOutbox)
+                .options(joinedload(UserSyncOutbox.user, innerjoin=True))
+                .where(
+                    UserSyncOutbox.next_attempt_at <= now,
+                    UserSyncOutbox.attempts < settings.monolith_sync_max_attempts,
+                )
+                .order_by(UserSyncOutbox.next_attempt_at)
+                .limit(settings.monolith_sync_batch_size)
+                .with_for_update(skip_locked=True, of=UserSyncOutbox)
+            )
+        ).all()
+        if not outbox_rows:
+            return 0
+        claimed_until = now + datetime.timedelta(
+            seconds=settings.monolith_sync_claim_duration
+        )
+        for row in outbox_rows:
+            row.next_attempt_at = claimed_until
+        await db.commit()
+
+        results = await asyncio.gather(
+            *(create_user_on_monolith_once(user=row.user) for row in outbox_rows),
+            return_exceptions=True,
+        )
+        for row, result in zip(outbox_rows, results):
+            if isinstance(result, MonolithUserCreateException):
+                # Monolith rejected the user, the same request would be rejected again.
+                logger.error(
+                    "Monolith refused to create user %s: %s", row.user.username, result
+                )
+                await db.delete(row)
+            elif isinstance(result, Exception):
+                self._schedule_retry(row, result, now)
+            else:
+                row.user.synced_at = now
+                await db.delete(row)
+        await db.commit()
+        logger.info("Processed %s users from the monolith sync outbox", len(outbox_rows))
+        return len(outbox_rows)
+
+    def _schedule_retry(self, row: UserSyncOutbox, error: Exception, now):
+        row.attempts += 1
+        row.last_error = repr(error)
+        delay = min(settings.monolith_sync_retry_base_delay * 2**row.attempts, 3600)
+        row.next_attempt_at = now + datetime.timedelta(seconds=delay)
+        logger.warning(
+            "Can't sync user %s to monolith, attempt %s: %r",
+            row.user.username,
+            row.attempts,
+            error,
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(MonolithSyncDispatcher().run())
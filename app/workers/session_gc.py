@@ -0,0 +1,118 @@
+"""Delete expired and abandoned ``UserSession`` rows.
+
+A session is collected once its refresh token expired (older than
+``settings.jwt_refresh_token_lifetime_days``) or it was idle for
+``settings.session_gc_idle_days``. Sessions are kept while an access token issued
+for them could still be valid, so collected sessions never need to be revoked.
+
+Rows are deleted in chunks locked with ``FOR UPDATE SKIP LOCKED``, so locks are
+short and several collectors can run at the same time.
+
+Started in-process by the application lifespan, or standalone with
+
+    python -m app.workers.session_gc [--once]
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import settings
+from app.db.session import SessionLocal, engine
+from app.models.user import UserSession
+
+logger = logging.getLogger(__name__)
+
+
+class SessionGarbageCollector:
+    """Periodically delete expired and idle user sessions in chunks."""
+
+    def __init__(self, session_factory: async_sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+
+    async def run(self):
+        while True:
+            try:
+                async with self.session_factory() as db:
+                    await self.collect(db)
+            except (SQLAlchemyError, OSError):
+                logger.exception("Session garbage collection failed")
+            await asyncio.sleep(settings.session_gc_interval)
+
+    async def collect(self, db: AsyncSession) -> int:
+        """Delete all collectable sessions, returns number of deleted ones."""
+        total = 0
+        while True:
+            deleted = await self.delete_chunk(db)
+            total += deleted
+            if deleted < settings.session_gc_chunk_size:
+                break
+        if total:
+            logger.info("Deleted %s expired sessions", total)
+        return total
+
+    async def delete_chunk(self, db: AsyncSession) -> int:
+        now = datetime.datetime.now()
+        candidates = (
+            select(UserSession.uuid)
+            .where(self._collectable(now))
+            .limit(settings.session_gc_chunk_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            delete(UserSession).where(UserSession.uuid.in_(candidates)),
+            execution_options={"synchronize_session": False},
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def _collectable(now: datetime.datetime):
+        # Activity reaches the database with a delay, see SessionActivityBuffer.
+        activity_lag = datetime.timedelta(
+            seconds=settings.session_activity_min_interval
+            + settings.session_activity_flush_interval
+        )
+        access_tokens_expired_before = (
+            now
+            - datetime.timedelta(minutes=settings.jwt_access_token_lifetime_minutes)
+            - activity_lag
+        )
+        refresh_tokens_expired_before = now - datetime.timedelta(
+            days=settings.jwt_refresh_token_lifetime_days
+        )
+        idle_before = now - datetime.timedelta(days=settings.session_gc_idle_days)
+        return and_(
+            UserSession.last_activity < access_tokens_expired_before,
+            or_(
+                UserSession.created_at < refresh_tokens_expired_before,
+                UserSession.last_activity < idle_before,
+            ),
+        )
+
+
+async def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--once", action="store_true", help="Collect sessions once and exit."
+    )
+    args = parser.parse_args(argv)
+
+    collector = SessionGarbageCollector()
+    try:
+        if args.once:
+            async with collector.session_factory() as db:
+                await collector.collect(db)
+        else:
+            await collector.run()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())